@@ -2,24 +2,22 @@ from fastapi import APIRouter, Request, Response, Form, Depends
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 from app.core.config import supabase_client, GA_MEASUREMENT_ID, HOTJAR_ID
+from app.auth import auth_resolver
 import os
 
 router = APIRouter()
 templates = Jinja2Templates(directory=os.path.join(os.path.dirname(__file__), "../../templates"))
 
 def get_user_from_cookie(request: Request) -> dict:
-    session = request.cookies.get("user-session")
-    if not session:
-        return None
-    try:
-        user = supabase_client.auth.get_user(session)
-        return user.user.dict() if user else None
-    except Exception:
-        return None
+    """For sync routes (they run in the threadpool); async routes use get_user_from_cookie_async."""
+    return auth_resolver.resolve(request.cookies.get("user-session"))
+
+async def get_user_from_cookie_async(request: Request) -> dict:
+    return await auth_resolver.resolve_async(request.cookies.get("user-session"))
 
 @router.get("/login", response_class=HTMLResponse)
 async def read_login_get(request: Request, message: str = None):
-    user = get_user_from_cookie(request)
+    user = await get_user_from_cookie_async(request)
     # if user:
     #     return RedirectResponse(url="/chat", status_code=302)
     return templates.TemplateResponse(
@@ -43,7 +41,7 @@ def read_login_post(request: Request, response: Response, email: str = Form(...)
 
 @router.get("/register", response_class=HTMLResponse)
 async def read_register_get(request: Request, error: str = None):
-    user = get_user_from_cookie(request)
+    user = await get_user_from_cookie_async(request)
     # if user:
     #     return RedirectResponse(url="/chat", status_code=302)
     return templates.TemplateResponse(
@@ -91,6 +89,7 @@ def handle_register(email: str = Form(...), password: str = Form(...)):
 
 @router.get("/logout")
 async def do_logout(request: Request):
+    auth_resolver.invalidate(request.cookies.get("user-session"))
     response = RedirectResponse(url="/", status_code=302)
     response.delete_cookie(key="user-session")
     return response
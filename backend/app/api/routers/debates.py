@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Request, Depends, HTTPException
+from typing import Literal, Optional
+from fastapi import APIRouter, Request, Depends, HTTPException, Query
 from fastapi.responses import JSONResponse
-from app.services.debate_service import DebateService
-from app.api.routers.auth import get_user_from_cookie
-from pydantic import BaseModel
+from app.services.debate_service import DebateService, InvalidCursorError, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.services.rating_coalescer import rating_coalescer
+from app.api.routers.auth import get_user_from_cookie, get_user_from_cookie_async
+from pydantic import BaseModel, Field
 
 router = APIRouter(prefix="/api", tags=["debates"])
 
@@ -12,45 +14,68 @@ def get_debate_service():
 
 class RateDebateRequest(BaseModel):
     debate_id: str
-    rater: str
-    rating: int
+    rater: Literal["opener", "final"]
+    rating: int = Field(ge=1, le=5)
+
+
+def _serialize_debate(debate) -> dict:
+    return {
+        "debate_id": debate.debate_id,
+        "user_id": debate.user_id,
+        "timestamp": debate.timestamp.isoformat(),
+        "user_prompt": debate.user_prompt,
+        "opener": debate.opener,
+        "critiquer": debate.critiquer,
+        "synthesizer": debate.synthesizer,
+        "opener_rating": debate.opener_rating,
+        "final_rating": debate.final_rating,
+    }
 
 
 @router.get("/debates")
-def get_debates(request: Request, service: DebateService = Depends(get_debate_service)):
-    """Retrieves the requesting user's debates from the database."""
-    user = get_user_from_cookie(request)
+async def get_debates(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    service: DebateService = Depends(get_debate_service),
+):
+    """Returns one page of the requesting user's debate summaries, newest first."""
+    user = await get_user_from_cookie_async(request)
+    if not user:
+        raise HTTPException(status_code=401, detail="Authentication required")
+
+    try:
+        items, next_cursor = await service.list_debate_summaries_async(user["id"], limit=limit, cursor=cursor)
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return JSONResponse(content={"items": items, "next_cursor": next_cursor})
+
+
+@router.get("/debates/{debate_id}")
+async def get_debate(debate_id: str, request: Request, service: DebateService = Depends(get_debate_service)):
+    """Retrieves one full debate owned by the requesting user."""
+    user = await get_user_from_cookie_async(request)
     if not user:
         raise HTTPException(status_code=401, detail="Authentication required")
 
-    debates = service.get_all_debates(user["id"])
-    # Convert SQLModel objects to dictionaries
-    debates_data = [
-        {
-            "debate_id": debate.debate_id,
-            "user_id": debate.user_id,
-            "timestamp": debate.timestamp.isoformat(),
-            "user_prompt": debate.user_prompt,
-            "opener": debate.opener,
-            "critiquer": debate.critiquer,
-            "synthesizer": debate.synthesizer,
-            "opener_rating": debate.opener_rating,
-            "final_rating": debate.final_rating,
-        }
-        for debate in debates
-    ]
-    return JSONResponse(content=debates_data or [])
+    debate = await service.get_debate_async(debate_id, user["id"])
+    if not debate:
+        raise HTTPException(status_code=404, detail="Debate not found")
+    return JSONResponse(content=_serialize_debate(debate))
 
 
 @router.post("/rate")
-def rate_debate(data: RateDebateRequest, service: DebateService = Depends(get_debate_service)):
-    """Updates the rating for a debate in the database."""
-    try:
-        service.update_rating(data.debate_id, data.rater, data.rating)
-        return JSONResponse(content={"status": "success"})
-    except Exception as e:
-        print(f"Error updating rating: {e}")
-        return JSONResponse(content={"status": "error", "message": "Failed to update rating"}, status_code=500)
+async def rate_debate(data: RateDebateRequest, request: Request):
+    """
+    Accepts a rating for one of the requesting user's debates. The write happens in the
+    background a moment later; repeated ratings of the same debate keep the latest value.
+    """
+    user = await get_user_from_cookie_async(request)
+    if not user:
+        raise HTTPException(status_code=401, detail="Authentication required")
+
+    rating_coalescer.submit(data.debate_id, user["id"], data.rater, data.rating)
+    return JSONResponse(content={"status": "accepted"}, status_code=202)
 
 
 @router.delete("/debates/{debate_id}")
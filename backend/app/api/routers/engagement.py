@@ -3,8 +3,9 @@ from typing import Any, Dict, Optional
 from fastapi import APIRouter, Request
 from pydantic import BaseModel, EmailStr, Field
 
-from app.core.config import supabase_client
-from app.database import record_analytics_event, save_feedback_entry, save_visitor
+from app.auth import auth_resolver
+from app.database import save_feedback_entry_async, save_visitor_async
+from app.services.analytics_buffer import analytics_buffer
 
 
 router = APIRouter(prefix="/engagement", tags=["engagement"])
@@ -26,36 +27,30 @@ class VisitorRequest(BaseModel):
     username: str = Field(..., min_length=4, max_length=64, description="Friendly label for analytics")
 
 
-def _get_user_id(request: Request) -> Optional[str]:
-    session = request.cookies.get("user-session")
-    if not session:
-        return None
-    try:
-        user = supabase_client.auth.get_user(session)
-        return user.user.id if user else None
-    except Exception:
-        return None
+async def _get_user_id(request: Request) -> Optional[str]:
+    user = await auth_resolver.resolve_async(request.cookies.get("user-session"))
+    return user["id"] if user else None
 
 
 @router.post("/feedback")
 async def submit_feedback(payload: FeedbackRequest, request: Request):
     """Capture user feedback from landing page forms."""
-    user_id = _get_user_id(request)
-    save_feedback_entry(payload.email, payload.message.strip(), payload.category, user_id=user_id)
+    user_id = await _get_user_id(request)
+    await save_feedback_entry_async(payload.email, payload.message.strip(), payload.category, user_id=user_id)
     return {"status": "received"}
 
 
 @router.post("/analytics")
 async def capture_analytics(payload: AnalyticsEventRequest, request: Request):
-    """Record lightweight analytics events for the landing page."""
-    user_id = _get_user_id(request)
-    record_analytics_event(payload.event_name, payload.metadata, user_id=user_id)
-    return {"status": "ok"}
+    """Buffer lightweight analytics events for the landing page; they are written in batches."""
+    user_id = await _get_user_id(request)
+    accepted = analytics_buffer.enqueue(payload.event_name, payload.metadata, user_id=user_id)
+    return {"status": "ok" if accepted else "dropped"}
 
 
 @router.post("/visitor")
 async def register_visitor(payload: VisitorRequest):
     """Persist a visitor identity for anonymous usage tracking."""
 
-    save_visitor(visitor_id=payload.visitor_id, username=payload.username.strip())
+    await save_visitor_async(visitor_id=payload.visitor_id, username=payload.username.strip())
     return {"status": "ok"}
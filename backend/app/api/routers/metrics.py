@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from app.auth import auth_resolver, require_admin
+from app.core.loop_monitor import loop_monitor
+from app.core.metrics import registry
+from app.services.admission import admission_controller
+from app.services.analytics_buffer import analytics_buffer
+from app.services.cancellation import cancellation_stats
+from app.services.critique_pipeline import pipeline_stats
+from app.services.debate_write_queue import debate_write_queue
+from app.services.rating_coalescer import rating_coalescer
+from app.services.hedging import stage_latency
+from app.services.model_router import model_router
+from app.services.semantic_cache import semantic_cache
+
+
+router = APIRouter(tags=["monitoring"], dependencies=[Depends(require_admin)])
+
+registry.register_stats("auth_cache", auth_resolver.stats)
+registry.register_stats("analytics_buffer", analytics_buffer.stats)
+registry.register_stats("debate_write_queue", debate_write_queue.stats)
+registry.register_stats("rating_coalescer", rating_coalescer.stats)
+registry.register_stats("semantic_cache", semantic_cache.stats)
+registry.register_stats("critique_pipeline", pipeline_stats.stats)
+registry.register_stats("model_router", model_router.stats, nested={"models": ("model",)})
+registry.register_stats("stage_latency", stage_latency.stats, nested={"stages": ("role", "hedging")})
+registry.register_stats("cancellation", cancellation_stats.stats)
+registry.register_stats("admission", admission_controller.stats)
+registry.register_stats("loop_monitor", loop_monitor.stats)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Every metric in the Prometheus text exposition format. Scrapers send the X-Admin-Token header."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
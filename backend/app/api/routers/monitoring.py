@@ -0,0 +1,115 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from app.auth import require_admin
+from app.core.config import PROFILER_MAX_SECONDS
+from app.core.loop_monitor import loop_monitor
+from app.core.profiler import ProfilerBusy, sampling_profiler
+from app.core.tracing import RingBufferExporter, tracer
+
+from app.services.admission import admission_controller
+from app.services.cancellation import cancellation_stats
+from app.services.hedging import stage_latency
+from app.services.model_router import model_router
+
+
+# Model health, traces and profiles describe other users' traffic, so every endpoint is admin-only
+router = APIRouter(prefix="/monitoring", tags=["monitoring"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/models")
+async def get_model_health():
+    """Live per-model latency/error EWMAs and the router's current selection shares."""
+    return model_router.stats()
+
+
+@router.get("/stages")
+async def get_stage_latency():
+    """P50/P95/P99 stage latency per role, split by hedging on/off, plus hedge and deadline counters."""
+    return stage_latency.stats()
+
+
+@router.get("/cancellations")
+async def get_cancellation_savings():
+    """Debates cut short by client disconnects and the estimated tokens/seconds that saved."""
+    return cancellation_stats.stats()
+
+
+@router.get("/admission")
+async def get_admission_state():
+    """Running and queued debates, rejections and queue wait times."""
+    return admission_controller.stats()
+
+
+def _trace_buffer() -> RingBufferExporter:
+    if not isinstance(tracer.exporter, RingBufferExporter):
+        raise HTTPException(status_code=404, detail="Traces are not kept in memory (set TRACE_EXPORTER=memory)")
+    return tracer.exporter
+
+
+@router.get("/traces")
+async def list_traces(limit: int = 50):
+    """The most recent sampled traces, newest first, without their spans."""
+    return {
+        **tracer.stats(),
+        "traces": [
+            {key: value for key, value in trace.items() if key != "spans"} | {"spans": len(trace["spans"])}
+            for trace in _trace_buffer().recent(max(1, min(limit, 500)))
+        ],
+    }
+
+
+@router.get("/traces/{trace_id}")
+async def get_trace(trace_id: str):
+    """Every span of one trace; debate traces use the debate_id as their trace id."""
+    trace = _trace_buffer().get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return trace
+
+
+@router.get("/loop")
+async def get_loop_blockers(limit: int = 20):
+    """Event-loop lag summary and the call sites that blocked the loop longest, with their stacks."""
+    return {**loop_monitor.stats(), "offenders": loop_monitor.offenders(max(1, min(limit, 100)))}
+
+
+def _render_profile(session, format: str):
+    if format not in ("collapsed", "speedscope"):
+        raise HTTPException(status_code=400, detail="format must be collapsed or speedscope")
+    profile = sampling_profiler.render(session, format)
+    return PlainTextResponse(profile) if format == "collapsed" else profile
+
+
+@router.get("/profile")
+async def profile_worker(seconds: float = 10.0, format: str = "collapsed"):
+    """Samples every thread's stack for ``seconds`` and returns collapsed stacks or a speedscope file."""
+    if not 0 < seconds <= PROFILER_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be in (0, {PROFILER_MAX_SECONDS:g}]")
+    try:
+        session = sampling_profiler.begin(f"worker {seconds:g}s")
+    except ProfilerBusy as busy:
+        raise HTTPException(status_code=409, detail=str(busy))
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        sampling_profiler.end(session)
+    return _render_profile(session, format)
+
+
+@router.get("/profiles")
+async def list_profiles():
+    """Recent per-request and per-debate profiles (X-Profile header or websocket ``profile`` flag)."""
+    return {**sampling_profiler.stats(), "profiles": sampling_profiler.recent()}
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, format: str = "collapsed"):
+    session = sampling_profiler.get(profile_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if session.duration is None:
+        raise HTTPException(status_code=409, detail="Profile is still running")
+    return _render_profile(session, format)
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Request
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
-from app.api.routers.auth import get_user_from_cookie
+from app.api.routers.auth import get_user_from_cookie_async
 from app.core.config import GA_MEASUREMENT_ID, HOTJAR_ID
 import os
 
@@ -15,7 +15,7 @@ PRICING_CHECKOUT_LINKS = {
 
 @router.get("/", response_class=HTMLResponse)
 async def read_landing(request: Request):
-    user = get_user_from_cookie(request)
+    user = await get_user_from_cookie_async(request)
     return templates.TemplateResponse(
         "landing.html",
         {
@@ -29,10 +29,10 @@ async def read_landing(request: Request):
 
 @router.get("/chat", response_class=HTMLResponse)
 async def read_chat(request: Request):
-    user = get_user_from_cookie(request)
+    user = await get_user_from_cookie_async(request)
     return templates.TemplateResponse("index.html", {"request": request, "user": user, "ga_measurement_id": GA_MEASUREMENT_ID, "hotjar_id": HOTJAR_ID})
 
 @router.get("/review", response_class=HTMLResponse)
 async def read_review(request: Request):
-    user = get_user_from_cookie(request)
+    user = await get_user_from_cookie_async(request)
     return templates.TemplateResponse("review.html", {"request": request, "user": user, "ga_measurement_id": GA_MEASUREMENT_ID, "hotjar_id": HOTJAR_ID})
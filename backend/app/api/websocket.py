@@ -1,37 +1,82 @@
-import random
+import asyncio
+import math
+import re
+import time
 import uuid
 from datetime import datetime
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
-from app.core.config import supabase_client, AVAILABLE_MODELS
-from app.services.ai_service import AIService
-from app.services.debate_service import DebateService
-from app.models import ARGUMENT_FORMAT_INSTRUCTIONS, SYNTHESIS_FORMAT_INSTRUCTIONS
+from app.core.config import (
+    COUNCIL_MAX_CONCURRENCY,
+    COUNCIL_OPENERS,
+    HEDGING_ENABLED,
+    PIPELINED_CRITIQUE,
+    RAG_ENABLED,
+    RAG_MAX_DISTANCE,
+    RAG_MAX_RESULTS,
+    SEMANTIC_CACHE_ENABLED,
+    STAGE_DEADLINES,
+    WS_FLUSH_INTERVAL_MS,
+    WS_FLUSH_MAX_BYTES,
+)
+from app.auth import auth_resolver, is_admin_token
+from app.core.metrics import debates_total, llm_fallbacks, llm_stage_seconds, llm_tokens_streamed, llm_ttft_seconds, websocket_sessions
+from app.core.profiler import ProfilerBusy, sampling_profiler
+from app.core.tracing import current_span, tracer
+from app.services.ai_service import AIService, FALLBACK_MODEL
+from app.services.debate_write_queue import debate_write_queue
+from app.services.semantic_cache import semantic_cache
+from app.services.critique_pipeline import FrameGate, argument_prefix, pipeline_stats, same_prefix
+from app.services.frame_coalescer import FrameCoalescer
+from app.services.cancellation import ConnectionReader, cancellation_stats
+from app.services.conversation_memory import ConversationMemory
+from app.services.admission import AdmissionRejected, admission_controller
+from app.services.hedging import hedged_stream, stage_latency
+from app.services.model_router import model_router
+from app.services.rag.knowledge_retrieval import knowledge_retrieval
+from app.services.structured_stream import StructuredStreamParser
+from app.services.prompt_builder import (
+    count_message_tokens,
+    count_tokens,
+    critique_messages,
+    followup_messages,
+    max_output_tokens,
+    opener_messages,
+    synthesis_messages,
+)
+from app.models import ArgumentResponse, SynthesisResponse
 
 router = APIRouter()
 
 def get_ai_service():
     return AIService()
 
-def get_debate_service():
-    return DebateService()
+def pick_council_models(count: int) -> list:
+    """
+    Picks ``count`` models, distinct when possible, weighted towards the currently fastest healthy ones.
+    Picks are drawn in order, so the opener (whose first token the user waits on) gets first choice.
+    """
+    return model_router.pick(count)
+
+async def replay_cached_stage(stage: dict, on_chunk):
+    """Replays a cached stage transcript as stream deltas of a few words each."""
+    words = re.findall(r"\S+\s*", stage["text"])
+    for start in range(0, len(words), 8):
+        await on_chunk("".join(words[start:start + 8]), stage["model"])
+    return stage["text"], stage["model"]
 
 @router.websocket("/ws")
 async def websocket_endpoint(
     websocket: WebSocket,
     ai_service: AIService = Depends(get_ai_service),
-    debate_service: DebateService = Depends(get_debate_service)
 ):
     """Handles the WebSocket connection for the real-time debate, with authentication."""
     user = None
     user_id = None
     visitor_id = websocket.query_params.get("visitor_id")
     try:
-        cookie = websocket.cookies.get("user-session")
-        if cookie:
-            supabase_user = supabase_client.auth.get_user(cookie)
-            if supabase_user and supabase_user.user:
-                user = supabase_user.user.dict()
-                user_id = user.get("id")
+        user = await auth_resolver.resolve_async(websocket.cookies.get("user-session"))
+        if user:
+            user_id = user.get("id")
     except Exception as e:
         # Guest mode should keep going even if Supabase is unhappy
         print(f"WebSocket auth skipped, continuing as guest: {e}")
@@ -42,154 +87,372 @@ async def websocket_endpoint(
     await websocket.accept()
     print(f"WebSocket connection accepted for {'user ' + user_id if user_id else 'guest mode'}")
 
-    # Maintain conversation context for the session
-    conversation_context = []  # Stores summaries of past debates for context
+    # Earlier debates on this connection, recalled as context for follow-up questions
+    memory = ConversationMemory()
 
-    try:
-        while True:
-            try:
-                async def stream_stage(model_req: str, history: list, role: str):
-                    """Stream a single model stage with graceful fallback."""
-                    await websocket.send_json({"type": "typing", "sender": model_req, "role": role})
+    # Council openers stream concurrently, so frames from different stages must not interleave mid-send
+    send_lock = asyncio.Lock()
 
-                    async def on_chunk(delta: str, sender_name: str):
-                        try:
-                            if websocket.client_state.name == "CONNECTED":
-                                await websocket.send_json({"type": "stream", "sender": sender_name, "text": delta, "role": role})
-                        except WebSocketDisconnect:
-                            raise
-                        except Exception as send_error:
-                            print(f"Stream send failed for {sender_name}: {send_error}")
+    async def send_frame(payload: dict):
+        async with send_lock:
+            await websocket.send_json(payload)
 
-                    response_text = ""
-                    response_model = model_req
+    # Token deltas are merged into fewer frames; every stage frame goes through the coalescer
+    coalescer = FrameCoalescer(send_frame, flush_interval=WS_FLUSH_INTERVAL_MS / 1000, max_bytes=WS_FLUSH_MAX_BYTES)
+    await coalescer.start()
 
+    # Reads the socket for the whole connection so a disconnect mid-debate cancels the debate
+    reader = ConnectionReader(websocket)
+    await reader.start()
+    websocket_sessions.inc()
+
+    try:
+        while True:
+            started_stages = set()
+            speculation = {}
+            admitted = False
+            debate_span = None
+            profile_session = None
+            try:
+                async def run_stage_with_deadlines(model_req: str, history: list, role: str, on_chunk):
+                    """
+                    Streams with hedging under the role's deadlines, then falls back to a bounded non-streaming call.
+                    A stalled first token triggers a hedged request to another model.
+                    """
+                    deadlines = STAGE_DEADLINES[role]
+
+                    def stream(model: str, history: list, on_chunk):
+                        # A hedge may go to a reasoning model, which needs a larger completion budget
+                        return ai_service.stream_bot_response(model, history, on_chunk, max_tokens=max_output_tokens(role, model))
+
+                    stage_started = time.perf_counter()
                     try:
-                        response_text, response_model = await ai_service.stream_bot_response(model_req, history, on_chunk)
+                        return await asyncio.wait_for(
+                            hedged_stream(
+                                stream, model_req, history, on_chunk, deadlines["ttft"],
+                                pick_alternate=(lambda: model_router.pick_alternate([model_req])) if HEDGING_ENABLED else None,
+                                on_abandoned=model_router.record_abandoned,
+                            ),
+                            timeout=deadlines["total"],
+                        )
                     except Exception as stream_error:
-                        print(f"Streaming fallback for {model_req}: {stream_error}")
-                        response_text, response_model = await ai_service.get_bot_response(model_req, history)
-
-                    payload_text = f"**Final Verdict:** {response_text}" if role == "synthesizer" else response_text
-                    await websocket.send_json({"sender": response_model, "text": payload_text, "role": role})
-                    return response_text, response_model
-
-                data = await websocket.receive_json()
+                        if isinstance(stream_error, asyncio.TimeoutError):
+                            stage_latency.deadline_timeouts += 1
+                        print(f"Streaming fallback for {model_req}: {stream_error!r}")
+                        # Recorded here: the name is unbound once the except block ends
+                        current_span().set(fallback="non_streaming", stream_error=repr(stream_error)[:200])
+                    llm_fallbacks.labels("non_streaming").inc()
+                    fallback_budget = max(deadlines["ttft"], deadlines["total"] - (time.perf_counter() - stage_started))
+                    try:
+                        return await asyncio.wait_for(ai_service.get_bot_response(model_req, history, max_tokens=max_output_tokens(role, model_req)), timeout=fallback_budget)
+                    except asyncio.TimeoutError:
+                        stage_latency.deadline_timeouts += 1
+                        llm_fallbacks.labels("canned_timeout").inc()
+                        current_span().set(fallback="canned_timeout")
+                        return f"Sorry, the {model_req} model did not respond in time.", FALLBACK_MODEL
+
+                async def stream_stage(model_req: str, history: list, role: str, index: int = None, emit=None, on_progress=None):
+                    """
+                    Stream a single model stage with graceful fallback, or replay it from the semantic cache.
+                    ``emit`` overrides where frames go (e.g. a FrameGate); ``on_progress`` sees the text so far after each delta.
+                    Each labelled field is sent as a ``field_complete`` frame as soon as it closes.
+                    """
+                    stage_key = role if index is None else f"{role}:{index}"
+                    with tracer.span("stage", stage=stage_key, model_requested=model_req) as span:
+                        emit = emit or coalescer.push
+                        streamed_text = ""
+                        streamed_tokens = 0
+                        first_token_at = None
+                        started_stages.add(stage_key)
+                        stage_tags = {"role": role} if index is None else {"role": role, "index": index}
+                        cached_stage = cached_debate.stages.get(stage_key) if cached_debate else None
+                        await emit({"type": "typing", "sender": cached_stage["model"] if cached_stage else model_req, **stage_tags})
+                        parser = StructuredStreamParser(SynthesisResponse if role == "synthesizer" else ArgumentResponse)
+
+                        async def emit_fields(closed: list):
+                            for field, value in closed:
+                                await emit({"type": "field_complete", "field": field, "value": value, **stage_tags})
+
+                        async def on_chunk(delta: str, sender_name: str):
+                            nonlocal streamed_text, streamed_tokens, first_token_at
+                            if not streamed_tokens:
+                                first_token_at = time.perf_counter()
+                            streamed_tokens += 1
+                            if on_progress:
+                                streamed_text += delta
+                                on_progress(streamed_text, delta)
+                            try:
+                                if websocket.client_state.name == "CONNECTED":
+                                    await emit({"type": "stream", "sender": sender_name, "text": delta, **stage_tags})
+                                    await emit_fields(parser.feed(delta))
+                            except WebSocketDisconnect:
+                                raise
+                            except Exception as send_error:
+                                print(f"Stream send failed for {sender_name}: {send_error}")
+
+                        response_text = ""
+                        response_model = model_req
+
+                        if cached_stage:
+                            response_text, response_model = await replay_cached_stage(cached_stage, on_chunk)
+                            span.set(cached=True)
+                        else:
+                            input_tokens = count_message_tokens(history, model_req)
+                            stage_started = time.perf_counter()
+                            try:
+                                response_text, response_model = await run_stage_with_deadlines(model_req, history, role, on_chunk)
+                            except asyncio.CancelledError:
+                                # Only client disconnects count; a restarted speculative critique is cancelled too
+                                if reader.disconnected.is_set():
+                                    cancellation_stats.record_cancelled(role, streamed_tokens, time.perf_counter() - stage_started)
+                                raise
+                            stage_seconds = time.perf_counter() - stage_started
+                            stage_latency.record(role, stage_seconds, HEDGING_ENABLED)
+                            # Recorded once per stage so the per-token path stays a counter increment
+                            llm_stage_seconds.labels(role, response_model).observe(stage_seconds)
+                            llm_tokens_streamed.labels(role, response_model).inc(streamed_tokens)
+                            if first_token_at is not None:
+                                llm_ttft_seconds.labels(role, response_model).observe(first_token_at - stage_started)
+                            output_tokens = count_tokens(response_text, response_model)
+                            max_tokens = max_output_tokens(role, response_model)
+                            print(
+                                f"Stage {stage_key} ({response_model}): {input_tokens} input tokens, "
+                                f"{output_tokens}/{max_tokens or 'unbounded'} output tokens in {stage_seconds:.2f}s"
+                            )
+                            cancellation_stats.record_completed(role, streamed_tokens, stage_seconds)
+                            span.set(
+                                input_tokens=input_tokens,
+                                output_tokens=output_tokens,
+                                max_tokens=max_tokens,
+                                ttft_ms=round((first_token_at - stage_started) * 1000, 1) if first_token_at is not None else None,
+                            )
+
+                        closed = []
+                        if parser.chars != len(response_text or ""):
+                            # The text came from the non-streaming fallback, not the deltas the parser saw
+                            parser = StructuredStreamParser(parser.schema)
+                            closed = parser.feed(response_text or "")
+                        remaining, structured, invalid = parser.finish()
+                        span.set(model=response_model, streamed_deltas=streamed_tokens, structured=structured is not None)
+                        await emit_fields(closed + remaining)
+
+                        payload_text = f"**Final Verdict:** {response_text}" if role == "synthesizer" else response_text
+                        final_frame = {"sender": response_model, "text": payload_text, **stage_tags}
+                        if structured:
+                            final_frame["structured"] = structured.model_dump(mode="json")
+                        else:
+                            print(f"{stage_key} response from {response_model} is not a valid {parser.schema.__name__}: {invalid}")
+                        if cached_stage:
+                            final_frame["cached"] = True
+                        await emit(final_frame)
+                        return response_text, response_model
+
+                data = await reader.receive_json()
+                reader.cancel_on_disconnect(asyncio.current_task())
                 user_message = data["text"]
                 user_id = user['id'] if user else visitor_id
                 
                 print(f"\n--- User Message from {user_id} ---: {user_message}")
+
+                # Per-user rate limit, then a fair wait for one of the global debate slots
+                async def send_queue_position(position: int):
+                    await send_frame({"type": "queued", "position": position})
+
+                # Guests are limited by address: visitor_id comes from the client, which could send a new one per connection
+                client_address = websocket.client.host if websocket.client else "unknown"
+                admission_key = user["id"] if user else f"ip:{client_address}"
+                # Cache entries stay per visitor, so guests behind one address do not see each other's debates
+                cache_scope = user["id"] if user else f"ip:{client_address}:{visitor_id}"
+                try:
+                    await admission_controller.acquire(admission_key, on_position=send_queue_position)
+                except AdmissionRejected as rejected:
+                    retry_text = f" Please try again in {math.ceil(rejected.retry_after)}s." if rejected.retry_after else " Please wait for your current debates to finish."
+                    frame = {'sender': 'Shurahub', 'type': 'rate_limited', 'text': f"{rejected}{retry_text}"}
+                    if rejected.retry_after:
+                        frame['retry_after'] = math.ceil(rejected.retry_after)
+                    await send_frame(frame)
+                    debates_total.labels("rejected").inc()
+                    continue
+                admitted = True
+
                 await websocket.send_json({'sender': 'Shurahub', 'text': 'Initiating collaborative debate...', 'mode': 'guest' if not user_id else 'authenticated'})
 
                 debate_id = str(uuid.uuid4())
-                models_to_use = (random.sample(AVAILABLE_MODELS, 3) 
-                               if len(AVAILABLE_MODELS) >= 3 
-                               else AVAILABLE_MODELS * (3 // len(AVAILABLE_MODELS)) + AVAILABLE_MODELS[:3 % len(AVAILABLE_MODELS)])
+                debate_started = time.perf_counter()
+                # Stage, follow-up and DB spans below are children of this one (trace id = debate_id)
+                debate_span = tracer.start_trace("debate", debate_id, mode="authenticated" if user else "guest", council_openers=COUNCIL_OPENERS)
+
+                # Near-duplicate first questions replay a stored transcript instead of calling the models.
+                # Follow-ups are never served from cache because their answer depends on session context.
+                cached_debate = None
+                if SEMANTIC_CACHE_ENABLED and not memory:
+                    cached_debate = semantic_cache.lookup(user_message, scope=cache_scope)
+                    if cached_debate:
+                        print(f"Semantic cache hit (similarity {cached_debate.similarity:.3f}) for: {user_message}")
+                debate_span.set(cached=bool(cached_debate), followup=bool(memory))
+
+                # {"profile": true} from an admin connection (X-Admin-Token on the handshake) samples this debate
+                if data.get("profile") and is_admin_token(websocket.headers.get("x-admin-token")):
+                    try:
+                        profile_session = sampling_profiler.begin(f"debate {debate_id}")
+                        await send_frame({"type": "profile", "profile_id": profile_session.id})
+                    except ProfilerBusy as busy:
+                        print(f"Debate profiling skipped: {busy}")
+                # N openers, then the critiquer and the synthesizer
+                council_size = COUNCIL_OPENERS
+                models_to_use = pick_council_models(council_size + 2)
 
                 # --- The Debate ---
                 
-                # Build context from previous debates (for follow-up questions)
-                context_summary = ""
-                if conversation_context:
-                    context_summary = "\n\nPREVIOUS CONVERSATION CONTEXT:\n" + "\n".join([
-                        f"- Q: {ctx['question'][:100]}... → A: {ctx['answer'][:100]}..."
-                        for ctx in conversation_context[-3:]  # Keep last 3 debates for context
-                    ])
+                # The most relevant earlier exchanges, within a fixed token budget (for follow-up questions)
+                context_summary = memory.context_for(user_message)
                 
-                # 1. The Opener
-                opener_model_req = models_to_use[0]
-                opener_system_prompt = f'''You are a debater in the Shurahub AI Council. Your role is to provide the OPENING argument.
-
-RULES:
-- Be CONCISE. No long paragraphs.
-- Users want to SKIM, not read essays.
-- Each field has a character limit - respect it.
-- Focus ONLY on the user's question. Do not go off-topic.
+                # Grounding notes from the local knowledge base; retrieval problems never block a debate
+                reference_notes = ""
+                if RAG_ENABLED:
+                    try:
+                        hits = [
+                            hit for hit in await knowledge_retrieval.retrieve_context(user_message, RAG_MAX_RESULTS)
+                            if hit["score"] <= RAG_MAX_DISTANCE
+                        ]
+                        if hits:
+                            reference_notes = "\n\nREFERENCE NOTES (use only if relevant to the question):\n" + "\n".join(
+                                f"[{i}] ({hit['source']}) {hit['content']}" for i, hit in enumerate(hits, 1)
+                            )
+                    except Exception as e:
+                        print(f"Knowledge retrieval failed: {e}")
+
+                # 1. The Opener(s)
+                opener_history = opener_messages(user_message, context_summary, reference_notes)
+                critiquer_model_req = models_to_use[council_size]
+
+                def critique_history_for(opening_list: list) -> list:
+                    return critique_messages(user_message, opening_list, critiquer_model_req)
+
+                # Pipelined mode: once the opener's Claim and Explanation have streamed, start the
+                # critiquer on that partial argument with its frames held back until the opener is done.
+                pipelined = PIPELINED_CRITIQUE and council_size == 1 and not cached_debate
+
+                def on_opener_progress(text: str, delta: str):
+                    if "task" in speculation or ":" not in delta:
+                        return
+                    prefix = argument_prefix(text)
+                    if prefix:
+                        gate = FrameGate(coalescer.push)
+                        speculation.update(
+                            prefix=prefix,
+                            gate=gate,
+                            requested_at=time.perf_counter(),
+                            task=asyncio.create_task(stream_stage(
+                                critiquer_model_req,
+                                critique_history_for([(prefix, models_to_use[0])]),
+                                "critiquer",
+                                emit=gate.emit,
+                            )),
+                        )
+
+                # In council mode every opener streams at once (capped per debate), so wall-clock
+                # time tracks the slowest opener rather than the sum of all of them.
+                opener_slots = asyncio.Semaphore(COUNCIL_MAX_CONCURRENCY)
+
+                async def run_opener(index: int, model_req: str):
+                    async with opener_slots:
+                        return await stream_stage(
+                            model_req, opener_history, "opener", index,
+                            on_progress=on_opener_progress if pipelined else None,
+                        )
 
-{ARGUMENT_FORMAT_INSTRUCTIONS}'''
-                
-                user_prompt = user_message
-                if context_summary:
-                    user_prompt = f"{user_message}{context_summary}"
-                
-                opener_history = [
-                    {'role': 'system', 'content': opener_system_prompt},
-                    {'role': 'user', 'content': user_prompt}
-                ]
-                opener_response, opener_model_res = await stream_stage(opener_model_req, opener_history, "opener")
+                try:
+                    openings = await asyncio.gather(*(
+                        run_opener(index, model_req) for index, model_req in enumerate(models_to_use[:council_size])
+                    ))
+                except BaseException:
+                    if "task" in speculation:
+                        speculation["task"].cancel()
+                    raise
+                opener_done_at = time.perf_counter()
+                opener_response, opener_model_res = openings[0]
 
                 # 2. The Critiquer
-                critiquer_model_req = models_to_use[1]
-                critique_prompt = f'''You are critiquing your colleague {opener_model_res}'s argument.
-
-RULES:
-- Be CONCISE. No long paragraphs.
-- Users want to SKIM, not read essays.
-- Each field has a character limit - respect it.
-
-User's query: "{user_message}"
-{opener_model_res}'s response: "{opener_response}"
-
-{ARGUMENT_FORMAT_INSTRUCTIONS}'''
-                critiquer_history = [{'role': 'user', 'content': critique_prompt}]
-                critiquer_response, critiquer_model_res = await stream_stage(critiquer_model_req, critiquer_history, "critiquer")
+                critiquer_response = None
+                if "task" in speculation:
+                    if same_prefix(speculation["prefix"], argument_prefix(opener_response)):
+                        await speculation["gate"].release()
+                        critiquer_response, critiquer_model_res = await speculation["task"]
+                        saved = pipeline_stats.record_accepted(
+                            speculation["requested_at"], speculation["gate"].first_stream_at, opener_done_at
+                        )
+                        print(f"Pipelined critique accepted: first critique token {saved * 1000:.0f}ms sooner than sequential")
+                    else:
+                        speculation["task"].cancel()
+                        try:
+                            await speculation["task"]
+                        except asyncio.CancelledError:
+                            pass
+                        pipeline_stats.record_restarted()
+                        print("Pipelined critique restarted: the final opener changed its claim or explanation")
+
+                if critiquer_response is None:
+                    critiquer_response, critiquer_model_res = await stream_stage(
+                        critiquer_model_req, critique_history_for(openings), "critiquer"
+                    )
 
                 # 3. The Synthesizer (Judge)
-                synthesizer_model_req = models_to_use[2]
-                synthesis_prompt = f'''You are the JUDGE providing the Golden Answer.
-
-User's Query: "{user_message}"
-
-The Debate:
-{opener_model_res}: "{opener_response}"
-{critiquer_model_res}: "{critiquer_response}"
-
-RULES:
-- Be CONCISE. No essays.
-- Keep each section SHORT.
-- Users want a clear answer, not paragraphs.
-
-{SYNTHESIS_FORMAT_INSTRUCTIONS}'''
-                synthesizer_history = [{'role': 'user', 'content': synthesis_prompt}]
+                synthesizer_model_req = models_to_use[council_size + 1]
+                synthesizer_history = synthesis_messages(
+                    user_message, openings, (critiquer_response, critiquer_model_res), synthesizer_model_req
+                )
                 synthesizer_response, synthesizer_model_res = await stream_stage(synthesizer_model_req, synthesizer_history, "synthesizer")
 
                 # Generate contextual follow-up suggestions from the council
-                try:
-                    followup_prompt = f'''Based on this debate about: "{user_message}"
-                    
-The verdict was: {synthesizer_response[:300] if synthesizer_response else "provided"}
-
-Generate exactly 3 SHORT follow-up questions the user might want to ask next. Each question should be:
-- Directly relevant to their decision
-- Actionable and specific
-- Under 60 characters
-
-Format:
-1. [question]
-2. [question]  
-3. [question]'''
-                    
-                    followup_response, _ = await ai_service.get_bot_response(
-                        synthesizer_model_req,
-                        [{'role': 'user', 'content': followup_prompt}]
+                suggestions = []
+                if cached_debate:
+                    suggestions = cached_debate.followups
+                else:
+                    followups_started = time.perf_counter()
+                    started_stages.add("followups")
+                    with tracer.span("stage", stage="followups", model_requested=synthesizer_model_req) as span:
+                        try:
+                            followup_response, followup_model = await ai_service.get_bot_response(
+                                synthesizer_model_req,
+                                followup_messages(user_message, synthesizer_response),
+                                max_tokens=max_output_tokens("followups", synthesizer_model_req),
+                            )
+                        
+                            # Parse follow-up suggestions
+                            suggestions = [s.strip()[:60] for s in re.findall(r'\d\.\s*(.+)', followup_response)[:3]]
+                            followup_tokens = count_tokens(followup_response, followup_model)
+                            cancellation_stats.record_completed("followups", followup_tokens, time.perf_counter() - followups_started)
+                            span.set(model=followup_model, output_tokens=followup_tokens, suggestions=len(suggestions))
+                        except Exception as followup_error:
+                            print(f"Follow-up generation failed (non-critical): {followup_error}")
+                            span.set(status="error", error=repr(followup_error)[:200])
+
+                if suggestions:
+                    await coalescer.push({
+                        "type": "followups",
+                        "suggestions": suggestions
+                    })
+
+                stage_models = [model for _, model in openings] + [critiquer_model_res, synthesizer_model_res]
+                if SEMANTIC_CACHE_ENABLED and not cached_debate and not memory and FALLBACK_MODEL not in stage_models:
+                    stages = {
+                        f"opener:{i}": {"model": model, "text": text} for i, (text, model) in enumerate(openings)
+                    }
+                    stages["critiquer"] = {"model": critiquer_model_res, "text": critiquer_response}
+                    stages["synthesizer"] = {"model": synthesizer_model_res, "text": synthesizer_response}
+                    transcript_chars = sum(len(stage["text"] or "") for stage in stages.values()) + sum(len(s) for s in suggestions)
+                    semantic_cache.store(
+                        user_message,
+                        stages,
+                        followups=suggestions,
+                        duration=time.perf_counter() - debate_started,
+                        tokens=transcript_chars // 4,
+                        scope=cache_scope,
                     )
-                    
-                    # Parse and send follow-up suggestions
-                    import re
-                    suggestions = re.findall(r'\d\.\s*(.+)', followup_response)[:3]
-                    if suggestions:
-                        await websocket.send_json({
-                            "type": "followups",
-                            "suggestions": [s.strip()[:60] for s in suggestions]
-                        })
-                except Exception as followup_error:
-                    print(f"Follow-up generation failed (non-critical): {followup_error}")
-
-                # Save to conversation context for follow-up questions
-                conversation_context.append({
-                    'question': user_message,
-                    'answer': synthesizer_response[:200] if synthesizer_response else 'No answer'
-                })
+
+                # Remember the exchange for follow-up questions
+                memory.add(user_message, synthesizer_response)
 
                 # --- Log debate to the database ---
                 if user_id:
@@ -202,16 +465,39 @@ Format:
                         "critiquer_model": critiquer_model_res, "critiquer_response": critiquer_response,
                         "synthesizer_model": synthesizer_model_res, "synthesizer_response": synthesizer_response,
                     }
+                    if len(openings) > 1:
+                        log_entry["council_openers"] = [{"model": model, "response": text} for text, model in openings]
                     try:
-                        import asyncio
-                        await asyncio.to_thread(debate_service.create_debate, log_entry)
+                        # Written behind in batches by a background task; the socket never waits on the database
+                        queued = debate_write_queue.enqueue(log_entry)
+                        debate_span.set(persisted="queued" if queued else "dropped")
                     except Exception as db_e:
-                        print(f"Failed to log debate to DB: {db_e}")
+                        print(f"Failed to queue debate for the DB: {db_e}")
                         # Don't crash the chat if DB logging fails
+                debates_total.labels("cached" if cached_debate else "completed").inc()
             
+            except asyncio.CancelledError:
+                if not reader.disconnected.is_set():
+                    raise
+                # The reader cancelled this debate because the client left: stage tasks have already
+                # closed their upstream streams, and nothing after the current stage runs.
+                asyncio.current_task().uncancel()
+                if "task" in speculation:
+                    speculation["task"].cancel()
+                planned = [f"opener:{i}" for i in range(COUNCIL_OPENERS)] + ["critiquer", "synthesizer", "followups"]
+                cancellation_stats.debates_cancelled += 1
+                if debate_span:
+                    debate_span.set(status="cancelled")
+                debates_total.labels("cancelled").inc()
+                cancellation_stats.record_skipped(stage.split(":")[0] for stage in planned if stage not in started_stages)
+                print(f"\nClient {user_id or 'guest'} disconnected mid-debate; remaining stages cancelled.")
+                break
+
             except WebSocketDisconnect:
                 # Client disconnected gracefully - break the loop immediately
                 print(f"\nClient {user_id or 'guest'} disconnected gracefully.")
+                if debate_span:
+                    debate_span.set(status="disconnected")
                 break
             
             except Exception as e:
@@ -223,6 +509,8 @@ Format:
                 
                 # For other errors, try to send error message only if connection is still open
                 print(f"Error processing message: {e}")
+                if debate_span:
+                    debate_span.set(status="error", error=repr(e)[:200])
                 try:
                     # Check if websocket is still connected before sending
                     if websocket.client_state.name == "CONNECTED":
@@ -231,6 +519,14 @@ Format:
                     # If we can't send, connection is likely closed - break the loop
                     print(f"Connection closed, cannot send error message")
                     break
+            finally:
+                if debate_span:
+                    debate_span.end()
+                if profile_session:
+                    sampling_profiler.end(profile_session)
+                reader.cancel_on_disconnect(None)
+                if admitted:
+                    admission_controller.release()
 
     except WebSocketDisconnect:
         print(f"\nClient {user_id or 'guest'} disconnected.")
@@ -246,3 +542,7 @@ Format:
                 await websocket.close(code=1011, reason="Server error")
             except:
                 pass
+    finally:
+        websocket_sessions.dec()
+        await reader.stop()
+        await coalescer.close()
@@ -1,8 +1,20 @@
+import asyncio
+import hashlib
+import hmac
 import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
 from jose import jwt, JWTError
-from fastapi import HTTPException, status, Depends
+from fastapi import HTTPException, Header, status, Depends
 from fastapi.security import OAuth2PasswordBearer
 
+from app.core.config import supabase_client, ADMIN_TOKEN, AUTH_CACHE_MAX_ENTRIES, AUTH_CACHE_TTL_SECONDS
+from app.core.metrics import auth_remote_seconds
+from app.core.tracing import tracer
+
 # This is where your Supabase JWT secret will be stored.
 # Go to your Supabase project > Settings > API > JWT Settings and copy the secret.
 # Add it to your .env file as SUPABASE_JWT_SECRET="your-secret-key"
@@ -42,3 +54,180 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     except JWTError as e:
         print(f"JWT Error: {e}")
         raise credentials_exception
+
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Guards admin endpoints with the ADMIN_TOKEN shared secret (X-Admin-Token header)."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Admin endpoints are disabled")
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin token")
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """True when ``token`` matches ADMIN_TOKEN; always False while ADMIN_TOKEN is unset."""
+    return bool(ADMIN_TOKEN and token and hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()))
+
+
+class AuthResolver:
+    """
+    Resolves a session token to a user dict, shared by cookie and websocket auth.
+
+    Tokens signed with the configured HS256 secret are verified locally. Anything
+    else (no secret, asymmetric signing keys) goes to Supabase, but only on a cache
+    miss: resolved users live in a bounded LRU keyed by a SHA-256 of the token and
+    expire after the TTL or the token's own ``exp``, whichever comes first.
+    """
+
+    def __init__(self, secret: Optional[str] = None, max_entries: int = 1024, ttl_seconds: float = 300.0, client=None):
+        self.secret = secret
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.client = client
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.local_verifications = 0
+        self.remote_lookups = 0
+        self.remote_failures = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _cache_key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def _get_cached(self, key: str):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            user, expires_at = entry
+            if expires_at <= time.time():
+                del self._cache[key]
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return user
+
+    def _store(self, key: str, user: dict, token_exp: Optional[float]) -> None:
+        expires_at = time.time() + self.ttl_seconds
+        if token_exp:
+            expires_at = min(expires_at, token_exp)
+        with self._lock:
+            self._cache[key] = (user, expires_at)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+                self.evictions += 1
+
+    def _verify_locally(self, token: str):
+        """Returns (handled, user, exp). ``handled`` is False when the token must go to Supabase."""
+        if not self.secret:
+            return False, None, None
+        try:
+            if jwt.get_unverified_header(token).get("alg") != ALGORITHM:
+                return False, None, None
+            payload = jwt.decode(token, self.secret, algorithms=[ALGORITHM], audience=AUDIENCE)
+        except JWTError:
+            # Signed with our secret but invalid or expired: Supabase would reject it too.
+            return True, None, None
+        self.local_verifications += 1
+        if not payload.get("sub"):
+            return True, None, None
+        user = {
+            "id": payload["sub"],
+            "aud": payload.get("aud"),
+            "role": payload.get("role"),
+            "email": payload.get("email"),
+            "phone": payload.get("phone"),
+            "app_metadata": payload.get("app_metadata") or {},
+            "user_metadata": payload.get("user_metadata") or {},
+            "session_id": payload.get("session_id"),
+        }
+        return True, user, payload.get("exp")
+
+    def _fetch_remote(self, token: str):
+        self.remote_lookups += 1
+        started = time.perf_counter()
+        with tracer.span("auth.remote_lookup") as span:
+            try:
+                response = (self.client or supabase_client).auth.get_user(token)
+            except Exception as exc:
+                auth_remote_seconds.labels("error").observe(time.perf_counter() - started)
+                span.set(outcome="error", status="error", error=repr(exc)[:200])
+                self.remote_failures += 1
+                print(f"Supabase auth lookup failed: {exc}")
+                return None, None
+            if not response or not response.user:
+                auth_remote_seconds.labels("rejected").observe(time.perf_counter() - started)
+                span.set(outcome="rejected")
+                return None, None
+            auth_remote_seconds.labels("ok").observe(time.perf_counter() - started)
+            span.set(outcome="ok")
+        try:
+            exp = jwt.get_unverified_claims(token).get("exp")
+        except JWTError:
+            exp = None
+        return response.user.dict(), exp
+
+    def resolve(self, token: Optional[str]) -> Optional[dict]:
+        """Returns the user dict for a session token, or None. May block on a cache miss."""
+        if not token:
+            return None
+        key = self._cache_key(token)
+        user = self._get_cached(key)
+        if user is not None:
+            return user
+
+        handled, user, exp = self._verify_locally(token)
+        if not handled:
+            user, exp = self._fetch_remote(token)
+        if user is not None:
+            self._store(key, user, exp)
+        return user
+
+    async def resolve_async(self, token: Optional[str]) -> Optional[dict]:
+        """Like resolve, but runs the Supabase fallback off the event loop."""
+        if not token:
+            return None
+        key = self._cache_key(token)
+        user = self._get_cached(key)
+        if user is not None:
+            return user
+
+        handled, user, exp = self._verify_locally(token)
+        if not handled:
+            user, exp = await asyncio.to_thread(self._fetch_remote, token)
+        if user is not None:
+            self._store(key, user, exp)
+        return user
+
+    def invalidate(self, token: Optional[str]) -> None:
+        if not token:
+            return
+        with self._lock:
+            self._cache.pop(self._cache_key(token), None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "local_verifications": self.local_verifications,
+            "remote_lookups": self.remote_lookups,
+            "remote_failures": self.remote_failures,
+            "evictions": self.evictions,
+            "size": len(self._cache),
+        }
+
+
+auth_resolver = AuthResolver(
+    secret=JWT_SECRET,
+    max_entries=AUTH_CACHE_MAX_ENTRIES,
+    ttl_seconds=AUTH_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,192 @@
+"""
+Benchmark: thread-per-stream vs native async streaming in AIService.
+
+Simulates N concurrent debates (3 sequential streamed stages each) against a fake
+Groq provider and reports peak OS thread count plus the per-token hop latency
+between the provider emitting a delta and the on_chunk callback receiving it.
+
+Runs fully offline:
+    python -m app.benchmark_ai_streaming --debates 200 --tokens 60 --token-delay 0.005
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import threading
+import time
+from types import SimpleNamespace
+
+# The benchmark never talks to Groq or Supabase; config only needs placeholders.
+for _key, _value in {
+    "GROQ_API_KEY": "benchmark",
+    "SUPABASE_URL": "http://localhost",
+    "SUPABASE_KEY": "benchmark",
+    "DATABASE_URL": "sqlite://",
+}.items():
+    os.environ.setdefault(_key, _value)
+
+from app.services.ai_service import AIService  # noqa: E402
+
+STAGES = 3
+
+
+def _chunk(model: str, text: str):
+    return SimpleNamespace(
+        model=model,
+        choices=[SimpleNamespace(delta=SimpleNamespace(content=text))],
+        emitted_at=time.perf_counter(),
+    )
+
+
+class _SyncFakeStream:
+    def __init__(self, model, tokens, delay):
+        self.model, self.tokens, self.delay = model, tokens, delay
+
+    def __iter__(self):
+        for i in range(self.tokens):
+            time.sleep(self.delay)
+            yield _chunk(self.model, f"t{i} ")
+
+
+class _AsyncFakeStream:
+    def __init__(self, model, tokens, delay):
+        self.model, self.tokens, self.delay = model, tokens, delay
+        self.last_chunk = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for i in range(self.tokens):
+            await asyncio.sleep(self.delay)
+            self.last_chunk = _chunk(self.model, f"t{i} ")
+            yield self.last_chunk
+
+
+class _FakeCompletions:
+    def __init__(self, tokens, delay, is_async):
+        self.tokens, self.delay, self.is_async = tokens, delay, is_async
+
+    def _stream(self, model):
+        if self.is_async:
+            return _AsyncFakeStream(model, self.tokens, self.delay)
+        return _SyncFakeStream(model, self.tokens, self.delay)
+
+    def create(self, messages, model, stream=False):
+        if self.is_async:
+            async def _create():
+                return self._stream(model)
+            return _create()
+        return self._stream(model)
+
+
+def _fake_client(tokens, delay, is_async):
+    return SimpleNamespace(chat=SimpleNamespace(completions=_FakeCompletions(tokens, delay, is_async)))
+
+
+async def _legacy_stream(client, model, on_chunk):
+    """The previous AIService.stream_bot_response: one thread per stream, one loop hop per delta."""
+    loop = asyncio.get_running_loop()
+    chunk_queue: asyncio.Queue = asyncio.Queue()
+
+    def _run_stream():
+        for chunk in client.chat.completions.create(messages=[], model=model, stream=True):
+            asyncio.run_coroutine_threadsafe(
+                chunk_queue.put({"delta": chunk.choices[0].delta.content, "emitted_at": chunk.emitted_at}),
+                loop,
+            )
+        asyncio.run_coroutine_threadsafe(chunk_queue.put({"done": True}), loop)
+
+    threading.Thread(target=_run_stream, daemon=True).start()
+    while True:
+        payload = await chunk_queue.get()
+        if payload.get("done"):
+            return
+        await on_chunk(payload["delta"], model, payload["emitted_at"])
+
+
+async def _run(mode: str, debates: int, tokens: int, delay: float) -> dict:
+    hop_latencies = []
+    peak_threads = threading.active_count()
+    sampling = True
+
+    async def sample_threads():
+        nonlocal peak_threads
+        while sampling:
+            peak_threads = max(peak_threads, threading.active_count())
+            await asyncio.sleep(0.01)
+
+    if mode == "thread":
+        client = _fake_client(tokens, delay, is_async=False)
+
+        async def run_stage(stage):
+            async def on_chunk(delta, model, emitted_at):
+                hop_latencies.append(time.perf_counter() - emitted_at)
+
+            await _legacy_stream(client, f"model-{stage}", on_chunk)
+    else:
+        async def run_stage(stage):
+            # A fresh service per stage lets on_chunk see the stream's emit timestamps.
+            completions = _FakeCompletions(tokens, delay, is_async=True)
+            streams = []
+            create = completions.create
+
+            async def tracking_create(**kwargs):
+                stream = await create(**kwargs)
+                streams.append(stream)
+                return stream
+
+            async def on_chunk(delta, model):
+                hop_latencies.append(time.perf_counter() - streams[-1].last_chunk.emitted_at)
+
+            completions.create = tracking_create
+            service = AIService(client=SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+            await service.stream_bot_response(f"model-{stage}", [], on_chunk)
+
+    async def run_debate():
+        for stage in range(STAGES):
+            await run_stage(stage)
+
+    sampler = asyncio.create_task(sample_threads())
+    started = time.perf_counter()
+    await asyncio.gather(*(run_debate() for _ in range(debates)))
+    elapsed = time.perf_counter() - started
+    sampling = False
+    await sampler
+
+    hop_latencies.sort()
+    return {
+        "mode": mode,
+        "debates": debates,
+        "tokens_delivered": len(hop_latencies),
+        "wall_time_s": round(elapsed, 3),
+        "peak_threads": peak_threads,
+        "per_token_overhead_us_mean": round(statistics.fmean(hop_latencies) * 1e6, 1),
+        "per_token_overhead_us_p99": round(hop_latencies[int(len(hop_latencies) * 0.99) - 1] * 1e6, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--debates", type=int, default=200, help="Concurrent debates to simulate")
+    parser.add_argument("--tokens", type=int, default=60, help="Streamed deltas per stage")
+    parser.add_argument("--token-delay", type=float, default=0.005, help="Seconds between provider deltas")
+    parser.add_argument("--mode", choices=["thread", "async", "both"], default="both")
+    args = parser.parse_args()
+
+    modes = ["thread", "async"] if args.mode == "both" else [args.mode]
+    for mode in modes:
+        result = asyncio.run(_run(mode, args.debates, args.tokens, args.token_delay))
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
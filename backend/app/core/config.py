@@ -1,12 +1,15 @@
 import os
+import httpx
 from dotenv import load_dotenv
-from groq import Groq
+from groq import AsyncGroq, Groq
 from supabase import create_client, Client, ClientOptions
 
 load_dotenv()
 
 # --- API Clients ---
-GROQ_API_KEY = os.environ.get("GROQ_API_KEY")
+# LLM_PROVIDER=mock swaps Groq for an offline simulated provider (see MOCK_LLM_* below)
+LLM_PROVIDER = os.environ.get("LLM_PROVIDER", "groq").lower()
+GROQ_API_KEY = os.environ.get("GROQ_API_KEY") or ("mock" if LLM_PROVIDER == "mock" else None)
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
 DATABASE_URL = os.environ.get("DATABASE_URL")
@@ -22,7 +25,46 @@ if not SUPABASE_KEY:
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set")
 
+# --- Groq HTTP Pool ---
+# One pooled async HTTP client is shared by every debate stage so streams reuse
+# keep-alive connections instead of spawning a thread and socket per call.
+GROQ_MAX_CONNECTIONS = int(os.environ.get("GROQ_MAX_CONNECTIONS", "200"))
+GROQ_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("GROQ_MAX_KEEPALIVE_CONNECTIONS", "50"))
+GROQ_KEEPALIVE_EXPIRY = float(os.environ.get("GROQ_KEEPALIVE_EXPIRY", "30"))
+GROQ_CONNECT_TIMEOUT = float(os.environ.get("GROQ_CONNECT_TIMEOUT", "5"))
+GROQ_READ_TIMEOUT = float(os.environ.get("GROQ_READ_TIMEOUT", "60"))
+
 groq_client = Groq(api_key=GROQ_API_KEY)
+groq_http_client = httpx.AsyncClient(
+    limits=httpx.Limits(
+        max_connections=GROQ_MAX_CONNECTIONS,
+        max_keepalive_connections=GROQ_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=GROQ_KEEPALIVE_EXPIRY,
+    ),
+    timeout=httpx.Timeout(GROQ_READ_TIMEOUT, connect=GROQ_CONNECT_TIMEOUT),
+)
+async_groq_client = AsyncGroq(api_key=GROQ_API_KEY, http_client=groq_http_client)
+
+# --- Mock LLM Provider ---
+# Deterministic token streams with tunable latency and injected failures, for load tests and offline work.
+MOCK_LLM_TTFT_MS = float(os.environ.get("MOCK_LLM_TTFT_MS", "300"))
+MOCK_LLM_TOKEN_DELAY_MS = float(os.environ.get("MOCK_LLM_TOKEN_DELAY_MS", "20"))
+MOCK_LLM_TOKENS = int(os.environ.get("MOCK_LLM_TOKENS", "80"))
+MOCK_LLM_ERROR_RATE = float(os.environ.get("MOCK_LLM_ERROR_RATE", "0"))
+MOCK_LLM_JITTER = float(os.environ.get("MOCK_LLM_JITTER", "0.2"))
+MOCK_LLM_SEED = int(os.environ.get("MOCK_LLM_SEED", "0"))
+
+if LLM_PROVIDER == "mock":
+    from app.services.mock_llm import MockLLMClient
+
+    async_groq_client = MockLLMClient(
+        ttft=MOCK_LLM_TTFT_MS / 1000,
+        token_delay=MOCK_LLM_TOKEN_DELAY_MS / 1000,
+        tokens=MOCK_LLM_TOKENS,
+        error_rate=MOCK_LLM_ERROR_RATE,
+        jitter=MOCK_LLM_JITTER,
+        seed=MOCK_LLM_SEED,
+    )
 supabase_client: Client = create_client(
     SUPABASE_URL, 
     SUPABASE_KEY,
@@ -32,6 +74,53 @@ supabase_client: Client = create_client(
     )
 )
 
+# --- Database Pool ---
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "20"))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", "1800"))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "10"))
+
+# --- Analytics Ingestion Buffer ---
+ANALYTICS_BUFFER_MAX_EVENTS = int(os.environ.get("ANALYTICS_BUFFER_MAX_EVENTS", "10000"))
+ANALYTICS_BATCH_SIZE = int(os.environ.get("ANALYTICS_BATCH_SIZE", "500"))
+ANALYTICS_FLUSH_INTERVAL_SECONDS = float(os.environ.get("ANALYTICS_FLUSH_INTERVAL_SECONDS", "2"))
+
+# --- Semantic Answer Cache ---
+# Off by default: the embedder is feature hashing, not a semantic model, so only enable it where
+# replaying a user's own near-identical question is acceptable. Entries are never shared between users.
+SEMANTIC_CACHE_ENABLED = os.environ.get("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+SEMANTIC_CACHE_THRESHOLD = float(os.environ.get("SEMANTIC_CACHE_THRESHOLD", "0.98"))
+SEMANTIC_CACHE_TTL_SECONDS = float(os.environ.get("SEMANTIC_CACHE_TTL_SECONDS", "3600"))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.environ.get("SEMANTIC_CACHE_MAX_ENTRIES", "1000"))
+# Prompts with fewer words (numbers do not count) bypass the cache; their embeddings are too sparse to match safely
+SEMANTIC_CACHE_MIN_WORDS = int(os.environ.get("SEMANTIC_CACHE_MIN_WORDS", "3"))
+
+# --- Knowledge Retrieval (RAG) ---
+# Opt-in grounding for the opener prompt from a local document corpus (the repo docs by default).
+# Chunks further than RAG_MAX_DISTANCE (squared L2 between unit vectors, 0-2) are not injected.
+_REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+RAG_ENABLED = os.environ.get("RAG_ENABLED", "false").lower() == "true"
+RAG_CORPUS_DIR = os.environ.get("RAG_CORPUS_DIR", os.path.join(_REPO_ROOT, "docs"))
+RAG_INDEX_DIR = os.environ.get("RAG_INDEX_DIR", os.path.join(_REPO_ROOT, "backend", ".rag_index"))
+RAG_MAX_RESULTS = int(os.environ.get("RAG_MAX_RESULTS", "3"))
+RAG_MAX_DISTANCE = float(os.environ.get("RAG_MAX_DISTANCE", "1.4"))
+
+# --- Prompt Budgets ---
+# max_tokens per stage is the role's Pydantic character limits in tokens times this headroom (0 sends no max_tokens).
+PROMPT_OUTPUT_HEADROOM = float(os.environ.get("PROMPT_OUTPUT_HEADROOM", "1.3"))
+# Reasoning models spend completion tokens on thinking before they answer; they get this much on top.
+PROMPT_REASONING_TOKENS = int(os.environ.get("PROMPT_REASONING_TOKENS", "1024"))
+
+# --- Conversation Memory ---
+# Per-connection memory of earlier debates used as follow-up context: the prompt budget for
+# recalled exchanges (approximate tokens) and how many exchanges a connection keeps at most.
+CONVERSATION_MEMORY_TOKEN_BUDGET = int(os.environ.get("CONVERSATION_MEMORY_TOKEN_BUDGET", "250"))
+CONVERSATION_MEMORY_MAX_ENTRIES = int(os.environ.get("CONVERSATION_MEMORY_MAX_ENTRIES", "20"))
+
+# --- Auth Session Cache ---
+AUTH_CACHE_MAX_ENTRIES = int(os.environ.get("AUTH_CACHE_MAX_ENTRIES", "4096"))
+AUTH_CACHE_TTL_SECONDS = float(os.environ.get("AUTH_CACHE_TTL_SECONDS", "300"))
+
 # --- Model Configuration ---
 AVAILABLE_MODELS = [
     "moonshotai/kimi-k2-instruct-0905", 
@@ -39,3 +128,106 @@ AVAILABLE_MODELS = [
     "qwen/qwen3-32b",
     "llama-3.3-70b-versatile"
 ]
+
+# --- Debate Admission Control ---
+# Per-user token bucket (debates per minute, burst size; rate 0 disables it), the global cap
+# on concurrently running debates, and how many debates one user may have waiting for a slot.
+ADMISSION_RATE_PER_MINUTE = float(os.environ.get("ADMISSION_RATE_PER_MINUTE", "6"))
+ADMISSION_BURST = int(os.environ.get("ADMISSION_BURST", "3"))
+ADMISSION_MAX_CONCURRENT_DEBATES = max(1, int(os.environ.get("ADMISSION_MAX_CONCURRENT_DEBATES", "32")))
+ADMISSION_MAX_QUEUED_PER_USER = int(os.environ.get("ADMISSION_MAX_QUEUED_PER_USER", "3"))
+
+# --- Model Routing ---
+# EWMA smoothing for per-model latency/error stats, the share of picks made uniformly
+# at random, and how long a 429 keeps a model deprioritised.
+MODEL_ROUTER_EWMA_ALPHA = float(os.environ.get("MODEL_ROUTER_EWMA_ALPHA", "0.3"))
+MODEL_ROUTER_EXPLORATION = float(os.environ.get("MODEL_ROUTER_EXPLORATION", "0.1"))
+MODEL_ROUTER_RATE_LIMIT_COOLDOWN_SECONDS = float(os.environ.get("MODEL_ROUTER_RATE_LIMIT_COOLDOWN_SECONDS", "60"))
+
+# --- Stage Deadlines & Hedging ---
+# Per-role deadlines in seconds. Past the first-token deadline a hedged request goes to an
+# alternate model; past the total deadline the stage gives up and falls back.
+HEDGING_ENABLED = os.environ.get("HEDGING_ENABLED", "true").lower() == "true"
+STAGE_DEADLINES = {
+    role: {
+        "ttft": float(os.environ.get(f"{role.upper()}_TTFT_DEADLINE_SECONDS", ttft)),
+        "total": float(os.environ.get(f"{role.upper()}_TOTAL_DEADLINE_SECONDS", total)),
+    }
+    for role, (ttft, total) in {
+        "opener": ("4", "45"),
+        "critiquer": ("4", "45"),
+        "synthesizer": ("5", "60"),
+    }.items()
+}
+
+# --- WebSocket Stream Coalescing ---
+# Token deltas are merged per stage and flushed on this interval or once this many bytes are pending.
+# Set WS_FLUSH_INTERVAL_MS=0 to send every delta as its own frame.
+WS_FLUSH_INTERVAL_MS = float(os.environ.get("WS_FLUSH_INTERVAL_MS", "40"))
+WS_FLUSH_MAX_BYTES = int(os.environ.get("WS_FLUSH_MAX_BYTES", "1024"))
+# Client messages read while a debate runs are queued up to this count; a client that sends
+# more before they are handled is disconnected (close code 1008).
+WS_INBOX_MAX_MESSAGES = max(1, int(os.environ.get("WS_INBOX_MAX_MESSAGES", "16")))
+
+# --- Council Mode ---
+# Number of opener models that argue in parallel before the critique, and how many
+# of them may stream at once within a single debate.
+COUNCIL_OPENERS = max(1, int(os.environ.get("COUNCIL_OPENERS", "1")))
+COUNCIL_MAX_CONCURRENCY = max(1, int(os.environ.get("COUNCIL_MAX_CONCURRENCY", "3")))
+
+# Opt-in: start the critiquer as soon as the opener's Claim and Explanation have streamed.
+PIPELINED_CRITIQUE = os.environ.get("PIPELINED_CRITIQUE", "false").lower() == "true"
+
+# --- Tracing ---
+# Per-debate spans (stages, follow-ups, DB write, auth). TRACE_EXPORTER is "memory" (a ring
+# buffer of the last TRACE_BUFFER_SIZE traces, served under /monitoring/traces), "jsonl"
+# (appended to TRACE_JSONL_PATH) or "none". TRACE_SAMPLE_RATE is the share of debates traced.
+TRACE_EXPORTER = os.environ.get("TRACE_EXPORTER", "memory").lower()
+TRACE_SAMPLE_RATE = float(os.environ.get("TRACE_SAMPLE_RATE", "1.0"))
+TRACE_BUFFER_SIZE = int(os.environ.get("TRACE_BUFFER_SIZE", "200"))
+TRACE_JSONL_PATH = os.environ.get("TRACE_JSONL_PATH", "traces.jsonl")
+
+# --- Admin ---
+# Shared secret for /metrics and the /monitoring endpoints, sent as the X-Admin-Token header. Unset disables them.
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+# --- Event Loop Monitor ---
+# A sampler measures how late the loop wakes it every LOOP_MONITOR_INTERVAL_MS; a stall longer
+# than LOOP_BLOCK_THRESHOLD_MS gets the blocking stack captured and ranked (/monitoring/loop).
+LOOP_MONITOR_ENABLED = os.environ.get("LOOP_MONITOR_ENABLED", "true").lower() == "true"
+LOOP_MONITOR_INTERVAL_MS = float(os.environ.get("LOOP_MONITOR_INTERVAL_MS", "50"))
+LOOP_BLOCK_THRESHOLD_MS = float(os.environ.get("LOOP_BLOCK_THRESHOLD_MS", "100"))
+LOOP_MONITOR_MAX_OFFENDERS = int(os.environ.get("LOOP_MONITOR_MAX_OFFENDERS", "50"))
+
+# --- Sampling Profiler ---
+# Admin-triggered stack sampling (/monitoring/profile, X-Profile request header, websocket
+# "profile" flag). Sampling runs only while a session is open, at most PROFILER_MAX_SESSIONS at once.
+PROFILER_INTERVAL_MS = float(os.environ.get("PROFILER_INTERVAL_MS", "10"))
+PROFILER_MAX_SECONDS = float(os.environ.get("PROFILER_MAX_SECONDS", "60"))
+PROFILER_MAX_SESSIONS = int(os.environ.get("PROFILER_MAX_SESSIONS", "2"))
+PROFILER_MAX_DEPTH = int(os.environ.get("PROFILER_MAX_DEPTH", "128"))
+PROFILER_KEEP = int(os.environ.get("PROFILER_KEEP", "20"))
+
+# --- Debate Write Queue ---
+# Finished debates are queued in memory and written by a background task in multi-row batches.
+# Failed batches are retried with exponential backoff (base doubling up to the max, jittered).
+# With DEBATE_WRITE_JOURNAL_PATH set, batches that keep failing (and debates arriving while the
+# queue is full) are appended to that JSONL file and replayed once the database is back.
+DEBATE_WRITE_QUEUE_MAX = int(os.environ.get("DEBATE_WRITE_QUEUE_MAX", "5000"))
+DEBATE_WRITE_BATCH_SIZE = int(os.environ.get("DEBATE_WRITE_BATCH_SIZE", "50"))
+DEBATE_WRITE_FLUSH_INTERVAL_SECONDS = float(os.environ.get("DEBATE_WRITE_FLUSH_INTERVAL_SECONDS", "0.5"))
+DEBATE_WRITE_RETRY_BASE_SECONDS = float(os.environ.get("DEBATE_WRITE_RETRY_BASE_SECONDS", "0.5"))
+DEBATE_WRITE_RETRY_MAX_SECONDS = float(os.environ.get("DEBATE_WRITE_RETRY_MAX_SECONDS", "30"))
+DEBATE_WRITE_SPILL_AFTER_FAILURES = int(os.environ.get("DEBATE_WRITE_SPILL_AFTER_FAILURES", "3"))
+DEBATE_WRITE_JOURNAL_PATH = os.environ.get("DEBATE_WRITE_JOURNAL_PATH") or None
+# Debates the database keeps rejecting on their own (while other writes succeed) are moved here, one JSON line
+# each with the error, so they cannot block the queue. Defaults to "<journal>.dead.jsonl" next to the journal;
+# without a journal, or when set empty, they are only logged and dropped.
+_DEAD_LETTER_DEFAULT = f"{os.path.splitext(DEBATE_WRITE_JOURNAL_PATH)[0]}.dead.jsonl" if DEBATE_WRITE_JOURNAL_PATH else ""
+DEBATE_WRITE_DEAD_LETTER_PATH = os.environ.get("DEBATE_WRITE_DEAD_LETTER_PATH", _DEAD_LETTER_DEFAULT) or None
+
+# --- Rating Coalescer ---
+# Ratings are acknowledged immediately and written after this window; repeated clicks on the
+# same debate within it collapse into one UPDATE (last write wins).
+RATING_COALESCE_WINDOW_MS = float(os.environ.get("RATING_COALESCE_WINDOW_MS", "250"))
+RATING_WRITE_MAX_ATTEMPTS = int(os.environ.get("RATING_WRITE_MAX_ATTEMPTS", "3"))
@@ -0,0 +1,192 @@
+"""
+Event-loop lag monitor with a blocking-call watchdog.
+
+A sampler task sleeps for ``interval`` seconds at a time; how late it wakes up is
+the loop's scheduling delay, recorded in the ``event_loop_lag_seconds`` histogram.
+A watchdog thread watches the sampler's heartbeat. When a wake-up is overdue by
+more than ``threshold`` the loop thread is stuck in one callback, so the watchdog
+snapshots that thread's stack while it is still blocked. When the loop recovers,
+the stall's duration is charged to the innermost application coroutine on the
+stack (the ``async def`` that made a blocking call), and ``offenders()`` ranks
+those call sites by total blocked time.
+"""
+
+import asyncio
+import inspect
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Dict, List, Optional
+
+from app.core.config import LOOP_BLOCK_THRESHOLD_MS, LOOP_MONITOR_INTERVAL_MS, LOOP_MONITOR_MAX_OFFENDERS
+from app.core.metrics import event_loop_lag_seconds
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STACK_DEPTH = 12
+UNKNOWN_LOCATION = "<unknown>"
+
+
+def _location(filename: str, lineno: int, name: str, root: str) -> str:
+    return f"{os.path.relpath(filename, root)}:{lineno} in {name}"
+
+
+class _Offender:
+    __slots__ = ("location", "blocking_call", "count", "total", "max", "stack")
+
+    def __init__(self, location: str, blocking_call: str, stack: List[str]):
+        self.location = location
+        self.blocking_call = blocking_call
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.stack = stack
+
+
+class LoopMonitor:
+    def __init__(
+        self,
+        interval: float = 0.05,
+        threshold: float = 0.1,
+        max_offenders: int = 50,
+        app_root: str = APP_ROOT,
+    ):
+        self.interval = interval
+        self.threshold = threshold
+        self.max_offenders = max_offenders
+        self.app_root = app_root
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        # Written by the sampler: the tick number and when that tick's wake-up is due
+        self._tick = 0
+        self._due_at = 0.0
+        # Written by the watchdog: (tick, stack, coroutine location) captured during the current stall
+        self._captured = None
+        self._offenders: Dict[tuple, _Offender] = {}
+        self.samples = 0
+        self.stalls = 0
+        self.unattributed_stalls = 0
+        self.blocked_seconds = 0.0
+        self.max_lag = 0.0
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._due_at = time.perf_counter() + self.interval
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._sample())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    async def _sample(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            self.record(time.perf_counter() - self._due_at)
+            # The new deadline is published before the tick so the watchdog never pairs it with the old one
+            self._due_at = time.perf_counter() + self.interval
+            self._tick += 1
+
+    def record(self, lag: float) -> None:
+        """Records one wake-up delay; a stall is charged to the stack the watchdog caught, if any."""
+        lag = max(0.0, lag)
+        self.samples += 1
+        self.max_lag = max(self.max_lag, lag)
+        event_loop_lag_seconds.observe(lag)
+        if lag < self.threshold:
+            return
+        self.stalls += 1
+        self.blocked_seconds += lag
+        captured = self._captured
+        if captured is None or captured[0] != self._tick:
+            self.unattributed_stalls += 1
+            return
+        self._charge(captured[1], captured[2], lag)
+
+    def _charge(self, stack: List[traceback.FrameSummary], location: Optional[str], lag: float) -> None:
+        if location is None:
+            # No coroutine of ours on the stack (e.g. a blocking sync callback): use the innermost app frame
+            app_frames = [frame for frame in stack if frame.filename.startswith(self.app_root)]
+            location = _location(app_frames[-1].filename, app_frames[-1].lineno, app_frames[-1].name, self.app_root) if app_frames else UNKNOWN_LOCATION
+        blocking_call = f"{os.path.basename(stack[-1].filename)}:{stack[-1].lineno} in {stack[-1].name}" if stack else UNKNOWN_LOCATION
+        key = (location, blocking_call)
+        offender = self._offenders.get(key)
+        if offender is None:
+            if len(self._offenders) >= self.max_offenders:
+                # Make room by forgetting the call site that has blocked the least
+                del self._offenders[min(self._offenders, key=lambda k: self._offenders[k].total)]
+            offender = self._offenders[key] = _Offender(location, blocking_call, [])
+        offender.count += 1
+        offender.total += lag
+        offender.max = max(offender.max, lag)
+        offender.stack = [line.rstrip() for line in traceback.format_list(stack[-STACK_DEPTH:])]
+        print(f"Event loop blocked for {lag * 1000:.0f}ms at {location} ({blocking_call})")
+
+    def _watch(self) -> None:
+        poll = max(0.005, self.threshold / 4)
+        while not self._stopped.wait(poll):
+            tick = self._tick
+            overdue = time.perf_counter() - self._due_at
+            if overdue < self.threshold or (self._captured and self._captured[0] == tick):
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is not None:
+                self._captured = (tick, traceback.extract_stack(frame), self._coroutine_location(frame))
+
+    def _coroutine_location(self, frame) -> Optional[str]:
+        """The innermost application ``async def`` on the stack, read while its frames are live."""
+        while frame is not None:
+            code = frame.f_code
+            if code.co_flags & inspect.CO_COROUTINE and code.co_filename.startswith(self.app_root):
+                return _location(code.co_filename, frame.f_lineno, code.co_name, self.app_root)
+            frame = frame.f_back
+        return None
+
+    def offenders(self, limit: int = 20) -> List[dict]:
+        """Call sites that blocked the loop, most total blocked time first."""
+        ranked = sorted(self._offenders.values(), key=lambda offender: offender.total, reverse=True)
+        return [
+            {
+                "location": offender.location,
+                "blocking_call": offender.blocking_call,
+                "count": offender.count,
+                "total_blocked_ms": round(offender.total * 1000, 1),
+                "max_blocked_ms": round(offender.max * 1000, 1),
+                "stack": offender.stack,
+            }
+            for offender in ranked[:limit]
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "interval_ms": self.interval * 1000,
+            "threshold_ms": self.threshold * 1000,
+            "samples": self.samples,
+            "stalls": self.stalls,
+            "unattributed_stalls": self.unattributed_stalls,
+            "blocked_seconds": round(self.blocked_seconds, 3),
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+        }
+
+
+loop_monitor = LoopMonitor(
+    interval=LOOP_MONITOR_INTERVAL_MS / 1000,
+    threshold=LOOP_BLOCK_THRESHOLD_MS / 1000,
+    max_offenders=LOOP_MONITOR_MAX_OFFENDERS,
+)
@@ -0,0 +1,280 @@
+"""
+In-process metrics registry rendered in the Prometheus text exposition format.
+
+Counters, gauges and histograms keep their samples in plain Python numbers per
+label set; ``labels(...)`` children are cached, so recording a sample is a dict
+lookup and an addition. Hot paths should aggregate locally and record once per
+stage (e.g. tokens streamed), never once per token.
+
+Components that already keep their own ``stats()`` are exported too: each
+numeric value becomes a gauge, read when ``/metrics`` is scraped.
+"""
+
+import bisect
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+IO_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _default(self):
+        # Unlabelled metrics act as their own single child
+        return self.labels()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(child.render(self.name, self.labelnames, key))
+        return lines
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+    def render(self, name: str, labelnames, key) -> List[str]:
+        return [f"{name}{_format_labels(labelnames, key)} {_format_value(self.value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default().dec(amount)
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+
+class _Timer:
+    __slots__ = ("child", "started")
+
+    def __init__(self, child: "_HistogramValue"):
+        self.child = child
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.child.observe(time.perf_counter() - self.started)
+        return False
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self) -> _Timer:
+        """Context manager observing the elapsed seconds of its block."""
+        return _Timer(self)
+
+    def render(self, name: str, labelnames, key) -> List[str]:
+        lines, cumulative = [], 0
+        for bound, count in zip(self.bounds + (math.inf,), self.counts):
+            cumulative += count
+            le = f'le="{_format_value(bound)}"'
+            lines.append(f"{name}_bucket{_format_labels(labelnames, key, le)} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labelnames, key)} {_format_value(self.sum)}")
+        lines.append(f"{name}_count{_format_labels(labelnames, key)} {self.count}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+    def time(self) -> _Timer:
+        return self._default().time()
+
+
+class MetricsRegistry:
+    def __init__(self, namespace: str = "shurahub"):
+        self.namespace = namespace
+        self._metrics: Dict[str, _Metric] = {}
+        self._stats: List[Tuple[str, Callable[[], dict], Dict[str, Tuple[str, ...]]]] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        if not metric.labelnames:
+            metric.labels()  # so unlabelled metrics are exported as 0 before their first update
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(f"{self.namespace}_{name}", documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(f"{self.namespace}_{name}", documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(f"{self.namespace}_{name}", documentation, labelnames, buckets))
+
+    def register_stats(self, component: str, stats: Callable[[], dict], nested: Optional[Dict[str, Sequence[str]]] = None) -> None:
+        """
+        Exports a component's ``stats()`` dict as gauges named ``<namespace>_<component>_<key>``.
+        ``nested`` maps a key holding per-item dicts to the label names of its levels,
+        e.g. ``{"models": ("model",)}``; other non-numeric values are skipped.
+        """
+        self._stats.append((component, stats, {key: tuple(labels) for key, labels in (nested or {}).items()}))
+
+    def _render_stats(self) -> List[str]:
+        samples: Dict[str, List[str]] = {}
+        for component, stats, nested in self._stats:
+            try:
+                values = stats()
+            except Exception as e:
+                print(f"Metrics export for {component} failed: {e}")
+                continue
+            for key, value in values.items():
+                if key in nested:
+                    for leaf, labelvalues, leaf_value in _walk(value, len(nested[key])):
+                        name = f"{self.namespace}_{component}_{leaf}"
+                        samples.setdefault(name, []).append(
+                            f"{name}{_format_labels(nested[key], labelvalues)} {_format_value(float(leaf_value))}"
+                        )
+                elif _is_number(value):
+                    name = f"{self.namespace}_{component}_{key}"
+                    samples.setdefault(name, []).append(f"{name} {_format_value(float(value))}")
+        lines = []
+        for name, metric_lines in samples.items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.extend(metric_lines)
+        return lines
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        lines.extend(self._render_stats())
+        return "\n".join(lines) + "\n"
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not (isinstance(value, float) and math.isnan(value))
+
+
+def _walk(value, depth: int, labelvalues: Tuple[str, ...] = ()) -> Iterable[Tuple[str, Tuple[str, ...], float]]:
+    """Yields ``(leaf key, label values, number)`` from ``depth`` levels of per-item dicts."""
+    if not isinstance(value, dict):
+        return
+    for key, item in value.items():
+        if depth:
+            yield from _walk(item, depth - 1, labelvalues + (str(key),))
+        elif _is_number(item):
+            yield key, labelvalues, item
+
+
+registry = MetricsRegistry()
+
+# --- Debate pipeline ---
+llm_ttft_seconds = registry.histogram("llm_ttft_seconds", "Time to first streamed token per debate stage.", ("role", "model"))
+llm_stage_seconds = registry.histogram("llm_stage_duration_seconds", "Total duration of a debate stage.", ("role", "model"))
+llm_tokens_streamed = registry.counter("llm_tokens_streamed_total", "Token deltas streamed to clients.", ("role", "model"))
+llm_errors = registry.counter("llm_errors_total", "Failed LLM requests by model and HTTP status.", ("model", "status"))
+llm_fallbacks = registry.counter(
+    "llm_fallbacks_total",
+    "Stage fallbacks: non_streaming retries, and canned apologies sent under the fallback model label.",
+    ("kind",),
+)
+debates_total = registry.counter("debates_total", "Debates by outcome.", ("outcome",))
+websocket_sessions = registry.gauge("websocket_sessions_active", "Open debate websocket connections.")
+
+# --- Event loop ---
+event_loop_lag_seconds = registry.histogram("event_loop_lag_seconds", "How late the event loop ran a periodic timer.", (), IO_BUCKETS)
+
+# --- Dependencies ---
+db_write_seconds = registry.histogram("db_write_seconds", "Database write latency.", ("operation",), IO_BUCKETS)
+auth_remote_seconds = registry.histogram("auth_remote_seconds", "Supabase auth lookup latency.", ("outcome",), IO_BUCKETS)
@@ -0,0 +1,243 @@
+"""
+Statistical sampling profiler for a live worker.
+
+One daemon thread wakes every ``interval`` seconds, reads every other thread's
+current frame with ``sys._current_frames()`` and counts the stack it sees. No
+tracing hooks are installed, so code runs at full speed between samples; the
+cost is one stack walk per thread per tick (well under 1% of a core at 100 Hz).
+Frame labels are interned per code object, so a stack is a tuple of ints.
+Sampling is wall-clock: idle threads show up parked in ``select()`` or ``wait()``,
+and CPU-bound work is whatever the event loop thread is doing outside them.
+
+Several sessions may run at once (a timed admin profile plus per-request ones);
+they share the sampler thread, which only runs while a session is open. A
+finished session renders as collapsed stacks (``flamegraph.pl`` / speedscope
+"folded" input) or as a speedscope JSON document with one profile per thread.
+
+Samples span the whole process: a per-request profile also sees whatever else
+the worker ran while that request was in flight.
+"""
+
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Dict, List, Optional, Tuple
+
+from app.auth import is_admin_token
+from app.core.config import (
+    PROFILER_INTERVAL_MS,
+    PROFILER_KEEP,
+    PROFILER_MAX_DEPTH,
+    PROFILER_MAX_SESSIONS,
+)
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+
+class ProfilerBusy(Exception):
+    """Raised when the maximum number of concurrent profiling sessions is running."""
+
+
+class ProfileSession:
+    __slots__ = ("id", "label", "started_at", "started", "duration", "samples", "stacks")
+
+    def __init__(self, label: str):
+        self.id = secrets.token_hex(6)
+        self.label = label
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.samples = 0
+        self.stacks: Counter = Counter()
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "label": self.label,
+            "started_at": round(self.started_at, 3),
+            "duration_s": round(self.duration, 3) if self.duration is not None else None,
+            "samples": self.samples,
+        }
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = 0.01, max_depth: int = 128, max_sessions: int = 2, keep: int = 20):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.max_sessions = max_sessions
+        self._sessions: List[ProfileSession] = []
+        self._finished = deque(maxlen=keep)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop: Optional[threading.Event] = None
+        # Interned frame labels: code object -> index into _frames
+        self._frame_index: Dict[object, int] = {}
+        self._frames: List[Tuple[str, str, int]] = []
+        self.sample_seconds = 0.0
+
+    def begin(self, label: str) -> ProfileSession:
+        with self._lock:
+            if len(self._sessions) >= self.max_sessions:
+                raise ProfilerBusy(f"{len(self._sessions)} profiling sessions are already running")
+            session = ProfileSession(label)
+            self._sessions.append(session)
+            if self._thread is None:
+                # A fresh event per thread, so a sampler that is still winding down cannot be revived
+                self._stop = threading.Event()
+                self._thread = threading.Thread(target=self._run, args=(self._stop,), name="sampling-profiler", daemon=True)
+                self._thread.start()
+        return session
+
+    def end(self, session: ProfileSession) -> ProfileSession:
+        with self._lock:
+            if session in self._sessions:
+                self._sessions.remove(session)
+                session.duration = time.perf_counter() - session.started
+                self._finished.append(session)
+            if not self._sessions and self._thread is not None:
+                self._stop.set()
+                self._thread = None
+        return session
+
+    def get(self, session_id: str) -> Optional[ProfileSession]:
+        with self._lock:
+            for session in list(self._finished) + self._sessions:
+                if session.id == session_id:
+                    return session
+        return None
+
+    def recent(self) -> List[dict]:
+        with self._lock:
+            return [session.summary() for session in reversed(self._finished)]
+
+    def _run(self, stop: threading.Event) -> None:
+        own_id = threading.get_ident()
+        while not stop.wait(self.interval):
+            started = time.perf_counter()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            stacks = [
+                (names.get(thread_id, str(thread_id)), self._stack(frame))
+                for thread_id, frame in sys._current_frames().items()
+                if thread_id != own_id
+            ]
+            with self._lock:
+                for session in self._sessions:
+                    session.samples += 1
+                    session.stacks.update(stacks)
+            self.sample_seconds += time.perf_counter() - started
+
+    def _stack(self, frame) -> Tuple[int, ...]:
+        """Root-first tuple of interned frame indices, cut at ``max_depth`` frames from the leaf."""
+        indices = []
+        frame_index = self._frame_index
+        while frame is not None and len(indices) < self.max_depth:
+            code = frame.f_code
+            index = frame_index.get(code)
+            if index is None:
+                index = frame_index[code] = len(self._frames)
+                self._frames.append((code.co_name, code.co_filename, code.co_firstlineno))
+            indices.append(index)
+            frame = frame.f_back
+        indices.reverse()
+        return tuple(indices)
+
+    def _label(self, index: int) -> str:
+        name, filename, line = self._frames[index]
+        return f"{name} ({os.path.basename(filename)}:{line})"
+
+    def collapsed(self, session: ProfileSession) -> str:
+        """``thread;root;...;leaf count`` lines, heaviest first."""
+        return "".join(
+            f"{';'.join([thread] + [self._label(index) for index in stack])} {count}\n"
+            for (thread, stack), count in session.stacks.most_common()
+        )
+
+    def speedscope(self, session: ProfileSession) -> dict:
+        """A speedscope file: one sampled profile per thread, weighted in seconds."""
+        used: Dict[int, int] = {}
+        frames = []
+        profiles: Dict[str, dict] = {}
+        for (thread, stack), count in session.stacks.most_common():
+            samples = []
+            for index in stack:
+                if index not in used:
+                    used[index] = len(frames)
+                    name, filename, line = self._frames[index]
+                    frames.append({"name": name, "file": filename, "line": line})
+                samples.append(used[index])
+            profile = profiles.setdefault(thread, {
+                "type": "sampled",
+                "name": thread,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": round(session.duration or 0.0, 6),
+                "samples": [],
+                "weights": [],
+            })
+            profile["samples"].append(samples)
+            profile["weights"].append(round(count * self.interval, 6))
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": session.label,
+            "exporter": "shurahub",
+            "shared": {"frames": frames},
+            "profiles": list(profiles.values()),
+        }
+
+    def render(self, session: ProfileSession, format: str):
+        return self.speedscope(session) if format == "speedscope" else self.collapsed(session)
+
+    def stats(self) -> dict:
+        with self._lock:
+            active = len(self._sessions)
+        return {
+            "interval_ms": self.interval * 1000,
+            "active_sessions": active,
+            "finished_sessions": len(self._finished),
+            "interned_frames": len(self._frames),
+            "sample_seconds": round(self.sample_seconds, 3),
+        }
+
+
+class ProfileRequestMiddleware:
+    """
+    Profiles single HTTP requests sent with ``X-Profile: 1`` and a valid ``X-Admin-Token``.
+    The response carries ``X-Profile-Id``; fetch the result from ``/monitoring/profiles/{id}``.
+    """
+
+    def __init__(self, app, profiler: Optional[SamplingProfiler] = None):
+        self.app = app
+        self.profiler = profiler or sampling_profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = dict(scope.get("headers") or ())
+        if headers.get(b"x-profile") not in (b"1", b"true") or not is_admin_token(headers.get(b"x-admin-token", b"").decode("latin-1")):
+            return await self.app(scope, receive, send)
+        try:
+            session = self.profiler.begin(f"{scope['method']} {scope['path']}")
+        except ProfilerBusy as busy:
+            print(f"Request profiling skipped: {busy}")
+            return await self.app(scope, receive, send)
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": list(message.get("headers") or []) + [(b"x-profile-id", session.id.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            self.profiler.end(session)
+
+
+sampling_profiler = SamplingProfiler(
+    interval=PROFILER_INTERVAL_MS / 1000,
+    max_depth=PROFILER_MAX_DEPTH,
+    max_sessions=PROFILER_MAX_SESSIONS,
+    keep=PROFILER_KEEP,
+)
@@ -0,0 +1,293 @@
+"""
+Lightweight span tracing for debates.
+
+A trace is rooted at one debate (its trace id is the ``debate_id``) and collects a
+span per LLM stage, the follow-up call, the database write and Supabase auth
+lookups. The active span lives in a ``ContextVar``, so tasks created inside a
+span (council openers, hedged requests, ``asyncio.to_thread`` calls) parent their
+spans to it without passing it around.
+
+Sampling is decided once per trace; unsampled traces hand out no-op spans, so the
+cost on the hot path is a context variable lookup. Finished traces go to an
+exporter: an in-memory ring buffer (served by the admin endpoint) or a JSONL file,
+one trace per line.
+"""
+
+import asyncio
+import json
+import random
+import secrets
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Callable, List, Optional
+
+from app.core.config import TRACE_BUFFER_SIZE, TRACE_EXPORTER, TRACE_JSONL_PATH, TRACE_SAMPLE_RATE
+
+
+class _Trace:
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: List[dict] = []
+
+
+class Span:
+    """A timed operation. Use as a context manager, or ``start()`` / ``end()`` across a block."""
+
+    __slots__ = ("tracer", "trace", "name", "span_id", "parent_id", "attributes", "start_time", "_started", "_token")
+
+    def __init__(self, tracer: "Tracer", trace: _Trace, name: str, parent_id: Optional[str], attributes: dict):
+        self.tracer = tracer
+        self.trace = trace
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_time = None
+        self._started = None
+        self._token = None
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def start(self) -> "Span":
+        self.start_time = time.time()
+        self._started = time.perf_counter()
+        self._token = _current_span.set(self)
+        return self
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        if self._started is None:
+            return
+        duration = time.perf_counter() - self._started
+        self._started = None
+        _reset(self._token)
+        status = "ok"
+        if error is not None:
+            status = "cancelled" if isinstance(error, asyncio.CancelledError) else "error"
+            self.attributes.setdefault("error", repr(error)[:200])
+        self.trace.spans.append({
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": round(self.start_time, 6),
+            "duration_ms": round(duration * 1000, 3),
+            "status": self.attributes.pop("status", status),
+            "attributes": self.attributes,
+        })
+        if self.parent_id is None:
+            self.tracer._export(self.trace)
+
+    def __enter__(self) -> "Span":
+        # start_trace() hands out spans that are already running
+        return self if self._started is not None else self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.end(exc)
+        return False
+
+
+class _NoopSpan:
+    """Stands in for spans of unsampled traces; an unsampled root still becomes the current span."""
+
+    __slots__ = ("_token", "_activate")
+
+    def __init__(self, activate: bool = False):
+        self._token = None
+        self._activate = activate
+
+    def set(self, **attributes) -> None:
+        pass
+
+    def start(self) -> "_NoopSpan":
+        if self._activate:
+            self._token = _current_span.set(self)
+        return self
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        if self._token is not None:
+            _reset(self._token)
+            self._token = None
+
+    def __enter__(self) -> "_NoopSpan":
+        return self if self._token is not None else self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.end(exc)
+        return False
+
+
+_current_span: ContextVar = ContextVar("current_span", default=None)
+_NOOP = _NoopSpan()
+
+
+def _reset(token) -> None:
+    try:
+        _current_span.reset(token)
+    except ValueError:
+        # Ended from another context (e.g. a task that outlived its parent); nothing to restore
+        pass
+
+
+def current_span():
+    """The active span, or a no-op span when nothing is being traced."""
+    return _current_span.get() or _NOOP
+
+
+class RingBufferExporter:
+    """Keeps the most recent traces in memory for the admin endpoint."""
+
+    def __init__(self, max_traces: int = 200):
+        self._traces = deque(maxlen=max_traces)
+        self._lock = threading.Lock()
+
+    def export(self, trace: dict) -> None:
+        with self._lock:
+            self._traces.append(trace)
+
+    def recent(self, limit: int = 50) -> List[dict]:
+        with self._lock:
+            traces = list(self._traces)
+        return traces[::-1][:limit]
+
+    def get(self, trace_id: str) -> Optional[dict]:
+        with self._lock:
+            for trace in reversed(self._traces):
+                if trace["trace_id"] == trace_id:
+                    return trace
+        return None
+
+
+class JsonlExporter:
+    """
+    Appends one JSON line per finished trace. ``export`` only queues the trace; a
+    daemon thread serialises and appends queued traces every ``flush_interval``
+    seconds, so no file I/O happens on the event loop. Past ``max_pending``
+    unwritten traces, new ones are dropped and counted.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 1.0, max_pending: int = 10000):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = deque()
+        self._wakeup = threading.Event()
+        self._closed = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.dropped = 0
+        self.write_failures = 0
+
+    def export(self, trace: dict) -> None:
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return
+        self._pending.append(trace)
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="trace-writer", daemon=True)
+                    self._thread.start()
+
+    def _run(self) -> None:
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self) -> None:
+        traces = []
+        while self._pending:
+            traces.append(self._pending.popleft())
+        if not traces:
+            return
+        lines = "".join(json.dumps(trace, default=str) + "\n" for trace in traces)
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as handle:
+                handle.write(lines)
+        except OSError as e:
+            self.write_failures += 1
+            print(f"Failed to write {len(traces)} traces to {self.path}: {e}")
+
+    def close(self) -> None:
+        """Stops the writer thread and writes whatever is still queued."""
+        self._closed.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+
+
+class Tracer:
+    def __init__(self, exporter=None, sample_rate: float = 1.0, rng: Callable[[], float] = random.random):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self._rng = rng
+        self.traces_started = 0
+        self.traces_sampled = 0
+        self.export_failures = 0
+
+    def _root(self, name: str, trace_id: Optional[str], attributes: dict):
+        self.traces_started += 1
+        if self.exporter is None or self._rng() >= self.sample_rate:
+            return _NoopSpan(activate=True)
+        self.traces_sampled += 1
+        return Span(self, _Trace(trace_id or secrets.token_hex(16)), name, None, attributes)
+
+    def start_trace(self, name: str, trace_id: Optional[str] = None, **attributes):
+        """Starts and activates a root span; call ``end()`` on it (or use it in a ``with`` block)."""
+        return self._root(name, trace_id, attributes).start()
+
+    def span(self, name: str, **attributes):
+        """
+        A child of the active span, for use in a ``with`` block. Outside any trace the span
+        roots its own trace, so e.g. auth lookups at connection time are still sampled.
+        """
+        parent = _current_span.get()
+        if parent is None:
+            return self._root(name, None, attributes)
+        if isinstance(parent, _NoopSpan):
+            return _NOOP
+        return Span(self, parent.trace, name, parent.span_id, attributes)
+
+    def _export(self, trace: _Trace) -> None:
+        root = trace.spans[-1]
+        try:
+            self.exporter.export({
+                "trace_id": trace.trace_id,
+                "name": root["name"],
+                "start": root["start"],
+                "duration_ms": root["duration_ms"],
+                "status": root["status"],
+                "spans": sorted(trace.spans, key=lambda span: span["start"]),
+            })
+        except Exception as e:
+            self.export_failures += 1
+            print(f"Trace export failed: {e}")
+
+    def close(self) -> None:
+        if hasattr(self.exporter, "close"):
+            self.exporter.close()
+
+    def stats(self) -> dict:
+        return {
+            "exporter": type(self.exporter).__name__ if self.exporter else None,
+            "sample_rate": self.sample_rate,
+            "traces_started": self.traces_started,
+            "traces_sampled": self.traces_sampled,
+            "export_failures": self.export_failures,
+            "export_dropped": getattr(self.exporter, "dropped", 0),
+        }
+
+
+def build_exporter(kind: str):
+    if kind == "memory":
+        return RingBufferExporter(TRACE_BUFFER_SIZE)
+    if kind == "jsonl":
+        return JsonlExporter(TRACE_JSONL_PATH)
+    if kind not in ("none", ""):
+        print(f"Unknown TRACE_EXPORTER {kind!r}; tracing is disabled")
+    return None
+
+
+tracer = Tracer(build_exporter(TRACE_EXPORTER), TRACE_SAMPLE_RATE)
@@ -1,11 +1,20 @@
 import logging
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
-from sqlalchemy import JSON, Column
+from sqlalchemy import JSON, Column, Index, insert, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlmodel import SQLModel, Field, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.config import DATABASE_URL
+from app.core.config import (
+    DATABASE_URL,
+    DB_MAX_OVERFLOW,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -14,8 +23,14 @@ logger = logging.getLogger(__name__)
 # --- SQLModel Definitions ---
 class Debate(SQLModel, table=True):
     """Model for debate records."""
+    # Serves the keyset-paginated history query: WHERE user_id = ? ORDER BY timestamp DESC.
+    __table_args__ = (
+        Index("ix_debate_user_id_timestamp", "user_id", text("timestamp DESC")),
+    )
+
     debate_id: str = Field(primary_key=True)
-    user_id: str = Field(index=True)
+    # Indexed by ix_debate_user_id_timestamp, whose leading column serves user_id lookups too.
+    user_id: str
     timestamp: datetime
     user_prompt: str
     opener: Dict[str, Any] = Field(sa_column=Column(JSON))
@@ -53,18 +68,54 @@ class Visitor(SQLModel, table=True):
 
 
 # --- Database Engine & Session Management ---
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    connect_args={"connect_timeout": 5},
-    echo=False,
-)
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def _async_database_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto the matching asyncio driver."""
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+psycopg://" + url[len(prefix):]
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    return url
+
+
+def _engine_options(url: str) -> Dict[str, Any]:
+    """Pool and connect settings shared by the sync and async engines."""
+    if _is_sqlite(url):
+        return {"pool_pre_ping": True, "echo": False}
+    return {
+        "pool_pre_ping": True,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "connect_args": {"connect_timeout": 5},
+        "echo": False,
+    }
+
+
+# Sync engine for scripts and sync (threadpool) routes.
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
+
+# Async engine for code running on the event loop (websocket, async routes), so DB
+# latency never blocks streaming.
+async_engine = create_async_engine(_async_database_url(DATABASE_URL), **_engine_options(DATABASE_URL))
+async_session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
 
 
 def initialize_db() -> None:
     """Create all tables in the database."""
     try:
         SQLModel.metadata.create_all(engine)
+        # create_all skips existing tables, so add indexes introduced after the table was created.
+        for index in Debate.__table__.indexes:
+            index.create(engine, checkfirst=True)
+        # Superseded by ix_debate_user_id_timestamp; only costs writes on tables that still have it.
+        with engine.begin() as connection:
+            connection.execute(text("DROP INDEX IF EXISTS ix_debate_user_id"))
         logger.info("Database tables initialized successfully.")
     except Exception as exc:
         logger.warning(
@@ -79,6 +130,12 @@ def get_session():
         yield session
 
 
+async def get_async_session():
+    """Dependency to get an async database session."""
+    async with async_session_factory() as session:
+        yield session
+
+
 def save_feedback_entry(
     email: Optional[str],
     message: str,
@@ -144,3 +201,97 @@ def save_visitor(visitor_id: str, username: str) -> None:
             visitor_id,
             exc,
         )
+
+
+async def save_feedback_entry_async(
+    email: Optional[str],
+    message: str,
+    category: Optional[str] = None,
+    user_id: Optional[str] = None,
+) -> None:
+    """Store user feedback submissions without blocking the event loop."""
+    try:
+        feedback = Feedback(
+            email=email,
+            message=message,
+            category=category,
+            user_id=user_id,
+        )
+        async with async_session_factory() as session:
+            session.add(feedback)
+            await session.commit()
+    except Exception as exc:
+        logger.warning(
+            "Failed to save feedback entry: %s. Skipping this feedback.",
+            exc,
+        )
+
+
+async def record_analytics_event_async(
+    event_name: str,
+    metadata: Optional[Dict[str, Any]] = None,
+    user_id: Optional[str] = None,
+) -> None:
+    """Record lightweight analytics events without blocking the event loop."""
+    try:
+        event = AnalyticsEvent(
+            event_name=event_name,
+            event_data=metadata or {},
+            user_id=user_id,
+        )
+        async with async_session_factory() as session:
+            session.add(event)
+            await session.commit()
+    except Exception as exc:
+        logger.warning(
+            "Failed to record analytics event '%s': %s. Skipping this event.",
+            event_name,
+            exc,
+        )
+
+
+async def insert_analytics_events_async(rows: List[Dict[str, Any]]) -> None:
+    """Write a batch of analytics rows as a single multi-row INSERT. Raises on failure."""
+    if not rows:
+        return
+    async with async_session_factory() as session:
+        await session.execute(insert(AnalyticsEvent.__table__).values(rows))
+        await session.commit()
+
+
+async def insert_debates_async(rows: List[Dict[str, Any]]) -> None:
+    """
+    Write a batch of debate rows as a single multi-row INSERT. Raises on failure.
+    Rows whose debate_id already exists are skipped, so retrying a batch that did commit is harmless.
+    """
+    if not rows:
+        return
+    dialect = async_engine.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        statement = dialect_insert(Debate.__table__).values(rows).on_conflict_do_nothing(index_elements=["debate_id"])
+    else:
+        statement = insert(Debate.__table__).values(rows)
+    async with async_session_factory() as session:
+        await session.execute(statement)
+        await session.commit()
+
+
+async def save_visitor_async(visitor_id: str, username: str) -> None:
+    """Persist a visitor record if it does not already exist, without blocking the event loop."""
+
+    try:
+        async with async_session_factory() as session:
+            existing = await session.get(Visitor, visitor_id)
+            if existing:
+                return
+
+            visitor = Visitor(visitor_id=visitor_id, username=username)
+            session.add(visitor)
+            await session.commit()
+    except Exception as exc:
+        logger.warning(
+            "Failed to save visitor %s: %s. Skipping this visitor log.",
+            visitor_id,
+            exc,
+        )
@@ -0,0 +1,269 @@
+"""
+Load test: N concurrent /ws debate sessions against the full app, fully offline.
+
+Starts the FastAPI app under uvicorn in a background thread with the mock LLM
+provider (LLM_PROVIDER=mock) and a throwaway SQLite database, then opens N
+websocket sessions that each run one or more debates. Reports debates/sec,
+time to first frame and first token, per-stage latency percentiles, the
+server event loop's scheduling lag and RSS growth per open connection.
+
+Client and server share one process, so memory per connection includes both
+ends of the socket and absolute latencies are somewhat pessimistic; compare
+runs against each other rather than against production.
+
+    python -m app.loadtest_websocket --sessions 200 --debates 1 --ttft-ms 300 --token-delay-ms 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+
+def _percentiles(samples: list) -> dict:
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pick(pct):
+        return ordered[max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))]
+
+    return {
+        "count": len(ordered),
+        "p50_ms": round(pick(50) * 1000, 1),
+        "p95_ms": round(pick(95) * 1000, 1),
+        "p99_ms": round(pick(99) * 1000, 1),
+        "max_ms": round(ordered[-1] * 1000, 1),
+    }
+
+
+def _rss_bytes() -> int:
+    """Current resident set size; falls back to the peak RSS where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def _configure_environment(args) -> None:
+    # Everything must be set before app modules read their config at import time. Storage and
+    # Supabase are always replaced, even if exported, so synthetic debates never reach a real database.
+    workdir = tempfile.mkdtemp(prefix="shurahub-loadtest-")
+    os.environ.update({
+        "LLM_PROVIDER": "mock",
+        "MOCK_LLM_TTFT_MS": str(args.ttft_ms),
+        "MOCK_LLM_TOKEN_DELAY_MS": str(args.token_delay_ms),
+        "MOCK_LLM_TOKENS": str(args.tokens),
+        "MOCK_LLM_ERROR_RATE": str(args.error_rate),
+        "SEMANTIC_CACHE_ENABLED": "true" if args.cache else "false",
+        "SUPABASE_URL": "http://localhost",
+        "SUPABASE_KEY": "loadtest",
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'loadtest.db')}",
+        # A shared journal would be replayed into whichever database the next process uses
+        "DEBATE_WRITE_JOURNAL_PATH": "",
+        "DEBATE_WRITE_DEAD_LETTER_PATH": "",
+    })
+
+
+class _Server:
+    """Runs the app under uvicorn in a daemon thread and probes its event loop lag."""
+
+    def __init__(self, port: int, probe_interval: float):
+        import uvicorn
+        from app.main import app
+
+        self.lag_samples = []
+        self.probe_interval = probe_interval
+        app.router.on_startup.append(self._start_probe)
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", ws="auto"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    async def _start_probe(self):
+        asyncio.create_task(self._probe())
+
+    async def _probe(self):
+        while True:
+            scheduled = time.perf_counter()
+            await asyncio.sleep(self.probe_interval)
+            self.lag_samples.append(max(0.0, time.perf_counter() - scheduled - self.probe_interval))
+
+    def start(self, timeout: float = 15.0) -> None:
+        self.thread.start()
+        deadline = time.time() + timeout
+        while not self.server.started:
+            if time.time() > deadline or not self.thread.is_alive():
+                raise RuntimeError("uvicorn did not start")
+            time.sleep(0.05)
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+
+class _Results:
+    def __init__(self):
+        self.completed = 0
+        self.rate_limited = 0
+        self.queued = 0
+        self.errors = 0
+        self.first_frame = []
+        self.first_token = []
+        self.debate = []
+        self.stages = {}
+
+    def stage(self, role: str, seconds: float) -> None:
+        self.stages.setdefault(role, []).append(seconds)
+
+
+async def _run_debate(ws, prompt: str, results: _Results, followup_timeout: float) -> None:
+    sent = time.perf_counter()
+    await ws.send(json.dumps({"text": prompt}))
+    stage_started = {}
+    first_frame_seen = first_token_seen = queued_seen = False
+    while True:
+        frame = json.loads(await ws.recv())
+        now = time.perf_counter()
+        if not first_frame_seen:
+            first_frame_seen = True
+            results.first_frame.append(now - sent)
+        kind = frame.get("type")
+        key = (frame.get("role"), frame.get("index"))
+        if kind == "queued":
+            queued_seen = True
+        if kind == "rate_limited":
+            results.rate_limited += 1
+            return
+        if kind == "typing":
+            stage_started[key] = now
+        elif kind == "stream" and not first_token_seen:
+            first_token_seen = True
+            results.first_token.append(now - sent)
+        elif kind is None and frame.get("role") and key in stage_started:
+            results.stage(frame["role"], now - stage_started.pop(key))
+            if frame["role"] == "synthesizer":
+                break
+        elif kind is None and frame.get("sender") == "Shurahub" and frame.get("text", "").startswith(("Error", "Sorry")):
+            results.errors += 1
+            return
+
+    results.completed += 1
+    results.queued += int(queued_seen)
+    results.debate.append(time.perf_counter() - sent)
+    # Follow-ups arrive after the verdict; drain them so the next debate starts clean
+    try:
+        while True:
+            frame = json.loads(await asyncio.wait_for(ws.recv(), timeout=followup_timeout))
+            if frame.get("type") == "followups":
+                break
+    except asyncio.TimeoutError:
+        pass
+
+
+async def _run_clients(args, port: int) -> dict:
+    import websockets
+
+    results = _Results()
+    connected = asyncio.Barrier(args.sessions + 1)
+    go = asyncio.Event()
+
+    async def session(index: int):
+        uri = f"ws://127.0.0.1:{port}/ws?visitor_id=loadtest-{index:06d}"
+        ws = None
+        try:
+            ws = await websockets.connect(uri, max_size=None, open_timeout=60)
+        except Exception as e:
+            results.errors += 1
+            print(f"Session {index} failed to connect: {e}", file=sys.stderr)
+        # Every session is open before any debate starts, so RSS can be sampled per connection
+        await connected.wait()
+        await go.wait()
+        if ws is None:
+            return
+        try:
+            for debate in range(args.debates):
+                prompt = f"Load test {index}-{debate}: should I leave my job to open bakery number {index}?"
+                await _run_debate(ws, prompt, results, args.followup_timeout)
+        except Exception as e:
+            results.errors += 1
+            print(f"Session {index} failed: {e!r}", file=sys.stderr)
+        finally:
+            await ws.close()
+
+    rss_before = _rss_bytes()
+    tasks = [asyncio.create_task(session(index)) for index in range(args.sessions)]
+    await connected.wait()
+    rss_connected = _rss_bytes()
+    started = time.perf_counter()
+    go.set()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "wall_time_s": round(elapsed, 3),
+        "debates_completed": results.completed,
+        "debates_per_second": round(results.completed / elapsed, 2) if elapsed else 0.0,
+        "queued_before_start": results.queued,
+        "rate_limited": results.rate_limited,
+        "errors": results.errors,
+        "time_to_first_frame": _percentiles(results.first_frame),
+        "time_to_first_token": _percentiles(results.first_token),
+        "debate_latency": _percentiles(results.debate),
+        "stage_latency": {role: _percentiles(samples) for role, samples in sorted(results.stages.items())},
+        "rss_mb_before": round(rss_before / 2**20, 1),
+        "rss_mb_connected": round(rss_connected / 2**20, 1),
+        "rss_kb_per_connection": round((rss_connected - rss_before) / 1024 / max(1, args.sessions), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=100, help="Concurrent websocket sessions")
+    parser.add_argument("--debates", type=int, default=1, help="Sequential debates per session")
+    parser.add_argument("--ttft-ms", type=float, default=300, help="Mock time to first token")
+    parser.add_argument("--token-delay-ms", type=float, default=20, help="Mock delay between tokens")
+    parser.add_argument("--tokens", type=int, default=80, help="Approximate tokens per mock response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of mock requests that fail")
+    parser.add_argument("--cache", action="store_true", help="Leave the semantic answer cache enabled")
+    parser.add_argument("--followup-timeout", type=float, default=10.0, help="Seconds to wait for follow-ups after a verdict")
+    parser.add_argument("--probe-interval-ms", type=float, default=10, help="Event loop lag probe interval")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    _configure_environment(args)
+    port = _free_port()
+    server = _Server(port, args.probe_interval_ms / 1000)
+    server.start()
+    try:
+        report = asyncio.run(_run_clients(args, port))
+    finally:
+        server.stop()
+
+    report = {
+        "sessions": args.sessions,
+        "debates_per_session": args.debates,
+        "mock": {"ttft_ms": args.ttft_ms, "token_delay_ms": args.token_delay_ms, "tokens": args.tokens, "error_rate": args.error_rate},
+        **report,
+        "event_loop_lag": _percentiles(server.lag_samples),
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,26 @@
+import asyncio
 import os
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 # Removed: from dotenv import load_dotenv
 
 # Custom routers
-from app.api.routers import auth, pages, debates, engagement # Reordered pages and debates
+from app.api.routers import auth, pages, debates, engagement, metrics, monitoring # Reordered pages and debates
 from app.api import websocket
-from app.database import initialize_db
+from app.database import initialize_db, async_engine
+from app.core.config import LOOP_MONITOR_ENABLED, RAG_ENABLED, groq_http_client
+from app.core.loop_monitor import loop_monitor
+from app.core.profiler import ProfileRequestMiddleware
+from app.core.tracing import tracer
+from app.services.analytics_buffer import analytics_buffer
+from app.services.debate_write_queue import debate_write_queue
+from app.services.rating_coalescer import rating_coalescer
+from app.services.rag.knowledge_retrieval import knowledge_retrieval
 
 # Removed: load_dotenv()
 app = FastAPI()
+# X-Profile: 1 (with an admin token) profiles a single request
+app.add_middleware(ProfileRequestMiddleware)
 # Removed: print(os.getcwd())
 
 
@@ -21,9 +32,37 @@ app.include_router(pages.router)
 app.include_router(auth.router)
 app.include_router(debates.router)
 app.include_router(engagement.router)
+app.include_router(monitoring.router)
+app.include_router(metrics.router)
 app.include_router(websocket.router)
 
 
 @app.on_event("startup")
 def on_startup():
     initialize_db()
+
+
+@app.on_event("startup")
+async def start_background_workers():
+    await analytics_buffer.start()
+    # Also replays debates journaled during an earlier database outage
+    await debate_write_queue.start()
+    await rating_coalescer.start()
+    if LOOP_MONITOR_ENABLED:
+        await loop_monitor.start()
+    if RAG_ENABLED:
+        # Builds the index on first boot, afterwards just maps the persisted one
+        await knowledge_retrieval.initialize()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await analytics_buffer.stop()
+    # Ratings first, so those for still-queued debates go out with their INSERT
+    await rating_coalescer.stop()
+    await debate_write_queue.stop()
+    await loop_monitor.stop()
+    # Writes out traces still queued for the JSONL exporter
+    await asyncio.to_thread(tracer.close)
+    await groq_http_client.aclose()
+    await async_engine.dispose()
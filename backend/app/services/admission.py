@@ -0,0 +1,197 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Dict, Optional
+
+from app.core.config import (
+    ADMISSION_BURST,
+    ADMISSION_MAX_CONCURRENT_DEBATES,
+    ADMISSION_MAX_QUEUED_PER_USER,
+    ADMISSION_RATE_PER_MINUTE,
+)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a debate is refused outright; ``retry_after`` is in seconds when known."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    def __init__(self, user_key: str):
+        self.user_key = user_key
+        self.granted = asyncio.get_running_loop().create_future()
+        self.changed = asyncio.Event()
+        self.enqueued_at = time.perf_counter()
+
+
+class AdmissionController:
+    """
+    Gate in front of the debate pipeline.
+
+    Each user (account id, or client address for guests)
+    has a token bucket refilled at ``rate_per_minute`` (0 disables it) up to ``burst`` debates. At
+    most ``max_concurrent`` debates run across the process; beyond that, debates
+    wait in per-user queues that are served round-robin, so a client with many
+    queued debates cannot push a light user to the back of the line.
+    """
+
+    def __init__(self, max_concurrent: int = 32, rate_per_minute: float = 6.0, burst: int = 3, max_queued_per_user: int = 3):
+        self.max_concurrent = max_concurrent
+        self.rate_per_second = rate_per_minute / 60.0
+        self.burst = burst
+        self.max_queued_per_user = max_queued_per_user
+        self.active = 0
+        self._buckets: Dict[str, list] = {}  # user -> [tokens, updated_at]
+        self._queues: "OrderedDict[str, deque]" = OrderedDict()
+        self.admitted = 0
+        self.queued_total = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _take_token(self, user_key: str) -> Optional[float]:
+        """Consumes one token; returns None on success or the seconds until the next token."""
+        if self.rate_per_second <= 0:
+            return None
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(user_key, (float(self.burst), now))
+        tokens = min(float(self.burst), tokens + (now - updated_at) * self.rate_per_second)
+        if tokens < 1.0:
+            self._buckets[user_key] = [tokens, now]
+            return (1.0 - tokens) / self.rate_per_second
+        self._buckets[user_key] = [tokens - 1.0, now]
+        if len(self._buckets) > 10000:
+            self._prune(now)
+        return None
+
+    def _prune(self, now: float) -> None:
+        # Buckets that would have refilled completely carry no state worth keeping
+        refill_time = self.burst / self.rate_per_second
+        for user_key in [key for key, (_, updated_at) in self._buckets.items() if now - updated_at > refill_time]:
+            del self._buckets[user_key]
+
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def position(self, waiter: _Waiter) -> int:
+        """1-based place in the round-robin order: round k serves every user's k-th waiter in ring order."""
+        queue = self._queues.get(waiter.user_key)
+        if not queue or waiter not in queue:
+            return 0
+        rank = queue.index(waiter)
+        position = 1 + sum(min(len(other), rank) for other in self._queues.values())
+        for user_key, other in self._queues.items():
+            if user_key == waiter.user_key:
+                break
+            if len(other) > rank:
+                position += 1
+        return position
+
+    async def acquire(self, user_key: str, on_position: Optional[Callable[[int], Awaitable[None]]] = None) -> None:
+        """
+        Waits for a debate slot. ``on_position`` is awaited whenever the caller's queue position changes.
+        Raises AdmissionRejected when the user's bucket is empty or they already have too many queued debates.
+        """
+        admit_now = self.active < self.max_concurrent and not self._queues
+        # Checked before taking a token, so a request turned away here does not also spend one
+        if not admit_now and len(self._queues.get(user_key, ())) >= self.max_queued_per_user:
+            self.rejected += 1
+            raise AdmissionRejected("Too many debates waiting for this user.")
+
+        retry_after = self._take_token(user_key)
+        if retry_after is not None:
+            self.rejected += 1
+            raise AdmissionRejected("Too many debates in a short time.", retry_after)
+
+        if admit_now:
+            self.active += 1
+            self.admitted += 1
+            return
+
+        queue = self._queues.setdefault(user_key, deque())
+        waiter = _Waiter(user_key)
+        queue.append(waiter)
+        self.queued_total += 1
+        self._notify()
+        last_position = None
+        try:
+            while not waiter.granted.done():
+                position = self.position(waiter)
+                if on_position and position != last_position:
+                    last_position = position
+                    await on_position(position)
+                waiter.changed.clear()
+                if waiter.granted.done():
+                    break
+                changed = asyncio.ensure_future(waiter.changed.wait())
+                try:
+                    await asyncio.wait([waiter.granted, changed], return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    changed.cancel()
+        except BaseException:
+            if waiter.granted.done():
+                self.release()
+            else:
+                self._remove(waiter)
+            raise
+
+        waited = time.perf_counter() - waiter.enqueued_at
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+    def release(self) -> None:
+        self.active = max(0, self.active - 1)
+        self._dispatch()
+
+    def _remove(self, waiter: _Waiter) -> None:
+        queue = self._queues.get(waiter.user_key)
+        if queue and waiter in queue:
+            queue.remove(waiter)
+            if not queue:
+                del self._queues[waiter.user_key]
+            self._notify()
+
+    def _dispatch(self) -> None:
+        dispatched = False
+        while self.active < self.max_concurrent and self._queues:
+            user_key, queue = next(iter(self._queues.items()))
+            waiter = queue.popleft()
+            if queue:
+                self._queues.move_to_end(user_key)
+            else:
+                del self._queues[user_key]
+            self.active += 1
+            self.admitted += 1
+            waiter.granted.set_result(True)
+            dispatched = True
+        if dispatched:
+            self._notify()
+
+    def _notify(self) -> None:
+        for queue in self._queues.values():
+            for waiter in queue:
+                waiter.changed.set()
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "queued": self.queued(),
+            "queued_users": len(self._queues),
+            "max_concurrent": self.max_concurrent,
+            "admitted": self.admitted,
+            "queued_total": self.queued_total,
+            "rejected": self.rejected,
+            "avg_queue_wait_seconds": round(self.total_wait / self.queued_total, 3) if self.queued_total else 0.0,
+            "max_queue_wait_seconds": round(self.max_wait, 3),
+        }
+
+
+admission_controller = AdmissionController(
+    max_concurrent=ADMISSION_MAX_CONCURRENT_DEBATES,
+    rate_per_minute=ADMISSION_RATE_PER_MINUTE,
+    burst=ADMISSION_BURST,
+    max_queued_per_user=ADMISSION_MAX_QUEUED_PER_USER,
+)
@@ -1,79 +1,90 @@
-import asyncio
-import threading
-from typing import Callable, Awaitable
-from app.core.config import groq_client
+import time
+from typing import Callable, Awaitable, Optional
+from app.core.config import async_groq_client
+from app.core.metrics import llm_errors, llm_fallbacks
+from app.core.tracing import current_span
+from app.services.model_router import model_router
+
+# Model label reported when a non-streaming request fails and a canned apology is returned.
+FALLBACK_MODEL = "gemma-7b-it"
 
 class AIService:
-    def __init__(self):
-        self.client = groq_client
+    def __init__(self, client=None, router=None):
+        # Every instance shares the pooled AsyncGroq client by default, so requests
+        # from concurrent debates multiplex over the same keep-alive connections.
+        self.client = client or async_groq_client
+        # Latency and error samples feed the router that picks models for the next debates.
+        self.router = router or model_router
 
-    async def get_bot_response(self, model: str, conversation_history: list):
+    async def get_bot_response(self, model: str, conversation_history: list, max_tokens: Optional[int] = None):
         """Gets a response from a specified Groq model."""
         print(f"\n--- Requesting model: {model} ---")
         try:
-            chat_completion = await asyncio.to_thread(
-                self.client.chat.completions.create,
+            chat_completion = await self.client.chat.completions.create(
                 messages=conversation_history,
                 model=model,
+                **({"max_tokens": max_tokens} if max_tokens else {}),
             )
             response_model = chat_completion.model
             response_content = chat_completion.choices[0].message.content
             print(f"--- Response from: {response_model} ---")
+            # A non-streaming call has no first-token time, so only its health is recorded
+            self.router.record_success(model, None)
             return response_content, response_model
         except Exception as e:
             print(f"Error getting response from {model}: {e}")
-            return f"Sorry, I encountered an error with the {model} model.", "gemma-7b-it"
+            self.router.record_error(model, getattr(e, "status_code", None))
+            llm_errors.labels(model, getattr(e, "status_code", None) or "none").inc()
+            llm_fallbacks.labels("canned_error").inc()
+            current_span().set(fallback="canned_error", error_status=getattr(e, "status_code", None))
+            return f"Sorry, I encountered an error with the {model} model.", FALLBACK_MODEL
 
-    async def stream_bot_response(self, model: str, conversation_history: list, on_chunk: Callable[[str, str], Awaitable[None]]):
+    async def stream_bot_response(
+        self,
+        model: str,
+        conversation_history: list,
+        on_chunk: Optional[Callable[[str, str], Awaitable[None]]],
+        max_tokens: Optional[int] = None,
+    ):
         """
         Streams a response from a specified Groq model and pushes deltas through the provided callback.
-        Falls back to non-streaming if streaming fails.
+        The stream is consumed on the event loop; errors propagate so callers can fall back to non-streaming.
+        ``max_tokens`` caps the completion length when given.
         """
-        loop = asyncio.get_running_loop()
-        chunk_queue: asyncio.Queue = asyncio.Queue()
-
-        def _run_stream():
-            try:
-                stream = self.client.chat.completions.create(
-                    messages=conversation_history,
-                    model=model,
-                    stream=True,
-                )
-                active_model = model
-                for chunk in stream:
-                    active_model = chunk.model or active_model
-                    delta = chunk.choices[0].delta.content or ""
-                    if delta:
-                        asyncio.run_coroutine_threadsafe(
-                            chunk_queue.put({"delta": delta, "model": active_model}),
-                            loop,
-                        )
-                asyncio.run_coroutine_threadsafe(
-                    chunk_queue.put({"done": True, "model": active_model}),
-                    loop,
-                )
-            except Exception as exc:
-                asyncio.run_coroutine_threadsafe(
-                    chunk_queue.put({"error": str(exc)}),
-                    loop,
-                )
-
-        threading.Thread(target=_run_stream, daemon=True).start()
-
         full_text = ""
         final_model = model
+        requested_at = time.perf_counter()
+        first_token_at = None
+        chunks = 0
 
-        while True:
-            payload = await chunk_queue.get()
-
-            if "error" in payload:
-                raise Exception(payload["error"])
-
-            if payload.get("done"):
-                return full_text, payload.get("model", final_model)
+        try:
+            stream = await self.client.chat.completions.create(
+                messages=conversation_history,
+                model=model,
+                stream=True,
+                **({"max_tokens": max_tokens} if max_tokens else {}),
+            )
+            # Closing the stream releases the pooled connection even if a callback raises.
+            async with stream:
+                async for chunk in stream:
+                    final_model = chunk.model or final_model
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content or ""
+                    if delta:
+                        if first_token_at is None:
+                            first_token_at = time.perf_counter()
+                        chunks += 1
+                        full_text += delta
+                        if on_chunk:
+                            await on_chunk(delta, final_model)
+        except Exception as e:
+            self.router.record_error(model, getattr(e, "status_code", None))
+            llm_errors.labels(model, getattr(e, "status_code", None) or "none").inc()
+            raise
 
-            delta = payload.get("delta", "")
-            final_model = payload.get("model", final_model)
-            full_text += delta
-            if on_chunk:
-                await on_chunk(delta, final_model)
+        # Groq sends roughly one token per chunk, which is close enough for a rate estimate
+        ttft = first_token_at - requested_at if first_token_at is not None else None
+        streaming = time.perf_counter() - first_token_at if first_token_at is not None else 0.0
+        self.router.record_success(model, ttft, chunks, streaming)
+        return full_text, final_model
@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import (
+    ANALYTICS_BATCH_SIZE,
+    ANALYTICS_BUFFER_MAX_EVENTS,
+    ANALYTICS_FLUSH_INTERVAL_SECONDS,
+)
+from app.database import insert_analytics_events_async
+
+
+logger = logging.getLogger(__name__)
+
+
+class AnalyticsBuffer:
+    """
+    In-process ingestion buffer for analytics events.
+
+    ``enqueue`` is a non-blocking append used by the HTTP endpoint. A background
+    task drains the buffer in batches whenever ``batch_size`` events are waiting or
+    ``flush_interval`` seconds have passed, writing each batch with one multi-row
+    INSERT. Memory is bounded by ``max_events``; events past that are dropped and
+    counted rather than applying backpressure to the request path.
+    """
+
+    def __init__(
+        self,
+        writer: Callable[[List[Dict[str, Any]]], Awaitable[None]],
+        max_events: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 2.0,
+    ):
+        self.writer = writer
+        self.max_events = max_events
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._events: deque = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self.enqueued = 0
+        self.dropped = 0
+        self.flushed = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+        self.total_flush_latency = 0.0
+
+    def enqueue(self, event_name: str, metadata: Optional[Dict[str, Any]] = None, user_id: Optional[str] = None) -> bool:
+        """Buffer one event. Returns False if the buffer is full and the event was dropped."""
+        if len(self._events) >= self.max_events:
+            self.dropped += 1
+            return False
+        self._events.append({
+            "event_name": event_name,
+            "event_data": metadata or {},
+            "user_id": user_id,
+            "created_at": datetime.utcnow(),
+        })
+        self.enqueued += 1
+        if self._wakeup is not None and len(self._events) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flusher and write out everything still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._events:
+            if not await self.flush():
+                break
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while self._events:
+                await self.flush()
+                if len(self._events) < self.batch_size:
+                    break
+
+    async def flush(self) -> bool:
+        """Write up to one batch. Returns False if the write failed (the batch is dropped)."""
+        lock = self._flush_lock or asyncio.Lock()
+        async with lock:
+            batch = [self._events.popleft() for _ in range(min(self.batch_size, len(self._events)))]
+            if not batch:
+                return True
+            started = time.perf_counter()
+            try:
+                await self.writer(batch)
+            except Exception as exc:
+                self.failed += len(batch)
+                logger.warning("Failed to flush %d analytics events: %s", len(batch), exc)
+                return False
+            finally:
+                latency = time.perf_counter() - started
+                self.last_flush_latency = latency
+                self.max_flush_latency = max(self.max_flush_latency, latency)
+                self.total_flush_latency += latency
+                self.batches += 1
+            self.flushed += len(batch)
+            return True
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": len(self._events),
+            "max_events": self.max_events,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "flushed": self.flushed,
+            "failed": self.failed,
+            "batches": self.batches,
+            "last_flush_latency_ms": round(self.last_flush_latency * 1000, 2),
+            "max_flush_latency_ms": round(self.max_flush_latency * 1000, 2),
+            "avg_flush_latency_ms": round(self.total_flush_latency / self.batches * 1000, 2) if self.batches else 0.0,
+        }
+
+
+analytics_buffer = AnalyticsBuffer(
+    writer=insert_analytics_events_async,
+    max_events=ANALYTICS_BUFFER_MAX_EVENTS,
+    batch_size=ANALYTICS_BATCH_SIZE,
+    flush_interval=ANALYTICS_FLUSH_INTERVAL_SECONDS,
+)
@@ -0,0 +1,134 @@
+"""
+Disconnect-driven cancellation for debates.
+
+While a debate runs the endpoint is busy streaming and never reads from the
+socket, so a closed tab went unnoticed until the whole debate had been
+generated. ``ConnectionReader`` owns the socket's receive side for the life of
+the connection: it queues incoming messages for the endpoint and, on a
+disconnect, cancels the debate in progress. Cancellation unwinds through the
+stage tasks, which closes their upstream LLM streams. The queue is bounded: a
+client that floods frames faster than debates consume them is disconnected.
+"""
+
+import asyncio
+import json
+from typing import Dict, Iterable, Optional
+
+from fastapi import WebSocket, WebSocketDisconnect, status
+
+from app.core.config import WS_INBOX_MAX_MESSAGES
+
+
+class ConnectionReader:
+    def __init__(self, websocket: WebSocket, max_pending: int = WS_INBOX_MAX_MESSAGES):
+        self.websocket = websocket
+        self.disconnected = asyncio.Event()
+        self._inbox: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._task: Optional[asyncio.Task] = None
+        self._cancel_target: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def receive_json(self):
+        """Drop-in for ``websocket.receive_json`` that raises WebSocketDisconnect once the client is gone."""
+        message = await self._inbox.get()
+        if message is None:
+            raise WebSocketDisconnect()
+        return json.loads(message["text"] if message.get("text") is not None else message["bytes"].decode("utf-8"))
+
+    def cancel_on_disconnect(self, task: Optional[asyncio.Task]) -> None:
+        """Sets the task to cancel if the client disconnects; ``None`` clears it between debates."""
+        self._cancel_target = task
+        if task is not None and self.disconnected.is_set():
+            task.cancel()
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                message = await self.websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                try:
+                    self._inbox.put_nowait(message)
+                except asyncio.QueueFull:
+                    print(f"WebSocket client sent more than {self._inbox.maxsize} unread messages; closing")
+                    await self.websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+                    break
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"WebSocket reader stopped: {e}")
+        finally:
+            self.disconnected.set()
+            if self._cancel_target is not None:
+                self._cancel_target.cancel()
+            if self._inbox.full():
+                # The client is gone; its unread messages would only start debates nobody receives
+                while not self._inbox.empty():
+                    self._inbox.get_nowait()
+            self._inbox.put_nowait(None)
+
+
+class CancellationStats:
+    """
+    Estimates what disconnect cancellation saved.
+
+    Completed stages keep an EWMA of tokens and seconds per stage kind. A stage
+    cut short saves its expected total minus what it had already streamed; a
+    stage that never started saves its full expected cost.
+    """
+
+    def __init__(self, alpha: float = 0.2):
+        self.alpha = alpha
+        self._expected: Dict[str, Dict[str, float]] = {}
+        self.debates_cancelled = 0
+        self.stages_cancelled = 0
+        self.stages_skipped = 0
+        self.tokens_saved = 0.0
+        self.seconds_saved = 0.0
+
+    def record_completed(self, kind: str, tokens: int, seconds: float) -> None:
+        expected = self._expected.get(kind)
+        if expected is None:
+            self._expected[kind] = {"tokens": float(tokens), "seconds": seconds}
+            return
+        expected["tokens"] = self.alpha * tokens + (1 - self.alpha) * expected["tokens"]
+        expected["seconds"] = self.alpha * seconds + (1 - self.alpha) * expected["seconds"]
+
+    def record_cancelled(self, kind: str, tokens: int, seconds: float) -> None:
+        self.stages_cancelled += 1
+        expected = self._expected.get(kind)
+        if expected:
+            self.tokens_saved += max(0.0, expected["tokens"] - tokens)
+            self.seconds_saved += max(0.0, expected["seconds"] - seconds)
+
+    def record_skipped(self, kinds: Iterable[str]) -> None:
+        for kind in kinds:
+            self.stages_skipped += 1
+            expected = self._expected.get(kind)
+            if expected:
+                self.tokens_saved += expected["tokens"]
+                self.seconds_saved += expected["seconds"]
+
+    def stats(self) -> dict:
+        return {
+            "debates_cancelled": self.debates_cancelled,
+            "stages_cancelled": self.stages_cancelled,
+            "stages_skipped": self.stages_skipped,
+            "tokens_saved_estimate": int(self.tokens_saved),
+            "seconds_saved_estimate": round(self.seconds_saved, 3),
+        }
+
+
+cancellation_stats = CancellationStats()
@@ -0,0 +1,99 @@
+"""
+Per-connection memory of earlier debates, used as context for follow-up questions.
+
+Each finished debate is kept as a compact exchange (the question and the
+verdict's consensus line) plus its embedding. For a new question the most
+recent exchange is always recalled, since follow-ups usually refer to it, and
+the remaining budget goes to the earlier exchanges most similar to the question.
+Both the number of stored exchanges and the tokens injected into the prompt are
+capped, so a long-lived socket neither grows without bound nor inflates prompts.
+"""
+
+from collections import deque
+from typing import List
+
+import numpy as np
+
+from app.core.config import CONVERSATION_MEMORY_MAX_ENTRIES, CONVERSATION_MEMORY_TOKEN_BUDGET
+from app.models import SynthesisResponse
+from app.services.embeddings import STOPWORDS, HashingEmbedder
+from app.services.prompt_builder import estimate_tokens
+from app.services.structured_stream import StructuredStreamParser
+
+QUESTION_CHARS = 160
+ANSWER_CHARS = 200
+# Earlier exchanges less similar than this to the new question are not worth their tokens
+MIN_SIMILARITY = 0.15
+
+_embedder = HashingEmbedder(stopwords=STOPWORDS)
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    if len(text) <= limit:
+        return text
+    cut = text.rfind(" ", 0, limit - 1)
+    return text[:cut if cut > limit // 2 else limit - 1] + "…"
+
+
+def summarize_verdict(verdict: str) -> str:
+    """The consensus line of a synthesis when it follows the format, else the start of the text."""
+    parser = StructuredStreamParser(SynthesisResponse)
+    parser.feed(verdict or "")
+    parser.finish()
+    return _clip(parser.fields.get("consensus") or verdict or "No answer", ANSWER_CHARS)
+
+
+class _Exchange:
+    __slots__ = ("turn", "line", "tokens", "vector")
+
+    def __init__(self, turn: int, question: str, answer: str):
+        self.turn = turn
+        self.line = f"- Q: {_clip(question, QUESTION_CHARS)} → A: {answer}"
+        self.tokens = estimate_tokens(self.line) + 1
+        self.vector = _embedder.embed(f"{question} {answer}")
+
+
+class ConversationMemory:
+    def __init__(self, token_budget: int = CONVERSATION_MEMORY_TOKEN_BUDGET, max_entries: int = CONVERSATION_MEMORY_MAX_ENTRIES):
+        self.token_budget = token_budget
+        self.exchanges = deque(maxlen=max(1, max_entries))
+        self.turns = 0
+
+    def __len__(self) -> int:
+        return len(self.exchanges)
+
+    def add(self, question: str, verdict: str) -> None:
+        """Stores a finished debate; the oldest exchange is dropped once the cap is reached."""
+        self.turns += 1
+        self.exchanges.append(_Exchange(self.turns, question, summarize_verdict(verdict)))
+
+    def recall(self, question: str) -> List[_Exchange]:
+        """Exchanges to show for ``question``, oldest first, within the token budget."""
+        if not self.exchanges:
+            return []
+        latest = self.exchanges[-1]
+        chosen, used = [], 0
+        if latest.tokens <= self.token_budget:
+            chosen.append(latest)
+            used = latest.tokens
+
+        earlier = list(self.exchanges)[:-1]
+        if earlier:
+            query = _embedder.embed(question)
+            similarities = np.stack([exchange.vector for exchange in earlier]) @ query
+            for i in np.argsort(-similarities):
+                if similarities[i] < MIN_SIMILARITY:
+                    break
+                exchange = earlier[i]
+                if used + exchange.tokens <= self.token_budget:
+                    chosen.append(exchange)
+                    used += exchange.tokens
+        return sorted(chosen, key=lambda exchange: exchange.turn)
+
+    def context_for(self, question: str) -> str:
+        """Prompt section with the recalled exchanges, or an empty string."""
+        recalled = self.recall(question)
+        if not recalled:
+            return ""
+        return "\n\nPREVIOUS CONVERSATION CONTEXT:\n" + "\n".join(exchange.line for exchange in recalled)
@@ -0,0 +1,106 @@
+"""
+Helpers for the pipelined critique mode.
+
+The critiquer is started speculatively as soon as the opener's Claim and
+Explanation fields have streamed. Its frames are held in a FrameGate until the
+opener finishes; if the final opener text still has the same Claim/Explanation
+the gate is released, otherwise the speculative critique is cancelled and rerun.
+"""
+
+import re
+import time
+from typing import Awaitable, Callable, Optional
+
+_FIELD_LABEL = re.compile(
+    r"^[ \t*#-]*(Claim|Explanation|Evidence|Counterargument|Stance)\**[ \t]*:",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+def argument_prefix(text: str) -> Optional[str]:
+    """
+    Returns the Claim + Explanation block once both fields are closed, i.e. once a
+    later field label has started after Explanation. Returns None before that.
+    """
+    claim_start = None
+    explanation_seen = False
+    for match in _FIELD_LABEL.finditer(text):
+        label = match.group(1).lower()
+        if label == "claim" and claim_start is None:
+            claim_start = match.start()
+        elif label == "explanation" and claim_start is not None:
+            explanation_seen = True
+        elif explanation_seen:
+            return text[claim_start:match.start()].strip()
+    return None
+
+
+def same_prefix(a: Optional[str], b: Optional[str]) -> bool:
+    if a is None or b is None:
+        return False
+    return " ".join(a.split()) == " ".join(b.split())
+
+
+class FrameGate:
+    """Buffers frames until released, then forwards them (and all later ones) to ``send``."""
+
+    def __init__(self, send: Callable[[dict], Awaitable[None]]):
+        self.send = send
+        self.buffer = []
+        self.released = False
+        self.first_stream_at: Optional[float] = None
+
+    async def emit(self, frame: dict) -> None:
+        if self.first_stream_at is None and frame.get("type") == "stream":
+            self.first_stream_at = time.perf_counter()
+        if self.released:
+            await self.send(frame)
+        else:
+            self.buffer.append(frame)
+
+    async def release(self) -> None:
+        # Frames emitted while we await ``send`` are buffered too, so drain until nothing is left;
+        # there is no await between the final check and the flag, so none can slip in after it.
+        while self.buffer:
+            await self.send(self.buffer.pop(0))
+        self.released = True
+
+
+class PipelineStats:
+    """Running totals for speculative critiques."""
+
+    def __init__(self):
+        self.accepted = 0
+        self.restarted = 0
+        self.saved_seconds = 0.0
+
+    def record_accepted(self, requested_at: float, first_token_at: Optional[float], opener_done_at: float) -> float:
+        """
+        Records an accepted speculation and returns the time-to-first-critique-token saved.
+
+        The sequential path would have sent the same request at ``opener_done_at`` and
+        seen the same model TTFT, so its first token would land at
+        ``opener_done_at + (first_token_at - requested_at)``. The pipelined token
+        reaches the client at ``max(first_token_at, opener_done_at)``.
+        """
+        self.accepted += 1
+        if first_token_at is None:
+            return 0.0
+        sequential_first_token = opener_done_at + (first_token_at - requested_at)
+        saved = sequential_first_token - max(first_token_at, opener_done_at)
+        self.saved_seconds += saved
+        return saved
+
+    def record_restarted(self) -> None:
+        self.restarted += 1
+
+    def stats(self) -> dict:
+        return {
+            "accepted": self.accepted,
+            "restarted": self.restarted,
+            "saved_seconds_total": round(self.saved_seconds, 3),
+            "saved_seconds_avg": round(self.saved_seconds / self.accepted, 3) if self.accepted else 0.0,
+        }
+
+
+pipeline_stats = PipelineStats()
@@ -1,14 +1,54 @@
-from app.database import Debate, engine
+import base64
+import json
+import re
+from app.core.metrics import db_write_seconds
+from app.core.tracing import tracer
+from app.database import Debate, engine, async_session_factory
 from sqlmodel import Session, select
+from sqlalchemy import and_, or_, update
 from datetime import datetime
 
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+# Who is being rated -> the Debate column holding that rating
+RATING_FIELDS = {"opener": "opener_rating", "final": "final_rating"}
+
+_CONSENSUS_PATTERN = re.compile(r"Consensus:\s*(.+)", re.IGNORECASE)
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(timestamp: datetime, debate_id: str) -> str:
+    raw = json.dumps([timestamp.isoformat(), debate_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str):
+    try:
+        timestamp, debate_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(timestamp), str(debate_id)
+    except Exception as exc:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from exc
+
+
+def extract_consensus(synthesis: str):
+    """Pulls the one-line Golden Answer out of a synthesizer response."""
+    if not synthesis:
+        return None
+    match = _CONSENSUS_PATTERN.search(synthesis)
+    consensus = match.group(1) if match else synthesis
+    return consensus.strip()[:200]
+
 
 class DebateService:
     def __init__(self):
         pass
 
-    def create_debate(self, debate_data: dict):
-        """Creates a new debate entry in the database."""
+    @staticmethod
+    def _build_debate(debate_data: dict) -> Debate:
+        """Maps a flat debate log entry onto the Debate model."""
         # Ensure timestamp is in ISO format if not already
         if "timestamp" not in debate_data:
             debate_data["timestamp"] = datetime.utcnow()
@@ -35,13 +75,29 @@ class DebateService:
             },
         }
 
-        debate = Debate(**formatted_data)
-        with Session(engine) as session:
+        if debate_data.get("council_openers"):
+            formatted_data["opener"]["council"] = debate_data["council_openers"]
+
+        return Debate(**formatted_data)
+
+    def create_debate(self, debate_data: dict):
+        """Creates a new debate entry in the database."""
+        debate = self._build_debate(debate_data)
+        with tracer.span("db.create_debate"), db_write_seconds.labels("create_debate").time(), Session(engine) as session:
             session.add(debate)
             session.commit()
             session.refresh(debate)
         return debate
 
+    async def create_debate_async(self, debate_data: dict):
+        """Creates a new debate entry without blocking the event loop."""
+        debate = self._build_debate(debate_data)
+        with tracer.span("db.create_debate"), db_write_seconds.labels("create_debate").time():
+            async with async_session_factory() as session:
+                session.add(debate)
+                await session.commit()
+        return debate
+
     def get_all_debates(self, user_id: str):
         """Retrieves all debates for a specific user, ordered by timestamp."""
         with Session(engine) as session:
@@ -49,18 +105,100 @@ class DebateService:
             debates = session.exec(statement).all()
         return debates
 
-    def update_rating(self, debate_id: str, rater: str, rating: int):
-        """Updates the rating for a specific debate."""
-        rating_field = "opener_rating" if rater == "opener" else "final_rating"
+    async def get_all_debates_async(self, user_id: str):
+        """Retrieves all debates for a specific user, ordered by timestamp."""
+        async with async_session_factory() as session:
+            statement = select(Debate).where(Debate.user_id == user_id).order_by(Debate.timestamp.desc())
+            debates = (await session.exec(statement)).all()
+        return debates
 
-        with Session(engine) as session:
-            debate = session.exec(select(Debate).where(Debate.debate_id == debate_id)).first()
-            if debate:
-                setattr(debate, rating_field, rating)
-                session.add(debate)
-                session.commit()
-                session.refresh(debate)
-            return debate
+    async def list_debate_summaries_async(self, user_id: str, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None):
+        """
+        Returns one keyset-paginated page of a user's debates, newest first.
+
+        Only the summary columns are selected; the opener/critiquer JSON is never
+        loaded and only the synthesizer response text is read to extract the consensus.
+        Returns ``(items, next_cursor)`` where ``next_cursor`` is None on the last page.
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        statement = select(
+            Debate.debate_id,
+            Debate.timestamp,
+            Debate.user_prompt,
+            Debate.synthesizer["response"].as_string(),
+        ).where(Debate.user_id == user_id)
+        if cursor:
+            cursor_timestamp, cursor_id = decode_cursor(cursor)
+            statement = statement.where(
+                or_(
+                    Debate.timestamp < cursor_timestamp,
+                    and_(Debate.timestamp == cursor_timestamp, Debate.debate_id < cursor_id),
+                )
+            )
+        statement = statement.order_by(Debate.timestamp.desc(), Debate.debate_id.desc()).limit(limit + 1)
+
+        async with async_session_factory() as session:
+            rows = (await session.exec(statement)).all()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        items = [
+            {
+                "debate_id": debate_id,
+                "timestamp": timestamp.isoformat(),
+                "user_prompt": user_prompt,
+                "consensus": extract_consensus(synthesis),
+            }
+            for debate_id, timestamp, user_prompt, synthesis in rows
+        ]
+        next_cursor = encode_cursor(rows[-1][1], rows[-1][0]) if has_more else None
+        return items, next_cursor
+
+    async def get_debate_async(self, debate_id: str, user_id: str):
+        """Fetches one full debate owned by the user, or None."""
+        async with async_session_factory() as session:
+            return (await session.exec(
+                select(Debate).where(
+                    Debate.debate_id == debate_id,
+                    Debate.user_id == user_id
+                )
+            )).first()
+
+    @staticmethod
+    def _rating_update(debate_id: str, user_id: str, ratings: dict):
+        """One UPDATE for a user's own debate; ``ratings`` maps rating columns to values."""
+        return (
+            update(Debate)
+            .where(Debate.debate_id == debate_id, Debate.user_id == user_id)
+            .values(**ratings)
+        )
+
+    def update_rating(self, debate_id: str, user_id: str, rater: str, rating: int) -> bool:
+        """Sets one rating on a debate the user owns. Returns False if no such debate exists."""
+        with db_write_seconds.labels("update_rating").time(), Session(engine) as session:
+            result = session.exec(self._rating_update(debate_id, user_id, {RATING_FIELDS[rater]: rating}))
+            session.commit()
+        return result.rowcount > 0
+
+    async def update_rating_async(self, debate_id: str, user_id: str, rater: str, rating: int) -> bool:
+        """Sets one rating on a debate the user owns without blocking the event loop."""
+        unmatched = await self.update_ratings_async({(debate_id, user_id): {RATING_FIELDS[rater]: rating}})
+        return not unmatched
+
+    async def update_ratings_async(self, updates: dict) -> list:
+        """
+        Applies ``{(debate_id, user_id): {rating column: value}}`` with one UPDATE per debate,
+        all in one transaction. Returns the keys that matched no debate owned by that user.
+        """
+        unmatched = []
+        with db_write_seconds.labels("update_rating").time():
+            async with async_session_factory() as session:
+                for (debate_id, user_id), ratings in updates.items():
+                    result = await session.exec(self._rating_update(debate_id, user_id, ratings))
+                    if not result.rowcount:
+                        unmatched.append((debate_id, user_id))
+                await session.commit()
+        return unmatched
 
     def delete_debate(self, debate_id: str, user_id: str):
         """Deletes a debate for a specific user."""
@@ -76,3 +214,18 @@ class DebateService:
                 session.commit()
                 return True
             return False
+
+    async def delete_debate_async(self, debate_id: str, user_id: str):
+        """Deletes a debate for a specific user without blocking the event loop."""
+        async with async_session_factory() as session:
+            debate = (await session.exec(
+                select(Debate).where(
+                    Debate.debate_id == debate_id,
+                    Debate.user_id == user_id
+                )
+            )).first()
+            if debate:
+                await session.delete(debate)
+                await session.commit()
+                return True
+            return False
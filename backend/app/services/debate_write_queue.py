@@ -0,0 +1,422 @@
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import (
+    DEBATE_WRITE_BATCH_SIZE,
+    DEBATE_WRITE_DEAD_LETTER_PATH,
+    DEBATE_WRITE_FLUSH_INTERVAL_SECONDS,
+    DEBATE_WRITE_JOURNAL_PATH,
+    DEBATE_WRITE_QUEUE_MAX,
+    DEBATE_WRITE_RETRY_BASE_SECONDS,
+    DEBATE_WRITE_RETRY_MAX_SECONDS,
+    DEBATE_WRITE_SPILL_AFTER_FAILURES,
+)
+from app.core.metrics import db_write_seconds
+from app.database import Debate, insert_debates_async
+from app.services.debate_service import DebateService
+
+
+logger = logging.getLogger(__name__)
+
+DEBATE_COLUMNS = tuple(Debate.__table__.columns.keys())
+
+
+def debate_row(debate_data: dict) -> Dict[str, Any]:
+    """Maps a flat debate log entry onto a row dict for a multi-row INSERT."""
+    debate = DebateService._build_debate(dict(debate_data))
+    return {column: getattr(debate, column) for column in DEBATE_COLUMNS}
+
+
+class DebateWriteQueue:
+    """
+    Write-behind persistence for finished debates.
+
+    ``enqueue`` is a non-blocking append called when a debate ends. A background
+    task writes the queue in batches of up to ``batch_size`` rows with one INSERT
+    (rows already present are skipped, so a retried batch is safe). A failed batch
+    stays at the head of the queue and is retried with jittered exponential backoff.
+
+    Each failure halves the next batch, so a row the database rejects (a NUL byte,
+    an oversized field) ends up alone. A row that fails alone is moved to the back
+    of the queue; if it fails alone again after some other write has succeeded, the
+    database is fine and the row is not, so it goes to the dead-letter journal
+    (``dead_letter_path``) instead of blocking everything behind it.
+
+    With a journal path, a DB outage does not lose debates: once ``spill_after``
+    attempts in a row have failed, failing batches are appended to the JSONL
+    journal instead of being held in memory, as are debates that arrive while the
+    queue is full. The journal is replayed at startup and once writes succeed again,
+    with the same isolation of bad rows. Without a journal, debates past
+    ``max_pending`` are dropped and counted.
+    """
+
+    def __init__(
+        self,
+        writer: Callable[[List[Dict[str, Any]]], Awaitable[None]],
+        max_pending: int = 5000,
+        batch_size: int = 50,
+        flush_interval: float = 0.5,
+        retry_base: float = 0.5,
+        retry_max: float = 30.0,
+        spill_after: int = 3,
+        journal_path: Optional[str] = None,
+        dead_letter_path: Optional[str] = None,
+    ):
+        self.writer = writer
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.spill_after = spill_after
+        self.journal_path = journal_path
+        self.dead_letter_path = dead_letter_path
+        self._pending: deque = deque()
+        # Rows for a full queue, waiting to be journaled off the event loop
+        self._overflow: List[Dict[str, Any]] = []
+        self._overflow_task: Optional[asyncio.Task] = None
+        # debate_ids in the journal (or being written to it), i.e. not in the database yet
+        self._journaled: set = set()
+        self._batch_limit = batch_size
+        # debate_id -> successful writes so far, when that row first failed on its own
+        self._solo_failures: Dict[str, int] = {}
+        self._successful_writes = 0
+        # debate_ids of the batch currently being written
+        self._in_flight: frozenset = frozenset()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._journal_lock = threading.Lock()
+        # Whether the journal may hold rows that still need replaying
+        self._journal_pending = bool(journal_path)
+        # Consecutive failed writes; drives the backoff and the switch to spilling
+        self._failures = 0
+        self.enqueued = 0
+        self.dropped = 0
+        self.flushed = 0
+        self.batches = 0
+        self.failed_attempts = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.dead_lettered = 0
+        self.last_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+
+    def enqueue(self, debate_data: dict) -> bool:
+        """Queue one finished debate. Returns False if it was dropped because the queue is full."""
+        row = debate_row(debate_data)
+        if len(self._pending) >= self.max_pending:
+            if self.journal_path and len(self._overflow) < self.max_pending:
+                # Only reached while the database is down; the file append runs in a thread
+                self._overflow.append(row)
+                self.enqueued += 1
+                if self._overflow_task is None or self._overflow_task.done():
+                    self._overflow_task = asyncio.get_running_loop().create_task(self._spill_overflow())
+                return True
+            self.dropped += 1
+            logger.warning("Debate write queue is full; dropped debate %s", row["debate_id"])
+            return False
+        self._pending.append(row)
+        self.enqueued += 1
+        if self._wakeup is not None and len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def apply_ratings(self, debate_id: str, user_id: str, ratings: Dict[str, int]) -> bool:
+        """
+        Sets rating columns on a debate that is still queued, so they go out with its INSERT.
+        Returns False if the debate is not queued for that user (written already, journaled, or not theirs).
+        """
+        for row in itertools.chain(self._pending, self._overflow):
+            if row["debate_id"] == debate_id:
+                if row["user_id"] != user_id:
+                    return False
+                row.update(ratings)
+                return True
+        return False
+
+    def is_writing(self, debate_id: str) -> bool:
+        """True while the batch holding this debate is being inserted."""
+        return debate_id in self._in_flight
+
+    def is_journaled(self, debate_id: str) -> bool:
+        """True while the debate sits in the journal, waiting to be replayed."""
+        return debate_id in self._journaled
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run())
+
+    async def _spill_overflow(self) -> None:
+        while self._overflow:
+            rows, self._overflow = self._overflow, []
+            try:
+                await self._journal(rows)
+            except OSError as exc:
+                self.dropped += len(rows)
+                logger.warning("Failed to journal %d debates from the full queue; they are lost: %s", len(rows), exc)
+
+    async def stop(self) -> None:
+        """Stop the writer and try once more to write everything still queued; journal what cannot be."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._overflow_task is not None:
+            await self._overflow_task
+            self._overflow_task = None
+        while self._pending:
+            if not await self.flush():
+                break
+        if self._pending:
+            rows = list(self._pending)
+            self._pending.clear()
+            if self.journal_path:
+                await self._journal(rows)
+            else:
+                self.dropped += len(rows)
+                logger.warning("Shutting down with %d unwritten debates and no journal; they are lost", len(rows))
+
+    async def _run(self) -> None:
+        while True:
+            if self._journal_pending and not await self._replay_journal():
+                await asyncio.sleep(self.retry_delay())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while self._pending:
+                if not await self.flush():
+                    await asyncio.sleep(self.retry_delay())
+                elif len(self._pending) < self.batch_size:
+                    break
+
+    def retry_delay(self) -> float:
+        """Exponential backoff on consecutive failures, jittered so workers do not retry in lockstep."""
+        delay = min(self.retry_max, self.retry_base * 2 ** max(0, self._failures - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def flush(self) -> bool:
+        """
+        Write up to one batch. Returns False if the write failed; the batch is then kept
+        in the queue (and the next batch halved), dead-lettered if it is a single row that
+        keeps failing while other writes succeed, or journaled once ``spill_after``
+        attempts in a row have failed.
+        """
+        lock = self._flush_lock or asyncio.Lock()
+        async with lock:
+            batch = [self._pending.popleft() for _ in range(min(self._batch_limit, len(self._pending)))]
+            if not batch:
+                return True
+            started = time.perf_counter()
+            self._in_flight = frozenset(row["debate_id"] for row in batch)
+            try:
+                await self.writer(batch)
+            except Exception as exc:
+                self.failed_attempts += 1
+                self._failures += 1
+                logger.warning("Failed to write %d debates (attempt %d): %s", len(batch), self._failures, exc)
+                if len(batch) == 1 and self._is_poison(batch[0]):
+                    await self._dead_letter(batch[0], exc)
+                elif not await self._spill_failed(batch):
+                    if len(batch) == 1:
+                        # Let the rows behind it through; they also show whether the database is up
+                        self._pending.append(batch[0])
+                    else:
+                        self._pending.extendleft(reversed(batch))
+                        self._batch_limit = max(1, len(batch) // 2)
+                return False
+            finally:
+                self._in_flight = frozenset()
+                latency = time.perf_counter() - started
+                db_write_seconds.labels("insert_debates").observe(latency)
+                self.last_flush_latency = latency
+                self.max_flush_latency = max(self.max_flush_latency, latency)
+                self.batches += 1
+            self._failures = 0
+            self._batch_limit = min(self.batch_size, self._batch_limit * 2)
+            self._record_success(batch)
+            self.flushed += len(batch)
+            return True
+
+    def _record_success(self, batch: List[Dict[str, Any]]) -> None:
+        self._successful_writes += 1
+        if self._solo_failures:
+            for row in batch:
+                self._solo_failures.pop(row["debate_id"], None)
+
+    def _is_poison(self, row: Dict[str, Any]) -> bool:
+        """True if this row already failed on its own and another write has succeeded since."""
+        failed_at = self._solo_failures.setdefault(row["debate_id"], self._successful_writes)
+        if failed_at < self._successful_writes:
+            del self._solo_failures[row["debate_id"]]
+            return True
+        return False
+
+    async def _dead_letter(self, row: Dict[str, Any], error: Exception) -> None:
+        self.dead_lettered += 1
+        self._journaled.discard(row["debate_id"])
+        if not self.dead_letter_path:
+            logger.error("Debate %s keeps failing on its own and there is no dead-letter journal; it is lost: %s", row["debate_id"], error)
+            return
+        entry = {"error": repr(error)[:500], "failed_at": datetime.utcnow().isoformat(), "row": {**row, "timestamp": row["timestamp"].isoformat()}}
+        try:
+            await asyncio.to_thread(self._append_line, self.dead_letter_path, json.dumps(entry) + "\n")
+        except OSError as exc:
+            logger.error("Failed to dead-letter debate %s; it is lost: %s", row["debate_id"], exc)
+            return
+        logger.error("Moved debate %s to the dead-letter journal %s: %s", row["debate_id"], self.dead_letter_path, error)
+
+    def _append_line(self, path: str, line: str) -> None:
+        with self._journal_lock, open(path, "a", encoding="utf-8") as journal:
+            journal.write(line)
+
+    async def _spill_failed(self, batch: List[Dict[str, Any]]) -> bool:
+        if not self.journal_path or self._failures < self.spill_after:
+            return False
+        try:
+            await self._journal(batch)
+        except OSError as exc:
+            logger.warning("Failed to journal %d debates: %s", len(batch), exc)
+            return False
+        return True
+
+    async def _journal(self, rows: List[Dict[str, Any]]) -> None:
+        ids = [row["debate_id"] for row in rows]
+        # Registered before the thread starts, so the rows never look unwritten and unqueued at once
+        self._journaled.update(ids)
+        try:
+            await asyncio.to_thread(self._spill, rows)
+        except BaseException:
+            self._journaled.difference_update(ids)
+            raise
+
+    def _spill(self, rows: List[Dict[str, Any]]) -> None:
+        lines = "".join(
+            json.dumps({**row, "timestamp": row["timestamp"].isoformat()}) + "\n" for row in rows
+        )
+        self._append_line(self.journal_path, lines)
+        self.spilled += len(rows)
+        self._journal_pending = True
+
+    def _claim_journal(self) -> Optional[str]:
+        """
+        Moves the journal aside for replay so new spills go to a fresh file. A replay file
+        left by an interrupted replay is replayed first; re-inserting its rows is harmless.
+        """
+        replaying = f"{self.journal_path}.replay"
+        if os.path.exists(replaying):
+            return replaying
+        with self._journal_lock:
+            if not os.path.exists(self.journal_path) or not os.path.getsize(self.journal_path):
+                self._journal_pending = False
+                return None
+            os.replace(self.journal_path, replaying)
+        return replaying
+
+    @staticmethod
+    def _read_journal(path: str) -> List[Dict[str, Any]]:
+        rows = []
+        with open(path, encoding="utf-8") as journal:
+            for line in journal:
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    # A line cut short by a crash mid-append
+                    logger.warning("Skipping an unreadable line in the debate journal")
+                    continue
+                row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+                rows.append(row)
+        return rows
+
+    async def _replay_journal(self) -> bool:
+        """Writes journaled rows back to the database. Returns False if that failed (it is retried later)."""
+        try:
+            path = await asyncio.to_thread(self._claim_journal)
+            if path is None:
+                return True
+            rows = await asyncio.to_thread(self._read_journal, path)
+            # Rows journaled by an earlier process are registered here
+            self._journaled.update(row["debate_id"] for row in rows)
+            for start in range(0, len(rows), self.batch_size):
+                await self._replay_batch(rows[start:start + self.batch_size])
+            await asyncio.to_thread(os.remove, path)
+        except Exception as exc:
+            self._failures += 1
+            logger.warning("Debate journal replay failed, will retry: %s", exc)
+            return False
+        self._failures = 0
+        self._journaled.difference_update(row["debate_id"] for row in rows)
+        self.replayed += len(rows)
+        logger.info("Replayed %d journaled debates", len(rows))
+        return True
+
+    async def _replay_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """Writes one journaled batch; if it fails, row by row, dead-lettering rows that fail on their own."""
+        if len(batch) > 1:
+            try:
+                await self.writer(batch)
+                self._record_success(batch)
+                return
+            except Exception:
+                pass
+        for row in batch:
+            try:
+                await self.writer([row])
+                self._record_success([row])
+            except Exception as exc:
+                if not self._is_poison(row):
+                    # Possibly an outage: stop here, the replay is retried after a backoff
+                    raise
+                await self._dead_letter(row, exc)
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": len(self._pending),
+            "max_pending": self.max_pending,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "flushed": self.flushed,
+            "batches": self.batches,
+            "failed_attempts": self.failed_attempts,
+            "consecutive_failures": self._failures,
+            "spilled": self.spilled,
+            "replayed": self.replayed,
+            "dead_lettered": self.dead_lettered,
+            "batch_limit": self._batch_limit,
+            "journal_enabled": bool(self.journal_path),
+            "journaled_debates": len(self._journaled),
+            "last_flush_latency_ms": round(self.last_flush_latency * 1000, 2),
+            "max_flush_latency_ms": round(self.max_flush_latency * 1000, 2),
+        }
+
+
+debate_write_queue = DebateWriteQueue(
+    writer=insert_debates_async,
+    max_pending=DEBATE_WRITE_QUEUE_MAX,
+    batch_size=DEBATE_WRITE_BATCH_SIZE,
+    flush_interval=DEBATE_WRITE_FLUSH_INTERVAL_SECONDS,
+    retry_base=DEBATE_WRITE_RETRY_BASE_SECONDS,
+    retry_max=DEBATE_WRITE_RETRY_MAX_SECONDS,
+    spill_after=DEBATE_WRITE_SPILL_AFTER_FAILURES,
+    journal_path=DEBATE_WRITE_JOURNAL_PATH,
+    dead_letter_path=DEBATE_WRITE_DEAD_LETTER_PATH,
+)
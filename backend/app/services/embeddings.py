@@ -0,0 +1,62 @@
+"""
+Dependency-light text embeddings for similarity lookups.
+
+Uses signed feature hashing over word unigrams and bigrams, so vectors are
+deterministic, need no model download and cost microseconds per prompt. Good
+enough to catch near-duplicate questions; not a semantic model.
+"""
+
+import hashlib
+import re
+import unicodedata
+
+import numpy as np
+
+# Words in any script (Arabic included), not just ASCII
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Function words that dominate short questions ("what is the ...") without saying what they are about.
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from has have how i if in is it its of on or "
+    "should so that the their this to was what when where which who why will with you your".split()
+)
+
+
+def tokenize(text: str) -> list:
+    # Combining marks (Arabic harakat, Latin accents) are dropped so voweled and bare spellings match
+    folded = "".join(char for char in unicodedata.normalize("NFKD", text.lower()) if not unicodedata.combining(char))
+    return _TOKEN_PATTERN.findall(folded)
+
+
+def word_count(text: str) -> int:
+    """Tokens that contain a letter, i.e. not bare numbers or underscores."""
+    return sum(1 for token in tokenize(text) if any(char.isalpha() for char in token))
+
+
+class HashingEmbedder:
+    def __init__(self, dimension: int = 384, stopwords: frozenset = frozenset()):
+        self.dimension = dimension
+        self.stopwords = stopwords
+
+    def _bucket(self, feature: str):
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        return value % self.dimension, 1.0 if (value >> 63) & 1 else -1.0
+
+    def embed(self, text: str) -> np.ndarray:
+        """Returns an L2-normalised float32 vector (all zeros for empty text)."""
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        tokens = [token for token in tokenize(text) if token not in self.stopwords]
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        for feature in features:
+            index, sign = self._bucket(feature)
+            vector[index] += sign
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+    def embed_batch(self, texts: list) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        return np.stack([self.embed(text) for text in texts])
@@ -0,0 +1,87 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+
+class FrameCoalescer:
+    """
+    Per-connection coalescer for websocket stream frames.
+
+    Consecutive ``{"type": "stream"}`` deltas for the same (sender, role, index)
+    are merged into one frame and flushed every ``flush_interval`` seconds or once
+    ``max_bytes`` of text is pending, whichever comes first. The frame schema is
+    unchanged: clients simply receive fewer, longer ``text`` deltas. Any other frame
+    flushes pending text first, so per-stage ordering is preserved.
+
+    Backpressure: when the pending text reaches ``max_bytes`` the producer awaits
+    the flush, which waits on the socket send. A slow client therefore slows the
+    upstream stream reader instead of growing the buffer.
+    """
+
+    def __init__(self, send: Callable[[dict], Awaitable[None]], flush_interval: float = 0.04, max_bytes: int = 1024):
+        self.send = send
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self._pending: Dict[Tuple, dict] = {}
+        self._pending_bytes = 0
+        self._flush_lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+        self.frames_in = 0
+        self.frames_out = 0
+
+    async def start(self) -> None:
+        if self.flush_interval > 0 and self._timer is None:
+            self._timer = asyncio.create_task(self._flush_periodically())
+
+    async def close(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            try:
+                await self._timer
+            except asyncio.CancelledError:
+                pass
+            self._timer = None
+        try:
+            await self.flush()
+        except Exception:
+            # The socket is usually already gone when a connection closes.
+            self._pending.clear()
+            self._pending_bytes = 0
+
+    async def push(self, frame: dict) -> None:
+        self.frames_in += 1
+        if frame.get("type") != "stream" or self.flush_interval <= 0:
+            await self.flush()
+            await self._send(frame)
+            return
+
+        key = (frame.get("sender"), frame.get("role"), frame.get("index"))
+        pending = self._pending.get(key)
+        if pending is None:
+            self._pending[key] = dict(frame)
+        else:
+            pending["text"] += frame["text"]
+        self._pending_bytes += len(frame["text"])
+        if self._pending_bytes >= self.max_bytes:
+            await self.flush()
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            frames = list(self._pending.values())
+            self._pending.clear()
+            self._pending_bytes = 0
+            for frame in frames:
+                await self._send(frame)
+
+    async def _send(self, frame: dict) -> None:
+        self.frames_out += 1
+        await self.send(frame)
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as exc:
+                print(f"Frame flush failed: {exc}")
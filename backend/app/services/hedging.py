@@ -0,0 +1,157 @@
+"""
+Hedged streaming for debate stages.
+
+A stage streams from its primary model. If no token has arrived when the
+role's first-token deadline passes (or the primary fails before its first
+token), a second request goes to an alternate model. Whichever attempt
+produces a token first wins; the other task is cancelled, which closes its
+upstream HTTP stream.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+StreamFn = Callable[[str, list, Callable[[str, str], Awaitable[None]]], Awaitable[Tuple[str, str]]]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for no samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+class StageLatencyTracker:
+    """Recent stage durations per role, split by whether hedging was enabled for the stage."""
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._samples: Dict[Tuple[str, bool], deque] = {}
+        self.hedges_fired = 0
+        self.hedges_won = 0
+        self.deadline_timeouts = 0
+
+    def record(self, role: str, seconds: float, hedging: bool) -> None:
+        key = (role, hedging)
+        if key not in self._samples:
+            self._samples[key] = deque(maxlen=self.window)
+        self._samples[key].append(seconds)
+
+    def stats(self) -> dict:
+        stages = {}
+        for (role, hedging), samples in sorted(self._samples.items()):
+            values = list(samples)
+            stages.setdefault(role, {})["hedging_on" if hedging else "hedging_off"] = {
+                "count": len(values),
+                "p50": round(percentile(values, 50), 3),
+                "p95": round(percentile(values, 95), 3),
+                "p99": round(percentile(values, 99), 3),
+            }
+        return {
+            "hedges_fired": self.hedges_fired,
+            "hedges_won": self.hedges_won,
+            "deadline_timeouts": self.deadline_timeouts,
+            "stages": stages,
+        }
+
+
+stage_latency = StageLatencyTracker()
+
+
+async def hedged_stream(
+    stream: StreamFn,
+    model: str,
+    history: list,
+    on_chunk: Callable[[str, str], Awaitable[None]],
+    ttft_deadline: float,
+    pick_alternate: Optional[Callable[[], Optional[str]]] = None,
+    on_abandoned: Optional[Callable[[str, float], None]] = None,
+    tracker: StageLatencyTracker = stage_latency,
+) -> Tuple[str, str]:
+    """
+    Streams ``model`` and hedges to ``pick_alternate()`` once ``ttft_deadline`` passes without a token.
+
+    Only the winning attempt's deltas reach ``on_chunk``. ``on_abandoned(model, waited)`` is told
+    about an attempt that was cancelled because another one answered first. Errors after the first
+    token propagate unchanged; if every attempt fails before a token, the last error is raised.
+    """
+    started = time.perf_counter()
+    attempts: List[Tuple[asyncio.Task, str, float]] = []
+    first_token = asyncio.Event()
+    winner: Optional[int] = None
+    hedge_deadline = started + ttft_deadline
+    can_hedge = pick_alternate is not None
+    last_error: Optional[BaseException] = None
+
+    def chunk_handler(index: int):
+        async def handler(delta: str, sender: str):
+            nonlocal winner
+            if winner is None:
+                winner = index
+                first_token.set()
+            if winner == index:
+                await on_chunk(delta, sender)
+        return handler
+
+    def launch(model_name: str) -> None:
+        index = len(attempts)
+        task = asyncio.create_task(stream(model_name, history, chunk_handler(index)))
+        attempts.append((task, model_name, time.perf_counter()))
+
+    def hedge() -> bool:
+        nonlocal can_hedge
+        can_hedge = False
+        alternate = pick_alternate()
+        if not alternate:
+            return False
+        tracker.hedges_fired += 1
+        print(f"Hedging {model} with {alternate} after {time.perf_counter() - started:.2f}s without a token")
+        launch(alternate)
+        return True
+
+    launch(model)
+    try:
+        while winner is None:
+            live = [task for task, _, _ in attempts if not task.done()]
+            if not live:
+                if can_hedge and hedge():
+                    continue
+                raise last_error or RuntimeError(f"No response from {model}")
+
+            timeout = max(0.0, hedge_deadline - time.perf_counter()) if can_hedge else None
+            claimed = asyncio.create_task(first_token.wait())
+            done, _ = await asyncio.wait(live + [claimed], timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            claimed.cancel()
+            if winner is not None:
+                break
+            if not done:
+                hedge()
+                continue
+            for index, (task, _, _) in enumerate(attempts):
+                if task in done:
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                        print(f"Attempt on {attempts[index][1]} failed before its first token: {last_error}")
+                    elif winner is None:
+                        # Finished without a single delta (empty answer) - still an answer
+                        winner = index
+
+        for index, (task, model_name, launched_at) in enumerate(attempts):
+            if index != winner and not task.done():
+                task.cancel()
+                if on_abandoned:
+                    on_abandoned(model_name, time.perf_counter() - launched_at)
+        if winner > 0:
+            tracker.hedges_won += 1
+        return await attempts[winner][0]
+    finally:
+        # Covers both the losers and every attempt when the caller itself is cancelled or times out
+        tasks = [task for task, _, _ in attempts]
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
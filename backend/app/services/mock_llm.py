@@ -0,0 +1,156 @@
+"""
+Offline stand-in for the AsyncGroq client, selected with LLM_PROVIDER=mock.
+
+It exposes the same ``client.chat.completions.create(...)`` surface that
+AIService uses. Responses are deterministic for a given seed, model and prompt,
+and follow the argument, synthesis and follow-up formats the prompts ask for,
+so every downstream parser sees realistic text. Latency (time to first token,
+delay between tokens) and failures (a share of requests raising 429/500) are
+tunable, which makes it suitable for load tests and local development without
+network access.
+"""
+
+import asyncio
+import hashlib
+import random
+import re
+from types import SimpleNamespace
+from typing import Optional
+
+_WORDS = (
+    "risk savings market demand skills timing budget growth customers runway "
+    "stability passion experience network costs margins evidence trade-offs"
+).split()
+
+
+class MockLLMError(Exception):
+    """Injected provider failure; carries an HTTP-like ``status_code`` like the Groq SDK errors."""
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _filler(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(max(1, words)))
+
+
+def _response_text(rng: random.Random, prompt: str, tokens: int) -> str:
+    """Builds a reply in the format the prompt asks for, padded to roughly ``tokens`` words."""
+    body = max(4, tokens - 30)
+    if "follow-up questions" in prompt:
+        return "\n".join(f"{i}. What about {_filler(rng, 3)}?" for i in range(1, 4))
+    if "JUDGE" in prompt:
+        return (
+            f"Summary:\n- {_filler(rng, 6)}\n- {_filler(rng, 6)}\n- {_filler(rng, 6)}\n\n"
+            f"Consensus: {_filler(rng, 12)}\n\n"
+            f"Breakdown: {_filler(rng, body)}\n\n"
+            f"Citations:\n[O1]: \"{_filler(rng, 4)}\"\n[C1]: \"{_filler(rng, 4)}\""
+        )
+    return (
+        f"Claim: {_filler(rng, 8)}\n"
+        f"Explanation: - {_filler(rng, body // 2)}\n- {_filler(rng, body - body // 2)}\n"
+        f"Evidence: {_filler(rng, 10)}\n"
+        f"Counterargument: {_filler(rng, 8)}\n"
+        f"Stance: {rng.choice(['Pro', 'Con', 'Neutral'])}"
+    )
+
+
+def _chunk(model: str, text: str):
+    return SimpleNamespace(model=model, choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class MockStream:
+    def __init__(self, model: str, tokens: list, ttft: float, token_delay: float, fail_at: Optional[int]):
+        self.model = model
+        self.tokens = tokens
+        self.ttft = ttft
+        self.token_delay = token_delay
+        self.fail_at = fail_at
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+        return False
+
+    async def close(self) -> None:
+        self.closed = True
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        await asyncio.sleep(self.ttft)
+        for index, token in enumerate(self.tokens):
+            if self.closed:
+                return
+            if index == self.fail_at:
+                raise MockLLMError(f"Injected mid-stream failure from {self.model}", 500)
+            if index:
+                await asyncio.sleep(self.token_delay)
+            yield _chunk(self.model, token)
+
+
+class MockCompletions:
+    def __init__(self, client: "MockLLMClient"):
+        self.client = client
+
+    async def create(self, messages: list, model: str, stream: bool = False, max_tokens: Optional[int] = None, **kwargs):
+        client = self.client
+        prompt = "\n".join(message.get("content", "") for message in messages)
+        digest = hashlib.blake2b(f"{client.seed}|{model}|{prompt}".encode("utf-8"), digest_size=8).digest()
+        rng = random.Random(int.from_bytes(digest, "little"))
+        # Failures draw from a shared stream so repeated identical prompts do not all fail or all pass
+        failing = client.error_rng.random() < client.error_rate
+        ttft = client.ttft * (1 + client.jitter * (2 * rng.random() - 1))
+
+        tokens = re.findall(r"\S+\s*", _response_text(rng, prompt, client.tokens))
+        if max_tokens:
+            # Cut where a provider would: after roughly max_tokens real tokens (~4 characters each)
+            budget, kept = max_tokens * 4, 0
+            for index, token in enumerate(tokens):
+                budget -= len(token)
+                if budget < 0:
+                    break
+                kept = index + 1
+            tokens = tokens[:kept]
+        client.requests += 1
+
+        if failing and client.error_rng.random() < 0.5:
+            await asyncio.sleep(ttft)
+            client.errors += 1
+            status = 429 if client.error_rng.random() < 0.5 else 500
+            raise MockLLMError(f"Injected {status} from {model}", status)
+        fail_at = client.error_rng.randrange(1, max(2, len(tokens))) if failing else None
+        if failing:
+            client.errors += 1
+
+        if stream:
+            return MockStream(model, tokens, ttft, client.token_delay, fail_at)
+        await asyncio.sleep(ttft + client.token_delay * len(tokens))
+        if fail_at is not None:
+            raise MockLLMError(f"Injected failure from {model}", 500)
+        return SimpleNamespace(model=model, choices=[SimpleNamespace(message=SimpleNamespace(content="".join(tokens)))])
+
+
+class MockLLMClient:
+    """
+    ``ttft`` and ``token_delay`` are in seconds; ``jitter`` spreads TTFT by +/- that fraction.
+    ``error_rate`` is the share of requests that fail: half before any token (as 429 or 500),
+    half part-way through the stream.
+    """
+
+    def __init__(self, ttft: float = 0.3, token_delay: float = 0.02, tokens: int = 80, error_rate: float = 0.0, jitter: float = 0.2, seed: int = 0):
+        self.ttft = ttft
+        self.token_delay = token_delay
+        self.tokens = tokens
+        self.error_rate = error_rate
+        self.jitter = jitter
+        self.seed = seed
+        self.error_rng = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.chat = SimpleNamespace(completions=MockCompletions(self))
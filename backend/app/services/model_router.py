@@ -0,0 +1,175 @@
+import random
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from app.core.config import (
+    AVAILABLE_MODELS,
+    MODEL_ROUTER_EWMA_ALPHA,
+    MODEL_ROUTER_EXPLORATION,
+    MODEL_ROUTER_RATE_LIMIT_COOLDOWN_SECONDS,
+)
+
+# Answer length used to turn tokens/s into an expected stage time.
+REFERENCE_TOKENS = 300
+# Weight multiplier while a model is inside its 429 cooldown window.
+RATE_LIMIT_PENALTY = 0.05
+
+
+class ModelHealth:
+    """Live EWMA statistics for one model."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.ttft: Optional[float] = None
+        self.tokens_per_second: Optional[float] = None
+        self.error_rate = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited: deque = deque(maxlen=20)
+
+    def recent_rate_limits(self, now: float, window: float) -> int:
+        return sum(1 for at in self.rate_limited if now - at <= window)
+
+
+class ModelRouter:
+    """
+    Picks debate models by observed latency and health instead of uniformly.
+
+    Each model keeps an EWMA of time-to-first-token, streaming tokens/s and error
+    rate, plus the timestamps of recent 429s. A model's weight is the inverse of
+    its expected stage time (TTFT + REFERENCE_TOKENS / tokens/s), scaled down by
+    its error rate and heavily penalised during a 429 cooldown. Models with no
+    samples yet get the best known weight so they are tried early. With
+    probability ``exploration`` a slot is filled uniformly at random, so a model
+    that was slow once can recover its standing.
+    """
+
+    def __init__(
+        self,
+        models: List[str],
+        alpha: float = 0.3,
+        exploration: float = 0.1,
+        rate_limit_cooldown: float = 60.0,
+        rng: Optional[random.Random] = None,
+    ):
+        self.models = list(models)
+        self.alpha = alpha
+        self.exploration = exploration
+        self.rate_limit_cooldown = rate_limit_cooldown
+        self.rng = rng or random.Random()
+        self.health: Dict[str, ModelHealth] = {model: ModelHealth(model) for model in self.models}
+        self.explored = 0
+        self.routed = 0
+
+    def _ewma(self, current: Optional[float], sample: float) -> float:
+        return sample if current is None else self.alpha * sample + (1 - self.alpha) * current
+
+    def _health(self, model: str) -> ModelHealth:
+        if model not in self.health:
+            self.health[model] = ModelHealth(model)
+        return self.health[model]
+
+    def record_success(self, model: str, ttft: Optional[float], tokens: int = 0, duration: float = 0.0) -> None:
+        """Records a finished request; ``tokens``/``duration`` cover the streaming phase after the first token."""
+        health = self._health(model)
+        health.requests += 1
+        health.error_rate = self._ewma(health.error_rate, 0.0)
+        if ttft is not None:
+            health.ttft = self._ewma(health.ttft, ttft)
+        if tokens > 1 and duration > 0:
+            health.tokens_per_second = self._ewma(health.tokens_per_second, tokens / duration)
+
+    def record_error(self, model: str, status_code: Optional[int] = None) -> None:
+        health = self._health(model)
+        health.requests += 1
+        health.errors += 1
+        health.error_rate = self._ewma(health.error_rate, 1.0)
+        if status_code == 429:
+            health.rate_limited.append(time.time())
+
+    def record_abandoned(self, model: str, waited: float) -> None:
+        """A request cancelled for missing its first-token deadline: ``waited`` is a lower bound on its TTFT."""
+        health = self._health(model)
+        health.requests += 1
+        health.ttft = self._ewma(health.ttft, max(waited, health.ttft or 0.0))
+
+    def weight(self, model: str, now: Optional[float] = None) -> float:
+        now = time.time() if now is None else now
+        health = self._health(model)
+        if health.ttft is None:
+            known = [self._base_weight(h) for h in self.health.values() if h.ttft is not None]
+            base = max(known) if known else 1.0
+        else:
+            base = self._base_weight(health)
+        weight = base * (1 - health.error_rate) ** 2
+        if health.recent_rate_limits(now, self.rate_limit_cooldown):
+            weight *= RATE_LIMIT_PENALTY
+        return max(weight, 1e-6)
+
+    def _base_weight(self, health: ModelHealth) -> float:
+        expected = health.ttft
+        if health.tokens_per_second:
+            expected += REFERENCE_TOKENS / health.tokens_per_second
+        return 1.0 / max(expected, 1e-3)
+
+    def pick(self, count: int) -> List[str]:
+        """
+        Returns ``count`` models drawn in order by weight, distinct when enough are
+        configured. Callers assign the first pick to the most latency-sensitive role.
+        """
+        now = time.time()
+        remaining = list(self.models)
+        picked = []
+        while len(picked) < count:
+            if not remaining:
+                remaining = list(self.models)
+            if self.rng.random() < self.exploration:
+                choice = self.rng.choice(remaining)
+                self.explored += 1
+            else:
+                weights = [self.weight(model, now) for model in remaining]
+                choice = self.rng.choices(remaining, weights=weights)[0]
+            remaining.remove(choice)
+            picked.append(choice)
+        self.routed += 1
+        return picked
+
+    def pick_alternate(self, exclude: List[str]) -> Optional[str]:
+        """Weighted pick of one model outside ``exclude``, used for hedged requests."""
+        candidates = [model for model in self.models if model not in exclude]
+        if not candidates:
+            return None
+        now = time.time()
+        return self.rng.choices(candidates, weights=[self.weight(model, now) for model in candidates])[0]
+
+    def stats(self) -> dict:
+        now = time.time()
+        weights = {model: self.weight(model, now) for model in self.models}
+        total = sum(weights.values()) or 1.0
+        return {
+            "routed": self.routed,
+            "explored": self.explored,
+            "exploration": self.exploration,
+            "models": {
+                model: {
+                    "ttft_ewma": round(health.ttft, 4) if health.ttft is not None else None,
+                    "tokens_per_second_ewma": round(health.tokens_per_second, 1) if health.tokens_per_second else None,
+                    "error_rate_ewma": round(health.error_rate, 4),
+                    "requests": health.requests,
+                    "errors": health.errors,
+                    "recent_429s": health.recent_rate_limits(now, self.rate_limit_cooldown),
+                    "selection_share": round(weights[model] / total, 4),
+                }
+                for model, health in self.health.items()
+                if model in weights
+            },
+        }
+
+
+model_router = ModelRouter(
+    AVAILABLE_MODELS,
+    alpha=MODEL_ROUTER_EWMA_ALPHA,
+    exploration=MODEL_ROUTER_EXPLORATION,
+    rate_limit_cooldown=MODEL_ROUTER_RATE_LIMIT_COOLDOWN_SECONDS,
+)
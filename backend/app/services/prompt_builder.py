@@ -0,0 +1,218 @@
+"""
+Prompt construction for the debate stages, with token accounting.
+
+Every stage prompt is built here. Quoted opener and critiquer text is trimmed
+to a token budget before it is embedded in a later stage, and each role gets a
+``max_tokens`` derived from the ``max_length`` limits on ``ArgumentResponse`` and
+``SynthesisResponse``, so output length (and with it latency) is bounded by the
+same limits the prompts state.
+
+Token counts use tiktoken when it is installed (an approximation for non-OpenAI
+models, but a close one) and a ~4 characters per token estimate otherwise.
+"""
+
+import math
+from functools import lru_cache
+from typing import List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from app.core.config import PROMPT_OUTPUT_HEADROOM, PROMPT_REASONING_TOKENS
+from app.models import ARGUMENT_FORMAT_INSTRUCTIONS, SYNTHESIS_FORMAT_INSTRUCTIONS, ArgumentResponse, SynthesisResponse
+from app.services.structured_stream import field_limits
+
+try:
+    import tiktoken
+except ImportError:  # optional; token counts fall back to a character estimate
+    tiktoken = None
+
+CHARS_PER_TOKEN = 4
+# Chat formatting tokens added per message and once per request
+MESSAGE_OVERHEAD_TOKENS = 4
+REQUEST_OVERHEAD_TOKENS = 2
+
+# Output sizing for fields the models do not limit in characters
+LIST_ITEM_CHARS = 100
+DEFAULT_LIST_ITEMS = 2
+SHORT_FIELD_CHARS = 20
+FOLLOWUP_QUESTIONS = 3
+FOLLOWUP_QUESTION_CHARS = 60
+
+ROLE_SCHEMAS = {"opener": ArgumentResponse, "critiquer": ArgumentResponse, "synthesizer": SynthesisResponse}
+# Models whose hidden or inline reasoning counts against max_tokens
+REASONING_MODEL_PREFIXES = ("openai/gpt-oss", "qwen/qwen3")
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: str):
+    # gpt-oss models use the o200k vocabulary; cl100k is the closer match for Llama-style models
+    return tiktoken.get_encoding("o200k_base" if "gpt-oss" in model else "cl100k_base")
+
+
+def count_tokens(text: str, model: str = "") -> int:
+    if not text:
+        return 0
+    if tiktoken is None:
+        return estimate_tokens(text)
+    return len(_encoding(model).encode(text, disallowed_special=()))
+
+
+def count_message_tokens(messages: List[dict], model: str = "") -> int:
+    return REQUEST_OVERHEAD_TOKENS + sum(
+        MESSAGE_OVERHEAD_TOKENS + count_tokens(message.get("content") or "", model) for message in messages
+    )
+
+
+def _longest_prefix(size: int, prefix, budget: int, model: str) -> int:
+    """The largest ``n <= size`` whose ``prefix(n)`` plus an ellipsis fits in ``budget`` tokens."""
+    low, high = 0, size
+    # Binary search; each probe is one tokenizer call
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(prefix(middle) + " …", model) <= budget:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def trim_to_tokens(text: str, budget: int, model: str = "") -> str:
+    """
+    Cuts ``text`` at a word boundary so it fits in ``budget`` tokens, marking the cut with an ellipsis.
+    When whole words would fill less than half the budget (a long URL or code blob, or Chinese/Japanese
+    text without spaces) it is cut mid-word instead.
+    """
+    if not text or count_tokens(text, model) <= budget:
+        return text or ""
+    words = text.split(" ")
+    trimmed = " ".join(words[:_longest_prefix(len(words), lambda n: " ".join(words[:n]), budget, model)]).rstrip() + " …"
+    if count_tokens(trimmed, model) * 2 >= budget:
+        return trimmed
+    return text[:_longest_prefix(len(text), lambda n: text[:n], budget, model)].rstrip() + " …"
+
+
+def _schema_output_chars(schema: Type[BaseModel]) -> int:
+    total = 0
+    for name, (max_length, is_list) in field_limits(schema).items():
+        if is_list:
+            chars = (max_length or DEFAULT_LIST_ITEMS) * LIST_ITEM_CHARS
+        else:
+            chars = max_length or SHORT_FIELD_CHARS
+        total += chars + len(name) + 4  # "Name: " label and the line break
+    return total
+
+
+def _answer_tokens(role: str) -> int:
+    if role == "followups":
+        chars = FOLLOWUP_QUESTIONS * (FOLLOWUP_QUESTION_CHARS + 4)
+    else:
+        chars = _schema_output_chars(ROLE_SCHEMAS[role])
+    return math.ceil(chars / CHARS_PER_TOKEN * max(1.0, PROMPT_OUTPUT_HEADROOM))
+
+
+def max_output_tokens(role: str, model: str = "") -> Optional[int]:
+    """
+    ``max_tokens`` for a stage: its schema's character limits in tokens, plus headroom, plus the
+    reasoning allowance for reasoning models. None when PROMPT_OUTPUT_HEADROOM disables it.
+    """
+    if PROMPT_OUTPUT_HEADROOM <= 0:
+        return None
+    reasoning = PROMPT_REASONING_TOKENS if model.startswith(REASONING_MODEL_PREFIXES) else 0
+    return _answer_tokens(role) + reasoning
+
+
+def quote_budget() -> int:
+    """Tokens allowed for one quoted argument: what a well-formed argument can use."""
+    return _answer_tokens("opener")
+
+
+def opener_messages(user_message: str, context_summary: str = "", reference_notes: str = "") -> List[dict]:
+    system_prompt = f'''You are a debater in the Shurahub AI Council. Your role is to provide the OPENING argument.
+
+RULES:
+- Be CONCISE. No long paragraphs.
+- Users want to SKIM, not read essays.
+- Each field has a character limit - respect it.
+- Focus ONLY on the user's question. Do not go off-topic.
+
+{ARGUMENT_FORMAT_INSTRUCTIONS}{reference_notes}'''
+    return [
+        {'role': 'system', 'content': system_prompt},
+        {'role': 'user', 'content': f"{user_message}{context_summary}"},
+    ]
+
+
+def critique_messages(user_message: str, openings: List[Tuple[str, str]], model: str = "") -> List[dict]:
+    """``openings`` are ``(text, model)`` pairs; each is trimmed to the quote budget."""
+    budget = quote_budget()
+    if len(openings) == 1:
+        opening_text, opening_model = openings[0]
+        critique_subject = f"your colleague {opening_model}'s argument"
+        critique_openings = f'{opening_model}\'s response: "{trim_to_tokens(opening_text, budget, model)}"'
+    else:
+        critique_subject = "your colleagues' opening arguments"
+        critique_openings = "\n".join(
+            f'[O{i}] {opening_model}\'s response: "{trim_to_tokens(text, budget, model)}"'
+            for i, (text, opening_model) in enumerate(openings, start=1)
+        )
+    critique_prompt = f'''You are critiquing {critique_subject}.
+
+RULES:
+- Be CONCISE. No long paragraphs.
+- Users want to SKIM, not read essays.
+- Each field has a character limit - respect it.
+
+User's query: "{user_message}"
+{critique_openings}
+
+{ARGUMENT_FORMAT_INSTRUCTIONS}'''
+    return [{'role': 'user', 'content': critique_prompt}]
+
+
+def synthesis_messages(user_message: str, openings: List[Tuple[str, str]], critique: Tuple[str, str], model: str = "") -> List[dict]:
+    budget = quote_budget()
+    if len(openings) == 1:
+        opening_text, opening_model = openings[0]
+        debate_openings = f'{opening_model}: "{trim_to_tokens(opening_text, budget, model)}"'
+    else:
+        debate_openings = "\n".join(
+            f'[O{i}] {opening_model}: "{trim_to_tokens(text, budget, model)}"'
+            for i, (text, opening_model) in enumerate(openings, start=1)
+        )
+    critique_text, critique_model = critique
+    synthesis_prompt = f'''You are the JUDGE providing the Golden Answer.
+
+User's Query: "{user_message}"
+
+The Debate:
+{debate_openings}
+{critique_model}: "{trim_to_tokens(critique_text, budget, model)}"
+
+RULES:
+- Be CONCISE. No essays.
+- Keep each section SHORT.
+- Users want a clear answer, not paragraphs.
+
+{SYNTHESIS_FORMAT_INSTRUCTIONS}'''
+    return [{'role': 'user', 'content': synthesis_prompt}]
+
+
+def followup_messages(user_message: str, verdict: str) -> List[dict]:
+    followup_prompt = f'''Based on this debate about: "{user_message}"
+
+The verdict was: {verdict[:300] if verdict else "provided"}
+
+Generate exactly 3 SHORT follow-up questions the user might want to ask next. Each question should be:
+- Directly relevant to their decision
+- Actionable and specific
+- Under 60 characters
+
+Format:
+1. [question]
+2. [question]
+3. [question]'''
+    return [{'role': 'user', 'content': followup_prompt}]
@@ -0,0 +1,178 @@
+"""
+Knowledge retrieval over a local document corpus.
+
+Documents (Markdown and text files under the corpus directory) are split into
+paragraph-packed chunks and embedded in batches with the hashing embedder. The
+embedding matrix is persisted as a .npy file next to the chunk texts and a
+manifest fingerprinting the corpus; later starts memory-map the matrix instead
+of re-embedding, so startup cost does not grow with the corpus. The index is
+rebuilt automatically when any corpus file changes.
+
+Scores are squared L2 distances between unit vectors (0 = identical, 2 =
+unrelated), so results are ranked ascending, matching FAISS IndexFlatL2.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import RAG_CORPUS_DIR, RAG_INDEX_DIR
+from app.services.embeddings import STOPWORDS, HashingEmbedder
+
+CORPUS_EXTENSIONS = (".md", ".txt")
+INDEX_VERSION = 1
+
+
+def chunk_document(text: str, chunk_chars: int) -> List[str]:
+    """Packs consecutive paragraphs into chunks of at most ``chunk_chars`` (longer paragraphs are split)."""
+    chunks, current = [], ""
+    for paragraph in (part.strip() for part in text.split("\n\n")):
+        if not paragraph:
+            continue
+        while len(paragraph) > chunk_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            cut = paragraph.rfind(" ", 0, chunk_chars)
+            cut = cut if cut > chunk_chars // 2 else chunk_chars
+            chunks.append(paragraph[:cut].strip())
+            paragraph = paragraph[cut:].strip()
+        if current and len(current) + len(paragraph) + 2 > chunk_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class KnowledgeRetrieval:
+    def __init__(
+        self,
+        corpus_dir: Optional[str] = None,
+        index_dir: Optional[str] = None,
+        embedder: Optional[HashingEmbedder] = None,
+        chunk_chars: int = 800,
+        batch_size: int = 64,
+    ):
+        self.corpus_dir = os.path.abspath(corpus_dir or RAG_CORPUS_DIR)
+        self.index_dir = os.path.abspath(index_dir or RAG_INDEX_DIR)
+        # Stopwords are dropped so short questions match on their topic words
+        self.embedder = embedder or HashingEmbedder(stopwords=STOPWORDS)
+        self.chunk_chars = chunk_chars
+        self.batch_size = batch_size
+        self._vectors: Optional[np.ndarray] = None
+        self._chunks: List[Dict[str, str]] = []
+        self._load_lock = threading.Lock()
+        self.rebuilt = False
+
+    @property
+    def ready(self) -> bool:
+        return self._vectors is not None
+
+    async def initialize(self) -> None:
+        """Loads the persisted index, rebuilding it first if the corpus changed. Safe to call repeatedly."""
+        if not self.ready:
+            await asyncio.to_thread(self._load_or_build)
+
+    async def retrieve_context(self, query: str, max_results: int = 5) -> List[Dict]:
+        """Returns up to ``max_results`` chunks as ``{content, score, source}``, best (lowest distance) first."""
+        await self.initialize()
+        if not len(self._chunks) or max_results <= 0:
+            return []
+        query_vector = self.embedder.embed(query)
+        if not query_vector.any():
+            return []
+        # Unit vectors: ||x - q||^2 = 2 - 2 x.q
+        distances = 2.0 - 2.0 * (self._vectors @ query_vector)
+        count = min(max_results, len(distances))
+        top = np.argpartition(distances, count - 1)[:count]
+        top = top[np.argsort(distances[top])]
+        return [
+            {"content": self._chunks[i]["content"], "score": round(float(distances[i]), 4), "source": self._chunks[i]["source"]}
+            for i in top
+            if distances[i] < 2.0  # nothing in common with the query
+        ]
+
+    # --- Index persistence ---
+
+    def _paths(self) -> Dict[str, str]:
+        return {
+            "manifest": os.path.join(self.index_dir, "manifest.json"),
+            "vectors": os.path.join(self.index_dir, "vectors.npy"),
+            "chunks": os.path.join(self.index_dir, "chunks.json"),
+        }
+
+    def _corpus_files(self) -> List[str]:
+        files = []
+        for root, _, names in os.walk(self.corpus_dir):
+            files.extend(os.path.join(root, name) for name in names if name.lower().endswith(CORPUS_EXTENSIONS))
+        return sorted(files)
+
+    def _fingerprint(self, files: List[str]) -> str:
+        settings = f"{INDEX_VERSION}|{self.embedder.dimension}|{sorted(self.embedder.stopwords)}|{self.chunk_chars}"
+        digest = hashlib.sha256(settings.encode("utf-8"))
+        for path in files:
+            stat = os.stat(path)
+            digest.update(f"|{os.path.relpath(path, self.corpus_dir)}|{stat.st_size}|{stat.st_mtime_ns}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _load_or_build(self) -> None:
+        with self._load_lock:
+            if self.ready:
+                return
+            files = self._corpus_files()
+            fingerprint = self._fingerprint(files)
+            paths = self._paths()
+            try:
+                with open(paths["manifest"]) as handle:
+                    current = json.load(handle).get("fingerprint") == fingerprint
+            except (OSError, ValueError):
+                current = False
+            if not current:
+                self._build(files, fingerprint, paths)
+                self.rebuilt = True
+            with open(paths["chunks"]) as handle:
+                self._chunks = json.load(handle)
+            # Memory-mapped: pages are read on first use and shared between worker processes
+            self._vectors = np.load(paths["vectors"], mmap_mode="r")
+
+    def _build(self, files: List[str], fingerprint: str, paths: Dict[str, str]) -> None:
+        os.makedirs(self.index_dir, exist_ok=True)
+        chunks = []
+        for path in files:
+            with open(path, encoding="utf-8", errors="replace") as handle:
+                text = handle.read()
+            source = os.path.relpath(path, self.corpus_dir)
+            chunks.extend({"content": chunk, "source": source} for chunk in chunk_document(text, self.chunk_chars))
+
+        vectors = np.zeros((len(chunks), self.embedder.dimension), dtype=np.float32)
+        for start in range(0, len(chunks), self.batch_size):
+            batch = [chunk["content"] for chunk in chunks[start:start + self.batch_size]]
+            vectors[start:start + len(batch)] = self.embedder.embed_batch(batch)
+
+        # Write-then-rename so a crash never leaves a manifest pointing at a half-written index
+        self._write_atomic(paths["vectors"], lambda handle: np.save(handle, vectors), binary=True)
+        self._write_atomic(paths["chunks"], lambda handle: json.dump(chunks, handle))
+        self._write_atomic(paths["manifest"], lambda handle: json.dump({
+            "fingerprint": fingerprint,
+            "chunks": len(chunks),
+            "files": len(files),
+            "dimension": self.embedder.dimension,
+        }, handle))
+        print(f"RAG index built: {len(chunks)} chunks from {len(files)} files in {self.corpus_dir}")
+
+    @staticmethod
+    def _write_atomic(path: str, write, binary: bool = False) -> None:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb" if binary else "w") as handle:
+            write(handle)
+        os.replace(tmp_path, path)
+
+
+knowledge_retrieval = KnowledgeRetrieval()
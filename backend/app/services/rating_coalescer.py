@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import RATING_COALESCE_WINDOW_MS, RATING_WRITE_MAX_ATTEMPTS
+from app.services.debate_service import RATING_FIELDS, DebateService
+from app.services.debate_write_queue import DebateWriteQueue, debate_write_queue
+
+
+logger = logging.getLogger(__name__)
+
+RatingKey = Tuple[str, str]
+
+
+class RatingCoalescer:
+    """
+    Write-behind buffer for debate ratings.
+
+    ``submit`` records a rating in memory and returns at once. Ratings for the same
+    (debate, user) that arrive within ``window`` seconds of each other are merged,
+    the latest value winning, so a burst of clicks costs one UPDATE. A background
+    task then writes everything pending in one transaction.
+
+    A debate that is still in the write-behind queue has the ratings set on its
+    queued row instead, so they go out with its INSERT. A rating for a debate whose
+    batch is being inserted at that moment is held for the next window, and one for a
+    debate spilled to the queue's journal is held until the journal has been replayed.
+    A failed write is retried up to ``max_attempts`` times, newer ratings taking precedence.
+    """
+
+    def __init__(
+        self,
+        writer: Callable[[Dict[RatingKey, Dict[str, int]]], Awaitable[List[RatingKey]]],
+        queue: Optional[DebateWriteQueue] = None,
+        window: float = 0.25,
+        max_attempts: int = 3,
+    ):
+        self.writer = writer
+        self.queue = queue
+        self.window = window
+        self.max_attempts = max_attempts
+        self._pending: Dict[RatingKey, Dict[str, int]] = {}
+        self._attempts: Dict[RatingKey, int] = {}
+        # Ratings for journaled debates, waiting for the replay to insert them
+        self._deferred: Dict[RatingKey, Dict[str, int]] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self.submitted = 0
+        self.coalesced = 0
+        self.writes = 0
+        self.applied_to_queue = 0
+        self.unmatched = 0
+        self.deferred = 0
+        self.failed_attempts = 0
+        self.dropped = 0
+        self.last_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+
+    def submit(self, debate_id: str, user_id: str, rater: str, rating: int) -> None:
+        """Record a rating; it is written within one window. Later ratings overwrite earlier ones."""
+        ratings = self._pending.setdefault((debate_id, user_id), {})
+        if ratings:
+            self.coalesced += 1
+        ratings[RATING_FIELDS[rater]] = rating
+        self.submitted += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the writer and write out what is still pending, retrying failures a bounded number of times."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for _ in range(self.max_attempts):
+            if not self._pending:
+                break
+            await self.flush()
+        unwritten = {**self._deferred, **self._pending}
+        if unwritten:
+            self.dropped += len(unwritten)
+            logger.warning("Shutting down with %d unwritten ratings; they are lost: %s", len(unwritten), sorted(unwritten))
+            self._pending.clear()
+            self._deferred.clear()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                # Held ratings are rechecked now and then, since nothing signals the end of a replay
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.window * 4 if self._deferred else None)
+            except asyncio.TimeoutError:
+                pass
+            # Let the rest of a burst of clicks land before writing
+            await asyncio.sleep(self.window)
+            self._wakeup.clear()
+            await self.flush()
+            if self._pending:
+                # Retries and ratings held for an in-flight INSERT go out in the next window
+                self._wakeup.set()
+
+    async def flush(self) -> bool:
+        """Write everything pending. Returns False if the write failed (the ratings are kept for a retry)."""
+        lock = self._flush_lock or asyncio.Lock()
+        async with lock:
+            pending, self._pending = self._pending, {}
+            for key in list(self._deferred):
+                if self.queue.is_journaled(key[0]):
+                    # Still not inserted: newer ratings join the held ones without a pointless UPDATE
+                    if key in pending:
+                        self._deferred[key].update(pending.pop(key))
+                else:
+                    # Replayed (or dead-lettered) since: the held ratings go out with this batch
+                    pending[key] = {**self._deferred.pop(key), **pending.get(key, {})}
+            if self.queue is not None:
+                for key in [key for key, ratings in pending.items() if self.queue.apply_ratings(*key, ratings)]:
+                    del pending[key]
+                    self._attempts.pop(key, None)
+                    self.applied_to_queue += 1
+            if not pending:
+                return True
+            started = time.perf_counter()
+            try:
+                unmatched = await self.writer(pending)
+            except Exception as exc:
+                self.failed_attempts += 1
+                logger.warning("Failed to write ratings for %d debates: %s", len(pending), exc)
+                self._restore(pending)
+                return False
+            finally:
+                latency = time.perf_counter() - started
+                self.last_flush_latency = latency
+                self.max_flush_latency = max(self.max_flush_latency, latency)
+            for key in pending:
+                self._attempts.pop(key, None)
+            self.writes += len(pending) - len(unmatched)
+            for key in unmatched:
+                if self.queue is not None and self.queue.is_writing(key[0]):
+                    # The row was not committed yet when the UPDATE ran
+                    self._pending[key] = {**pending[key], **self._pending.get(key, {})}
+                elif self.queue is not None and self.queue.is_journaled(key[0]):
+                    self._deferred[key] = {**self._deferred.get(key, {}), **pending[key]}
+                    self.deferred += 1
+                else:
+                    self.unmatched += 1
+                    logger.warning("Dropped rating %s for debate %s: no such debate owned by user %s", pending[key], *key)
+            return True
+
+    def _restore(self, pending: Dict[RatingKey, Dict[str, int]]) -> None:
+        for key, ratings in pending.items():
+            attempts = self._attempts.get(key, 0) + 1
+            if attempts >= self.max_attempts:
+                self._attempts.pop(key, None)
+                self.dropped += 1
+                logger.warning("Dropped rating %s for debate %s by user %s after %d failed attempts", ratings, *key, attempts)
+                continue
+            self._attempts[key] = attempts
+            # Ratings submitted while this write was running are newer and win
+            self._pending[key] = {**ratings, **self._pending.get(key, {})}
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "window_ms": self.window * 1000,
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "writes": self.writes,
+            "applied_to_queue": self.applied_to_queue,
+            "unmatched": self.unmatched,
+            "deferred": self.deferred,
+            "waiting_for_replay": len(self._deferred),
+            "failed_attempts": self.failed_attempts,
+            "dropped": self.dropped,
+            "last_flush_latency_ms": round(self.last_flush_latency * 1000, 2),
+            "max_flush_latency_ms": round(self.max_flush_latency * 1000, 2),
+        }
+
+
+rating_coalescer = RatingCoalescer(
+    writer=DebateService().update_ratings_async,
+    queue=debate_write_queue,
+    window=RATING_COALESCE_WINDOW_MS / 1000,
+    max_attempts=RATING_WRITE_MAX_ATTEMPTS,
+)
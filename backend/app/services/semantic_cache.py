@@ -0,0 +1,140 @@
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import (
+    SEMANTIC_CACHE_MAX_ENTRIES,
+    SEMANTIC_CACHE_MIN_WORDS,
+    SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_TTL_SECONDS,
+)
+from app.services.embeddings import HashingEmbedder, word_count
+
+
+@dataclass
+class CachedDebate:
+    """A finished debate transcript that can be replayed for a near-duplicate prompt."""
+    prompt: str
+    scope: str
+    stages: Dict[str, dict]  # role -> {"model": ..., "text": ...}
+    followups: List[str] = field(default_factory=list)
+    duration: float = 0.0
+    tokens: int = 0
+    created_at: float = 0.0
+    expires_at: float = 0.0
+    last_used: float = 0.0
+    hits: int = 0
+    similarity: float = 1.0
+
+
+class SemanticAnswerCache:
+    """
+    Embedding-indexed cache of debate transcripts.
+
+    Prompt embeddings live in a preallocated (max_entries x dim) matrix, so a
+    lookup is one matrix-vector product. A hit needs cosine similarity at or
+    above ``threshold``, an unexpired entry and the same ``scope``. When full,
+    expired entries are reused first, then the least recently used one.
+
+    Entries are scoped to the user they were generated for: a debate often
+    rests on personal details in the prompt, and the hashing embedder scores
+    prompts that differ in one such detail (an age, "take" vs "decline") as
+    near-duplicates.
+
+    Prompts with fewer than ``min_words`` words are neither looked up nor stored:
+    their vectors rest on one or two features (often just a number), so unrelated
+    prompts would collide.
+    """
+
+    def __init__(self, embedder=None, threshold: float = 0.98, ttl_seconds: float = 3600.0, max_entries: int = 1000, min_words: int = 3):
+        self.embedder = embedder or HashingEmbedder()
+        self.threshold = threshold
+        self.min_words = min_words
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._vectors = np.zeros((max_entries, self.embedder.dimension), dtype=np.float32)
+        self._entries: List[Optional[CachedDebate]] = [None] * max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.latency_saved = 0.0
+        self.tokens_saved = 0
+        self.skipped = 0
+
+    def cacheable(self, prompt: str) -> bool:
+        return word_count(prompt) >= self.min_words
+
+    def lookup(self, prompt: str, scope: str = "") -> Optional[CachedDebate]:
+        if not self.cacheable(prompt):
+            self.skipped += 1
+            return None
+        now = time.time()
+        query = self.embedder.embed(prompt)
+        similarities = self._vectors @ query
+        for slot in np.argsort(similarities)[::-1]:
+            similarity = float(similarities[slot])
+            if similarity < self.threshold:
+                break
+            entry = self._entries[slot]
+            if entry is None or entry.expires_at <= now or entry.scope != scope:
+                continue
+            entry.last_used = now
+            entry.hits += 1
+            entry.similarity = similarity
+            self.hits += 1
+            self.latency_saved += entry.duration
+            self.tokens_saved += entry.tokens
+            return entry
+        self.misses += 1
+        return None
+
+    def store(self, prompt: str, stages: Dict[str, dict], followups: Optional[List[str]] = None, duration: float = 0.0, tokens: int = 0, scope: str = "") -> None:
+        if not self.cacheable(prompt):
+            return
+        now = time.time()
+        slot = self._free_slot(now)
+        self._vectors[slot] = self.embedder.embed(prompt)
+        self._entries[slot] = CachedDebate(
+            prompt=prompt,
+            scope=scope,
+            stages=stages,
+            followups=followups or [],
+            duration=duration,
+            tokens=tokens,
+            created_at=now,
+            expires_at=now + self.ttl_seconds,
+            last_used=now,
+        )
+
+    def _free_slot(self, now: float) -> int:
+        lru_slot, lru_time = 0, float("inf")
+        for slot, entry in enumerate(self._entries):
+            if entry is None or entry.expires_at <= now:
+                return slot
+            if entry.last_used < lru_time:
+                lru_slot, lru_time = slot, entry.last_used
+        self.evictions += 1
+        return lru_slot
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": sum(1 for entry in self._entries if entry is not None),
+            "hits": self.hits,
+            "misses": self.misses,
+            "skipped_short_prompts": self.skipped,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "latency_saved_seconds": round(self.latency_saved, 3),
+            "tokens_saved": self.tokens_saved,
+        }
+
+
+semantic_cache = SemanticAnswerCache(
+    threshold=SEMANTIC_CACHE_THRESHOLD,
+    ttl_seconds=SEMANTIC_CACHE_TTL_SECONDS,
+    max_entries=SEMANTIC_CACHE_MAX_ENTRIES,
+    min_words=SEMANTIC_CACHE_MIN_WORDS,
+)
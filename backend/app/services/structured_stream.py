@@ -0,0 +1,167 @@
+"""
+Incremental parser for the labelled formats the debate prompts ask for
+(``Claim: ... / Explanation: ... / Stance: ...`` and ``Summary: / Consensus: / ...``).
+
+Deltas are consumed as they stream. Only the start of the current line is held
+back while it might still turn out to be a field label, so nothing already
+parsed is scanned again. A field is reported complete as soon as the next label
+starts (or the stream ends), and each field stops accepting text once it
+reaches the ``max_length`` of the matching Pydantic model field. At the end the
+collected fields are validated against ``ArgumentResponse`` or ``SynthesisResponse``.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+from app.models import ArgumentResponse, StanceType, SynthesisResponse
+
+# Label text (lowercase) -> model field
+LABELS = {
+    ArgumentResponse: {
+        "claim": "claim",
+        "explanation": "explanation",
+        "evidence": "evidence",
+        "counterargument": "counterargument",
+        "stance": "stance",
+    },
+    SynthesisResponse: {
+        "summary": "summary",
+        "consensus": "consensus",
+        "breakdown": "breakdown",
+        "decision breakdown": "breakdown",
+        "confidence": "confidence",
+        "citations": "citations",
+    },
+}
+
+# Characters of a line start that may still be a label ("**Decision Breakdown**:" and the like)
+_MAX_LABEL_CHARS = 24
+_LABEL_MARKUP = " \t*#-"
+# Raw text kept for fields without a character limit (bullet lists, stance words)
+_UNBOUNDED_FIELD_CHARS = 1000
+
+
+def field_limits(schema: Type[BaseModel]) -> Dict[str, Tuple[Optional[int], bool]]:
+    """Field -> (max_length from the model, whether it is a list)."""
+    limits = {}
+    for name, field in schema.model_fields.items():
+        max_length = next((getattr(meta, "max_length") for meta in field.metadata if hasattr(meta, "max_length")), None)
+        is_list = "List" in str(field.annotation)
+        limits[name] = (max_length, is_list)
+    return limits
+
+
+_LIMITS = {schema: field_limits(schema) for schema in LABELS}
+
+
+def _list_items(text: str) -> List[str]:
+    return [line.strip().lstrip("-•*").strip() for line in text.splitlines() if line.strip().lstrip("-•*").strip()]
+
+
+class StructuredStreamParser:
+    def __init__(self, schema: Type[BaseModel]):
+        self.schema = schema
+        self.labels = LABELS[schema]
+        self.limits = _LIMITS[schema]
+        self.fields: Dict[str, Any] = {}
+        self.truncated: List[str] = []
+        self.chars = 0
+        self._field: Optional[str] = None
+        self._parts: List[str] = []
+        self._length = 0
+        self._head: Optional[str] = ""  # start of the current line while it may be a label, else None
+        self._label_tail = False  # closing bold markup may still follow the label's colon
+
+    def feed(self, delta: str) -> List[Tuple[str, Any]]:
+        """Consumes one delta; returns the ``(field, value)`` pairs it closed, in order."""
+        closed = []
+        self.chars += len(delta)
+        for i, piece in enumerate(delta.split("\n")):
+            if i:
+                self._end_line()
+            if self._head is None:
+                self._append(piece)
+                continue
+            self._head += piece
+            stripped = self._head.lstrip(_LABEL_MARKUP)
+            colon = stripped.find(":", 0, _MAX_LABEL_CHARS + 1)
+            if colon >= 0:
+                field = self.labels.get(stripped[:colon].rstrip(_LABEL_MARKUP).lower())
+                if field:
+                    self._head = None
+                    self._close(closed)
+                    if field not in self.fields:
+                        self._field = field
+                        self._label_tail = True
+                    self._append(stripped[colon + 1:].lstrip("* \t"))
+                    continue
+            if colon >= 0 or len(stripped) > _MAX_LABEL_CHARS:
+                head, self._head = self._head, None
+                self._append(head)
+        return closed
+
+    def finish(self) -> Tuple[List[Tuple[str, Any]], Optional[BaseModel], Optional[str]]:
+        """Closes the open field; returns ``(closed fields, validated model or None, validation error or None)``."""
+        closed = []
+        if self._head:
+            self._append(self._head)
+        self._head = None
+        self._close(closed)
+        try:
+            return closed, self.schema.model_validate(self.fields), None
+        except ValidationError as e:
+            return closed, None, f"{e.error_count()} validation error(s): " + "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+            )
+
+    def _end_line(self) -> None:
+        if self._head:
+            self._append(self._head)
+        self._append("\n")
+        self._head = ""
+
+    def _append(self, text: str) -> None:
+        if self._field is None or not text:
+            return  # preamble before the first label, or a repeated label's text
+        if self._label_tail:
+            text = text.lstrip("* \t")
+            self._label_tail = not text
+        if not self._length:
+            text = text.lstrip()
+        max_length, is_list = self.limits[self._field]
+        limit = _UNBOUNDED_FIELD_CHARS if is_list or max_length is None else max_length
+        room = limit - self._length
+        if len(text) > room:
+            text = text[:room]
+            if self._field not in self.truncated:
+                self.truncated.append(self._field)
+            if not text:
+                return
+        self._parts.append(text)
+        self._length += len(text)
+
+    def _close(self, closed: list) -> None:
+        if self._field is None:
+            return
+        field, raw = self._field, "".join(self._parts).strip()
+        self._field, self._parts, self._length = None, [], 0
+        value = self._convert(field, raw)
+        if value is None:
+            return
+        self.fields[field] = value
+        closed.append((field, value))
+
+    def _convert(self, field: str, raw: str) -> Any:
+        max_length, is_list = self.limits[field]
+        if is_list:
+            items = _list_items(raw)
+            return items[:max_length] if max_length else items
+        if not raw:
+            return None
+        if field == "stance":
+            word = raw.split()[0].strip(".*,;").lower()
+            return next((stance.value for stance in StanceType if stance.value.lower() == word), raw)
+        if field == "confidence":
+            return raw.split()[0].strip(".*,;").upper()
+        return raw
@@ -61,7 +61,7 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     function rateDebate(debateId, rater, rating) {
-        fetch('/rate', {
+        fetch('/api/rate', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ debate_id: debateId, rater, rating }),
@@ -20,6 +20,7 @@ document.addEventListener('DOMContentLoaded', () => {
     let streamBuffers = {};
     let currentDebateId = null; // Track which debate is currently loaded
     let debates = []; // Store fetched debates
+    let historyCursor = null; // Cursor for the next page of history; null once everything is loaded
 
     const examplePrompt = "Decide between Next.js and Astro for a 3k-page content site that updates daily.";
 
@@ -286,6 +287,23 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
+    // Show the headline fields as soon as the server has parsed them, before the stage finishes
+    function handleFieldComplete(data) {
+        if (!currentShurahubMessage) return;
+        const node = getOrCreateArgumentNode(data.role, data.sender);
+        if (!node) return;
+
+        const headline = data.role === 'synthesizer' ? 'consensus' : 'claim';
+        const body = data.role === 'synthesizer' ? 'breakdown' : 'explanation';
+        if (data.field === headline) {
+            const claimEl = node.querySelector('.claim-text');
+            if (claimEl) claimEl.textContent = data.value;
+        } else if (data.field === body) {
+            const explEl = node.querySelector('.explanation-text');
+            if (explEl) explEl.innerHTML = marked.parse(data.value);
+        }
+    }
+
     // flushStreamUpdates removed - we now render complete content only
 
     // Helper function to remove streaming indicators when done
@@ -296,6 +314,9 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     function handleServerMessage(data) {
+        // Council mode streams several openers; the layout has one opener slot, so show the first
+        if (data.role === 'opener' && data.index > 0) return;
+
         if (data.type === 'typing') {
             showTypingIndicator(data.sender);
             setStatus(`${data.sender} is drafting...`, true);
@@ -307,12 +328,36 @@ document.addEventListener('DOMContentLoaded', () => {
             return;
         }
 
+        if (data.type === 'field_complete') {
+            handleFieldComplete(data);
+            return;
+        }
+
         // Handle AI-generated follow-up suggestions
         if (data.type === 'followups' && data.suggestions) {
             handleFollowupSuggestions(data.suggestions);
             return;
         }
 
+        // The council is at capacity; the debate starts once a slot frees up
+        if (data.type === 'queued') {
+            setStatus(`The council is busy. You're #${data.position} in line...`, true);
+            return;
+        }
+
+        // Admin-only: the id of a debate profile, fetched later from /monitoring/profiles
+        if (data.type === 'profile') {
+            console.info(`Profiling this debate as ${data.profile_id}`);
+            return;
+        }
+
+        if (data.type === 'rate_limited') {
+            setWorkingState(false);
+            setStreamingState(false);
+            setStatus(data.text);
+            return;
+        }
+
         clearTimeout(typingIndicatorTimeout);
         removeTypingIndicator();
 
@@ -341,13 +386,13 @@ document.addEventListener('DOMContentLoaded', () => {
         if (currentShurahubMessage) {
             // Handle complete message from opener/critiquer (non-streaming final message)
             if (data.role === 'opener' || data.role === 'critiquer') {
-                renderCompleteArgument(data.role, data.sender, data.text);
+                renderCompleteArgument(data.role, data.sender, data.text, data.structured);
             }
 
             // Check for debate completion (synthesizer)
             if (data.text.startsWith('**Final Verdict:**') || (data.role === 'synthesizer' && data.text)) {
                 // Render synthesis
-                renderCompleteSynthesis(data.sender, data.text);
+                renderCompleteSynthesis(data.sender, data.text, data.structured);
 
                 // Show the feedback trigger button
                 const feedbackTrigger = currentShurahubMessage.querySelector('.feedback-trigger');
@@ -415,13 +460,16 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     // Render a complete argument card (after streaming is done)
-    function renderCompleteArgument(role, sender, content) {
+    function renderCompleteArgument(role, sender, content, structured) {
         if (!currentShurahubMessage) return;
 
         const node = getOrCreateArgumentNode(role, sender);
         if (!node) return;
 
-        const arg = parseArgument(content);
+        // The server sends the validated fields when the response followed the format
+        const arg = structured
+            ? { evidence: '', counterargument: '', ...structured, rawText: content }
+            : parseArgument(content);
 
         const claimEl = node.querySelector('.claim-text');
         const explEl = node.querySelector('.explanation-text');
@@ -466,10 +514,12 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     // Render complete synthesis
-    function renderCompleteSynthesis(sender, content) {
+    function renderCompleteSynthesis(sender, content, structured) {
         if (!currentShurahubMessage) return;
 
-        const sections = parseSynthesis(content);
+        const sections = structured
+            ? { ...structured, citations: (structured.citations || []).join('\n'), rawText: content }
+            : parseSynthesis(content);
         const summaryBullets = currentShurahubMessage.querySelector('.summary-bullets');
         const confidencePill = currentShurahubMessage.querySelector('.confidence-pill');
 
@@ -987,7 +1037,10 @@ document.addEventListener('DOMContentLoaded', () => {
                 throw new Error('Failed to fetch debates');
             }
 
-            debates = await response.json();
+            // Paginated summaries; full debates are fetched on demand
+            const page = await response.json();
+            debates = page.items || [];
+            historyCursor = page.next_cursor || null;
             console.log('[History] Fetched debates:', debates.length, 'debates');
 
             populateHistoryList();
@@ -995,7 +1048,7 @@ document.addEventListener('DOMContentLoaded', () => {
             // Auto-load the most recent debate if available
             if (debates.length > 0 && !currentDebateId) {
                 console.log('[History] Auto-loading most recent debate');
-                loadDebate(debates[0]);
+                openDebate(debates[0].debate_id);
             }
         } catch (error) {
             console.error('[History] Error fetching debates:', error);
@@ -1005,6 +1058,29 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
+    async function loadMoreDebates(button) {
+        button.disabled = true;
+        button.textContent = 'Loading...';
+        try {
+            const response = await fetch(`/api/debates?cursor=${encodeURIComponent(historyCursor)}`, {
+                credentials: 'include'
+            });
+            if (!response.ok) {
+                throw new Error('Failed to fetch more debates');
+            }
+            const page = await response.json();
+            // Skip anything already listed (e.g. a debate that finished while paging)
+            const known = new Set(debates.map(d => d.debate_id));
+            debates = debates.concat((page.items || []).filter(d => !known.has(d.debate_id)));
+            historyCursor = page.next_cursor || null;
+            populateHistoryList();
+        } catch (error) {
+            console.error('[History] Error loading more debates:', error);
+            button.disabled = false;
+            button.textContent = 'Retry';
+        }
+    }
+
     function populateHistoryList() {
         const historyList = document.getElementById('history-list');
         if (!historyList) return;
@@ -1014,7 +1090,7 @@ document.addEventListener('DOMContentLoaded', () => {
             return;
         }
 
-        historyList.innerHTML = debates.slice(0, 10).map(debate => {
+        historyList.innerHTML = debates.map(debate => {
             const date = new Date(debate.timestamp);
             const timeAgo = getTimeAgo(date);
             const isActive = currentDebateId === debate.debate_id;
@@ -1057,6 +1133,14 @@ document.addEventListener('DOMContentLoaded', () => {
             `;
         }).join('');
 
+        if (historyCursor) {
+            const loadMore = document.createElement('button');
+            loadMore.type = 'button';
+            loadMore.className = 'history-load-more';
+            loadMore.textContent = 'Load more';
+            loadMore.addEventListener('click', () => loadMoreDebates(loadMore));
+            historyList.appendChild(loadMore);
+        }
 
         // Attach click handlers
         historyList.querySelectorAll('.history-item').forEach(item => {
@@ -1065,8 +1149,7 @@ document.addEventListener('DOMContentLoaded', () => {
             if (itemContent) {
                 itemContent.addEventListener('click', () => {
                     const debateId = item.dataset.debateId;
-                    const debate = debates.find(d => d.debate_id === debateId);
-                    if (debate) loadDebate(debate);
+                    openDebate(debateId);
                 });
             }
 
@@ -1193,6 +1276,29 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
 
+    async function openDebate(debateId) {
+        try {
+            const response = await fetch(`/api/debates/${debateId}`, {
+                credentials: 'include'
+            });
+            if (!response.ok) throw new Error('Failed to fetch debate');
+            const debate = await response.json();
+
+            // Flatten the stored role columns into the shape loadDebate expects
+            loadDebate({
+                ...debate,
+                opener_model: debate.opener?.model,
+                opener_response: debate.opener?.response,
+                critiquer_model: debate.critiquer?.model,
+                critiquer_response: debate.critiquer?.response,
+                synthesizer_model: debate.synthesizer?.model,
+                synthesizer_response: debate.synthesizer?.response,
+            });
+        } catch (error) {
+            console.error('[History] Error loading debate:', error);
+        }
+    }
+
     function loadDebate(debate) {
         // Clear current chat
         chatMessages.innerHTML = '';
@@ -0,0 +1,7 @@
+import os
+
+# app.core.config reads these at import time; placeholders let the suite run without a .env
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_KEY", "test")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
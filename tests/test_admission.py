@@ -0,0 +1,87 @@
+import asyncio
+import unittest
+
+from app.services.admission import AdmissionController, AdmissionRejected
+
+
+class TestAdmissionController(unittest.TestCase):
+    """Test cases for per-user rate limiting and fair debate queuing"""
+
+    def test_token_bucket_rejects_bursts(self):
+        async def scenario():
+            controller = AdmissionController(max_concurrent=10, rate_per_minute=60, burst=2)
+            await controller.acquire("spammer")
+            await controller.acquire("spammer")
+            with self.assertRaises(AdmissionRejected) as raised:
+                await controller.acquire("spammer")
+            self.assertGreater(raised.exception.retry_after, 0)
+            await controller.acquire("someone-else")
+
+        asyncio.run(scenario())
+
+    def test_queue_is_round_robin_across_users(self):
+        order, positions = [], {}
+
+        async def debate(controller, user, label):
+            async def on_position(position):
+                positions.setdefault(label, []).append(position)
+
+            await controller.acquire(user, on_position)
+            order.append(label)
+            await asyncio.sleep(0.01)
+            controller.release()
+
+        async def scenario():
+            controller = AdmissionController(max_concurrent=1, rate_per_minute=0, max_queued_per_user=5)
+            await controller.acquire("holder")
+            tasks = [asyncio.create_task(debate(controller, "heavy", f"heavy{i}")) for i in range(3)]
+            await asyncio.sleep(0)
+            tasks.append(asyncio.create_task(debate(controller, "light", "light0")))
+            await asyncio.sleep(0)
+            controller.release()
+            await asyncio.gather(*tasks)
+            return controller.stats()
+
+        stats = asyncio.run(scenario())
+        self.assertEqual(order, ["heavy0", "light0", "heavy1", "heavy2"])
+        self.assertEqual(positions["light0"][0], 2)
+        self.assertEqual((stats["active"], stats["queued"], stats["queued_total"]), (0, 0, 4))
+
+    def test_per_user_queue_cap_and_cancelled_waiters(self):
+        async def scenario():
+            controller = AdmissionController(max_concurrent=1, rate_per_minute=0, max_queued_per_user=1)
+            await controller.acquire("holder")
+            waiting = asyncio.create_task(controller.acquire("user"))
+            await asyncio.sleep(0)
+            with self.assertRaises(AdmissionRejected):
+                await controller.acquire("user")
+            waiting.cancel()
+            await asyncio.sleep(0)
+            self.assertEqual(controller.queued(), 0)
+            controller.release()
+            self.assertEqual(controller.active, 0)
+
+        asyncio.run(scenario())
+
+    def test_queue_cap_rejection_keeps_the_token(self):
+        async def scenario():
+            controller = AdmissionController(max_concurrent=1, rate_per_minute=1, burst=3, max_queued_per_user=1)
+            await controller.acquire("user")
+            waiting = asyncio.create_task(controller.acquire("user"))
+            await asyncio.sleep(0)
+            for _ in range(3):
+                with self.assertRaises(AdmissionRejected) as rejected:
+                    await controller.acquire("user")
+                self.assertIn("waiting", str(rejected.exception))
+            controller.release()
+            await waiting
+            # Two tokens were spent on the two admitted debates; the third is still there
+            controller.release()
+            await controller.acquire("user")
+            controller.release()
+
+        asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    unittest.main()
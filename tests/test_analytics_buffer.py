@@ -0,0 +1,73 @@
+import unittest
+import asyncio
+
+from app.services.analytics_buffer import AnalyticsBuffer
+
+
+class RecordingWriter:
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    async def __call__(self, rows):
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        self.batches.append(rows)
+
+
+class TestAnalyticsBuffer(unittest.TestCase):
+    """Test cases for the batched analytics ingestion buffer"""
+
+    def test_overflow_is_dropped_and_counted(self):
+        buffer = AnalyticsBuffer(RecordingWriter(), max_events=2)
+        self.assertTrue(buffer.enqueue("a"))
+        self.assertTrue(buffer.enqueue("b"))
+        self.assertFalse(buffer.enqueue("c"))
+        stats = buffer.stats()
+        self.assertEqual(stats["queue_depth"], 2)
+        self.assertEqual(stats["dropped"], 1)
+
+    def test_size_threshold_triggers_batched_flush(self):
+        writer = RecordingWriter()
+
+        async def scenario():
+            buffer = AnalyticsBuffer(writer, batch_size=3, flush_interval=60)
+            await buffer.start()
+            for i in range(7):
+                buffer.enqueue(f"event-{i}", {"i": i})
+            await asyncio.sleep(0.05)
+            depth_before_stop = buffer.stats()["queue_depth"]
+            await buffer.stop()
+            return buffer, depth_before_stop
+
+        buffer, depth_before_stop = asyncio.run(scenario())
+        self.assertEqual(depth_before_stop, 1)
+        self.assertEqual([len(batch) for batch in writer.batches], [3, 3, 1])
+        self.assertEqual(buffer.stats()["flushed"], 7)
+
+    def test_interval_flushes_partial_batch(self):
+        writer = RecordingWriter()
+
+        async def scenario():
+            buffer = AnalyticsBuffer(writer, batch_size=100, flush_interval=0.01)
+            await buffer.start()
+            buffer.enqueue("landing_view", user_id="user-1")
+            await asyncio.sleep(0.05)
+            await buffer.stop()
+
+        asyncio.run(scenario())
+        self.assertEqual(len(writer.batches), 1)
+        self.assertEqual(writer.batches[0][0]["user_id"], "user-1")
+
+    def test_failed_flush_is_accounted(self):
+        buffer = AnalyticsBuffer(RecordingWriter(fail=True))
+        buffer.enqueue("a")
+        buffer.enqueue("b")
+        asyncio.run(buffer.stop())
+        stats = buffer.stats()
+        self.assertEqual(stats["failed"], 2)
+        self.assertEqual(stats["queue_depth"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
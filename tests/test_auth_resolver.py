@@ -0,0 +1,82 @@
+import time
+import unittest
+from types import SimpleNamespace
+
+from jose import jwt
+from app.auth import AuthResolver
+
+SECRET = "test-secret"
+
+
+class FakeSupabaseAuth:
+    def __init__(self):
+        self.calls = 0
+
+    def get_user(self, token):
+        self.calls += 1
+        user = SimpleNamespace(dict=lambda: {"id": "remote-user"})
+        return SimpleNamespace(user=user)
+
+
+def make_token(sub="user-1", exp_in=3600, secret=SECRET):
+    return jwt.encode(
+        {"sub": sub, "aud": "authenticated", "email": "a@b.co", "exp": int(time.time()) + exp_in},
+        secret,
+        algorithm="HS256",
+    )
+
+
+class TestAuthResolver(unittest.TestCase):
+    """Test cases for the cached cookie auth resolver"""
+
+    def setUp(self):
+        self.auth = FakeSupabaseAuth()
+        self.client = SimpleNamespace(auth=self.auth)
+
+    def test_local_verification_skips_supabase(self):
+        resolver = AuthResolver(secret=SECRET, client=self.client)
+        user = resolver.resolve(make_token())
+        self.assertEqual(user["id"], "user-1")
+        self.assertEqual(user["email"], "a@b.co")
+        self.assertEqual(self.auth.calls, 0)
+
+    def test_cache_hits_are_counted(self):
+        resolver = AuthResolver(secret=SECRET, client=self.client)
+        token = make_token()
+        resolver.resolve(token)
+        resolver.resolve(token)
+        stats = resolver.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["local_verifications"], 1)
+
+    def test_invalid_signature_is_rejected_locally(self):
+        resolver = AuthResolver(secret=SECRET, client=self.client)
+        self.assertIsNone(resolver.resolve(make_token(secret="other-secret")))
+        self.assertEqual(self.auth.calls, 0)
+
+    def test_remote_fallback_only_on_miss(self):
+        resolver = AuthResolver(secret=None, client=self.client)
+        token = make_token()
+        self.assertEqual(resolver.resolve(token)["id"], "remote-user")
+        self.assertEqual(resolver.resolve(token)["id"], "remote-user")
+        self.assertEqual(self.auth.calls, 1)
+
+    def test_lru_eviction_bounds_cache(self):
+        resolver = AuthResolver(secret=SECRET, max_entries=2, client=self.client)
+        for i in range(3):
+            resolver.resolve(make_token(sub=f"user-{i}"))
+        self.assertEqual(resolver.stats()["size"], 2)
+        self.assertEqual(resolver.stats()["evictions"], 1)
+
+    def test_invalidate_drops_entry(self):
+        resolver = AuthResolver(secret=None, client=self.client)
+        token = make_token()
+        resolver.resolve(token)
+        resolver.invalidate(token)
+        resolver.resolve(token)
+        self.assertEqual(self.auth.calls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
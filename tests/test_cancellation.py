@@ -0,0 +1,90 @@
+import asyncio
+import unittest
+
+from fastapi import WebSocketDisconnect
+
+from app.services.cancellation import CancellationStats, ConnectionReader
+
+
+class FakeSocket:
+    def __init__(self, messages):
+        self.messages = asyncio.Queue()
+        for message in messages:
+            self.messages.put_nowait(message)
+
+    async def receive(self):
+        return await self.messages.get()
+
+
+class TestCancellation(unittest.TestCase):
+    """Test cases for disconnect-driven debate cancellation"""
+
+    def test_reader_queues_messages_then_reports_disconnect(self):
+        async def scenario():
+            socket = FakeSocket([
+                {"type": "websocket.receive", "text": '{"text": "hi"}'},
+                {"type": "websocket.disconnect"},
+            ])
+            reader = ConnectionReader(socket)
+            await reader.start()
+            first = await reader.receive_json()
+            with self.assertRaises(WebSocketDisconnect):
+                await reader.receive_json()
+            await reader.stop()
+            return first
+
+        self.assertEqual(asyncio.run(scenario()), {"text": "hi"})
+
+    def test_disconnect_cancels_the_running_debate(self):
+        async def scenario():
+            socket = FakeSocket([])
+            reader = ConnectionReader(socket)
+            await reader.start()
+            debate = asyncio.create_task(asyncio.sleep(10))
+            reader.cancel_on_disconnect(debate)
+            socket.messages.put_nowait({"type": "websocket.disconnect"})
+            with self.assertRaises(asyncio.CancelledError):
+                await debate
+            self.assertTrue(reader.disconnected.is_set())
+            await reader.stop()
+
+        asyncio.run(scenario())
+
+    def test_flooding_client_is_disconnected(self):
+        async def scenario():
+            socket = FakeSocket([{"type": "websocket.receive", "text": '{"text": "spam"}'}] * 5)
+            closed = []
+
+            async def close(code):
+                closed.append(code)
+
+            socket.close = close
+            reader = ConnectionReader(socket, max_pending=3)
+            await reader.start()
+            debate = asyncio.create_task(asyncio.sleep(10))
+            reader.cancel_on_disconnect(debate)
+            await asyncio.wait_for(reader.disconnected.wait(), 1)
+            with self.assertRaises(asyncio.CancelledError):
+                await debate
+            # Unread messages are discarded, so the endpoint sees the disconnect at once
+            with self.assertRaises(WebSocketDisconnect):
+                await reader.receive_json()
+            await reader.stop()
+            return closed
+
+        self.assertEqual(asyncio.run(scenario()), [1008])
+
+    def test_savings_use_expected_stage_cost(self):
+        stats = CancellationStats()
+        stats.record_completed("opener", tokens=100, seconds=2.0)
+        stats.record_completed("critiquer", tokens=80, seconds=1.5)
+        stats.record_cancelled("opener", tokens=30, seconds=0.5)
+        stats.record_skipped(["critiquer", "synthesizer"])
+        result = stats.stats()
+        self.assertEqual(result["tokens_saved_estimate"], 150)
+        self.assertAlmostEqual(result["seconds_saved_estimate"], 3.0)
+        self.assertEqual((result["stages_cancelled"], result["stages_skipped"]), (1, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+
+from app.services.conversation_memory import ConversationMemory, estimate_tokens, summarize_verdict
+
+
+VERDICT = """Summary:
+- Savings matter
+- Timing matters
+
+Consensus: Keep the job and test the bakery on weekends first
+
+Breakdown: Lower risk while validating demand."""
+
+
+class TestConversationMemory(unittest.TestCase):
+    """Test cases for per-connection debate memory"""
+
+    def test_verdict_is_summarized_to_consensus(self):
+        self.assertEqual(summarize_verdict(VERDICT), "Keep the job and test the bakery on weekends first")
+        self.assertTrue(summarize_verdict("x " * 500).endswith("…"))
+
+    def test_entries_are_capped(self):
+        memory = ConversationMemory(token_budget=1000, max_entries=3)
+        for i in range(10):
+            memory.add(f"Question {i}", VERDICT)
+        self.assertEqual(len(memory), 3)
+        self.assertEqual([exchange.turn for exchange in memory.exchanges], [8, 9, 10])
+
+    def test_recall_keeps_latest_and_relevant_within_budget(self):
+        memory = ConversationMemory(token_budget=60, max_entries=10)
+        memory.add("Should I move to Berlin for a startup job offer?", "Consensus: Take the Berlin offer if the equity vests early")
+        memory.add("Which programming language should my team adopt?", "Consensus: Stay with Python for now")
+        memory.add("Should I buy or lease a car?", "Consensus: Lease while your commute is uncertain")
+
+        recalled = memory.recall("What about the cost of living in Berlin with that startup salary?")
+        questions = [exchange.line for exchange in recalled]
+        self.assertEqual(len(recalled), 2)
+        self.assertIn("Berlin", questions[0])
+        self.assertIn("car", questions[1])
+        self.assertLessEqual(sum(exchange.tokens for exchange in recalled), 60)
+
+        context = memory.context_for("What about the cost of living in Berlin with that startup salary?")
+        self.assertTrue(context.startswith("\n\nPREVIOUS CONVERSATION CONTEXT:"))
+        self.assertNotIn("Python", context)
+        self.assertLessEqual(estimate_tokens(context), 80)
+
+    def test_empty_memory_gives_no_context(self):
+        self.assertEqual(ConversationMemory().context_for("Anything?"), "")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import asyncio
+from app.services.critique_pipeline import FrameGate, PipelineStats, argument_prefix, same_prefix
+
+
+class TestCritiquePipeline(unittest.TestCase):
+    """Test cases for speculative critique helpers"""
+
+    def test_prefix_waits_for_explanation_to_close(self):
+        self.assertIsNone(argument_prefix("Claim: Go\nExplanation: - because"))
+        text = "Claim: Go\nExplanation: - because\n- also\nEvidence: data"
+        self.assertEqual(argument_prefix(text), "Claim: Go\nExplanation: - because\n- also")
+
+    def test_prefix_tolerates_markdown_labels(self):
+        text = "**Claim:** Go\n**Explanation:** why\n**Stance:** Pro"
+        self.assertEqual(argument_prefix(text), "**Claim:** Go\n**Explanation:** why")
+
+    def test_same_prefix_ignores_whitespace(self):
+        self.assertTrue(same_prefix("Claim: Go\nExplanation: x", "Claim:  Go Explanation: x"))
+        self.assertFalse(same_prefix("Claim: Go", None))
+
+    def test_gate_buffers_until_released(self):
+        sent = []
+
+        async def send(frame):
+            sent.append(frame)
+
+        async def scenario():
+            gate = FrameGate(send)
+            await gate.emit({"type": "typing"})
+            await gate.emit({"type": "stream", "text": "a"})
+            self.assertEqual(sent, [])
+            await gate.release()
+            await gate.emit({"type": "stream", "text": "b"})
+            return gate
+
+        gate = asyncio.run(scenario())
+        self.assertEqual([f.get("text") for f in sent], [None, "a", "b"])
+        self.assertIsNotNone(gate.first_stream_at)
+
+    def test_frames_emitted_during_release_are_not_lost(self):
+        sent = []
+
+        async def slow_send(frame):
+            await asyncio.sleep(0.001)
+            sent.append(frame["text"])
+
+        async def producer(gate):
+            for i in range(3, 8):
+                await gate.emit({"type": "stream", "text": str(i)})
+                await asyncio.sleep(0)
+
+        async def scenario():
+            gate = FrameGate(slow_send)
+            for i in range(3):
+                await gate.emit({"type": "stream", "text": str(i)})
+            await asyncio.gather(gate.release(), producer(gate))
+
+        asyncio.run(scenario())
+        self.assertEqual(sent, [str(i) for i in range(8)])
+
+    def test_saved_time_accounts_for_model_ttft(self):
+        stats = PipelineStats()
+        # Requested at t=1, first token at t=1.5, opener finished at t=3:
+        # sequential first token would be 3.5, pipelined is visible at 3.0.
+        saved = stats.record_accepted(requested_at=1.0, first_token_at=1.5, opener_done_at=3.0)
+        self.assertAlmostEqual(saved, 0.5)
+        self.assertEqual(stats.stats()["accepted"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import asyncio
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database import Debate
+from app.services import debate_service
+from app.services.debate_service import DebateService, InvalidCursorError, encode_cursor
+
+
+class TestDebatePagination(unittest.TestCase):
+    """Test cases for keyset pagination of debate summaries"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self.directory.name, "debates.db")
+        engine = create_engine(f"sqlite:///{path}")
+        SQLModel.metadata.create_all(engine)
+        tied = datetime(2026, 1, 1, 12, 0, 0)
+        with Session(engine) as session:
+            for i in range(7):
+                session.add(Debate(
+                    debate_id=f"debate-{i}",
+                    user_id="user-1",
+                    # Four debates share a timestamp, so the page boundary falls inside the tie
+                    timestamp=tied if i < 4 else datetime(2026, 1, 1, 12, 0, i),
+                    user_prompt=f"Question {i}?",
+                    opener={"model": "m-1", "response": "Claim: yes"},
+                    critiquer={"model": "m-2", "response": "Claim: no"},
+                    synthesizer={"model": "m-3", "response": f"Consensus: answer {i}"},
+                ))
+            session.add(Debate(debate_id="other", user_id="user-2", timestamp=tied, user_prompt="Not mine"))
+            session.commit()
+        engine.dispose()
+        self.async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        factory = async_sessionmaker(self.async_engine, class_=AsyncSession, expire_on_commit=False)
+        patcher = mock.patch.object(debate_service, "async_session_factory", factory)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        asyncio.run(self.async_engine.dispose())
+        self.directory.cleanup()
+
+    def test_cursor_round_trip_visits_every_debate_once(self):
+        service = DebateService()
+
+        async def walk():
+            pages, cursor = [], None
+            while True:
+                items, cursor = await service.list_debate_summaries_async("user-1", limit=2, cursor=cursor)
+                pages.append([item["debate_id"] for item in items])
+                if cursor is None:
+                    return pages, items
+
+        pages, last_items = asyncio.run(walk())
+        self.assertEqual(pages, [
+            ["debate-6", "debate-5"],
+            ["debate-4", "debate-3"],
+            ["debate-2", "debate-1"],
+            ["debate-0"],
+        ])
+        self.assertEqual(last_items[0]["consensus"], "answer 0")
+
+    def test_exact_final_page_has_no_cursor(self):
+        items, cursor = asyncio.run(DebateService().list_debate_summaries_async("user-1", limit=7))
+        self.assertEqual(len(items), 7)
+        self.assertIsNone(cursor)
+
+    def test_cursor_past_the_end_returns_an_empty_page(self):
+        cursor = encode_cursor(datetime(2000, 1, 1), "debate-0")
+        items, next_cursor = asyncio.run(DebateService().list_debate_summaries_async("user-1", cursor=cursor))
+        self.assertEqual((items, next_cursor), ([], None))
+
+    def test_invalid_cursor_is_rejected(self):
+        service = DebateService()
+        for cursor in ("not-base64!", "bm90IGpzb24=", encode_cursor(datetime(2026, 1, 1), "x")[:-4]):
+            with self.assertRaises(InvalidCursorError):
+                asyncio.run(service.list_debate_summaries_async("user-1", cursor=cursor))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,209 @@
+import os
+import unittest
+import asyncio
+import json
+import tempfile
+from unittest import mock
+from datetime import datetime
+
+from app.services.debate_write_queue import DebateWriteQueue, debate_row
+
+
+def debate(i):
+    return {
+        "debate_id": f"debate-{i}",
+        "user_id": "user-1",
+        "timestamp": datetime(2026, 1, 1, 12, 0, i).isoformat(),
+        "user_prompt": f"Question {i}?",
+        "opener_model": "m-1", "opener_response": "Claim: yes",
+        "critiquer_model": "m-2", "critiquer_response": "Claim: no",
+        "synthesizer_model": "m-3", "synthesizer_response": "Consensus: maybe",
+    }
+
+
+class FlakyWriter:
+    def __init__(self, failures=0):
+        self.batches = []
+        self.failures = failures
+
+    async def __call__(self, rows):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("database unavailable")
+        self.batches.append(rows)
+
+
+class RejectingWriter(FlakyWriter):
+    """Rejects any batch containing one of ``bad_ids``, like a database refusing a malformed row."""
+
+    def __init__(self, bad_ids):
+        super().__init__()
+        self.bad_ids = set(bad_ids)
+
+    async def __call__(self, rows):
+        if any(row["debate_id"] in self.bad_ids for row in rows):
+            raise ValueError("A string literal cannot contain NUL (0x00) characters.")
+        self.batches.append(rows)
+
+
+class TestDebateWriteQueue(unittest.TestCase):
+    """Test cases for the write-behind debate persistence queue"""
+
+    def test_debates_are_written_in_batches(self):
+        writer = FlakyWriter()
+
+        async def scenario():
+            queue = DebateWriteQueue(writer, batch_size=3, flush_interval=60)
+            await queue.start()
+            for i in range(7):
+                queue.enqueue(debate(i))
+            await asyncio.sleep(0.05)
+            await queue.stop()
+            return queue
+
+        queue = asyncio.run(scenario())
+        self.assertEqual([len(batch) for batch in writer.batches], [3, 3, 1])
+        row = writer.batches[0][0]
+        self.assertEqual(row["debate_id"], "debate-0")
+        self.assertEqual(row["opener"], {"model": "m-1", "response": "Claim: yes"})
+        self.assertIsInstance(row["timestamp"], datetime)
+        self.assertEqual(queue.stats()["flushed"], 7)
+
+    def test_failed_batches_are_retried_with_backoff(self):
+        writer = FlakyWriter(failures=2)
+
+        async def scenario():
+            queue = DebateWriteQueue(writer, flush_interval=0.01, retry_base=0.01, spill_after=5)
+            await queue.start()
+            queue.enqueue(debate(1))
+            await asyncio.sleep(0.2)
+            await queue.stop()
+            return queue
+
+        queue = asyncio.run(scenario())
+        self.assertEqual([[row["debate_id"] for row in batch] for batch in writer.batches], [["debate-1"]])
+        stats = queue.stats()
+        self.assertEqual(stats["failed_attempts"], 2)
+        self.assertEqual(stats["consecutive_failures"], 0)
+        self.assertEqual(stats["queue_depth"], 0)
+
+    def test_backoff_grows_and_is_capped(self):
+        queue = DebateWriteQueue(FlakyWriter(), retry_base=1.0, retry_max=4.0)
+        delays = []
+        for failures in (1, 2, 3, 10):
+            queue._failures = failures
+            delays.append(queue.retry_delay())
+        self.assertTrue(0.5 <= delays[0] <= 1.0)
+        self.assertTrue(1.0 <= delays[1] <= 2.0)
+        self.assertTrue(2.0 <= delays[3] <= 4.0)
+
+    def test_outage_spills_to_journal_and_replays(self):
+        with tempfile.TemporaryDirectory() as directory:
+            journal = os.path.join(directory, "debates.jsonl")
+
+            async def outage():
+                queue = DebateWriteQueue(FlakyWriter(failures=1000), max_pending=2, flush_interval=0.01,
+                                         retry_base=0.001, spill_after=1, journal_path=journal)
+                await queue.start()
+                for i in range(4):
+                    self.assertTrue(queue.enqueue(debate(i)))
+                await asyncio.sleep(0.05)
+                await queue.stop()
+                return queue
+
+            down = asyncio.run(outage())
+            self.assertEqual(down.stats()["spilled"], 4)
+            self.assertEqual(down.stats()["dropped"], 0)
+
+            writer = FlakyWriter()
+
+            async def recovery():
+                queue = DebateWriteQueue(writer, flush_interval=0.01, journal_path=journal)
+                await queue.start()
+                await asyncio.sleep(0.05)
+                await queue.stop()
+                return queue
+
+            up = asyncio.run(recovery())
+            written = sorted(row["debate_id"] for batch in writer.batches for row in batch)
+            self.assertEqual(written, [f"debate-{i}" for i in range(4)])
+            self.assertIsInstance(writer.batches[0][0]["timestamp"], datetime)
+            self.assertEqual(up.stats()["replayed"], 4)
+            self.assertEqual(os.listdir(directory), [])
+
+    def test_a_bad_row_is_dead_lettered_instead_of_blocking_the_queue(self):
+        writer = RejectingWriter({"debate-2"})
+        with tempfile.TemporaryDirectory() as directory:
+            dead_letters = os.path.join(directory, "dead.jsonl")
+
+            async def scenario():
+                queue = DebateWriteQueue(writer, batch_size=4, flush_interval=0.01, retry_base=0.001,
+                                         spill_after=100, dead_letter_path=dead_letters)
+                await queue.start()
+                for i in range(8):
+                    queue.enqueue(debate(i))
+                await asyncio.sleep(0.3)
+                await queue.stop()
+                return queue
+
+            queue = asyncio.run(scenario())
+            with open(dead_letters) as handle:
+                entries = [json.loads(line) for line in handle]
+        written = sorted(row["debate_id"] for batch in writer.batches for row in batch)
+        self.assertEqual(written, [f"debate-{i}" for i in range(8) if i != 2])
+        self.assertEqual([entry["row"]["debate_id"] for entry in entries], ["debate-2"])
+        self.assertIn("NUL", entries[0]["error"])
+        self.assertEqual(queue.stats()["dead_lettered"], 1)
+        self.assertEqual(queue.stats()["queue_depth"], 0)
+
+    def test_a_bad_journaled_row_does_not_block_replay(self):
+        with tempfile.TemporaryDirectory() as directory:
+            journal = os.path.join(directory, "debates.jsonl")
+            spiller = DebateWriteQueue(FlakyWriter(), journal_path=journal)
+            spiller._spill([debate_row(debate(i)) for i in range(5)])
+            writer = RejectingWriter({"debate-1"})
+
+            async def scenario():
+                queue = DebateWriteQueue(writer, batch_size=10, flush_interval=0.01, retry_base=0.001,
+                                         journal_path=journal, dead_letter_path=os.path.join(directory, "dead.jsonl"))
+                await queue.start()
+                await asyncio.sleep(0.2)
+                await queue.stop()
+                return queue
+
+            queue = asyncio.run(scenario())
+            self.assertEqual(sorted(os.listdir(directory)), ["dead.jsonl"])
+        # Rows before the bad one are written again on the second replay; the INSERT skips them
+        written = {row["debate_id"] for batch in writer.batches for row in batch}
+        self.assertEqual(written, {"debate-0", "debate-2", "debate-3", "debate-4"})
+        self.assertEqual(queue.stats()["dead_lettered"], 1)
+
+    def test_full_queue_journals_off_the_event_loop(self):
+        with tempfile.TemporaryDirectory() as directory:
+            journal = os.path.join(directory, "debates.jsonl")
+
+            async def scenario():
+                queue = DebateWriteQueue(FlakyWriter(), max_pending=1, journal_path=journal)
+                queue.enqueue(debate(1))
+                with mock.patch.object(queue, "_spill", wraps=queue._spill) as spill:
+                    self.assertTrue(queue.enqueue(debate(2)))
+                    # Nothing is written until the loop gets to run the spill task
+                    self.assertFalse(spill.called)
+                    await queue._overflow_task
+                    self.assertEqual(spill.call_count, 1)
+                stats = queue.stats()
+                self.assertEqual((stats["enqueued"], stats["spilled"], stats["dropped"]), (2, 1, 0))
+
+            asyncio.run(scenario())
+            with open(journal) as handle:
+                self.assertEqual([json.loads(line)["debate_id"] for line in handle], ["debate-2"])
+
+    def test_full_queue_without_journal_drops(self):
+        queue = DebateWriteQueue(FlakyWriter(), max_pending=1)
+        self.assertTrue(queue.enqueue(debate(1)))
+        self.assertFalse(queue.enqueue(debate(2)))
+        self.assertEqual(queue.stats()["dropped"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
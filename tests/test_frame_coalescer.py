@@ -0,0 +1,68 @@
+import unittest
+import asyncio
+from app.services.frame_coalescer import FrameCoalescer
+
+
+def _stream(text, role="opener", index=None):
+    return {"type": "stream", "sender": "m", "role": role, "index": index, "text": text}
+
+
+class TestFrameCoalescer(unittest.TestCase):
+    """Test cases for websocket stream frame coalescing"""
+
+    def run_scenario(self, scenario):
+        sent = []
+
+        async def send(frame):
+            sent.append(frame)
+
+        asyncio.run(scenario(send))
+        return sent
+
+    def test_deltas_merge_until_final_frame(self):
+        async def scenario(send):
+            coalescer = FrameCoalescer(send, flush_interval=10)
+            for word in ["a", "b", "c"]:
+                await coalescer.push(_stream(word))
+            await coalescer.push({"type": "final", "role": "opener", "text": "abc"})
+
+        sent = self.run_scenario(scenario)
+        self.assertEqual([f["type"] for f in sent], ["stream", "final"])
+        self.assertEqual(sent[0]["text"], "abc")
+
+    def test_stages_are_kept_apart(self):
+        async def scenario(send):
+            coalescer = FrameCoalescer(send, flush_interval=10)
+            await coalescer.push(_stream("x", index=0))
+            await coalescer.push(_stream("y", index=1))
+            await coalescer.push(_stream("z", index=0))
+            await coalescer.close()
+
+        sent = self.run_scenario(scenario)
+        self.assertEqual([(f["index"], f["text"]) for f in sent], [(0, "xz"), (1, "y")])
+
+    def test_byte_limit_flushes_early(self):
+        async def scenario(send):
+            coalescer = FrameCoalescer(send, flush_interval=10, max_bytes=4)
+            for word in ["ab", "cd", "ef"]:
+                await coalescer.push(_stream(word))
+            self.assertEqual(coalescer.frames_out, 1)
+            await coalescer.close()
+
+        sent = self.run_scenario(scenario)
+        self.assertEqual([f["text"] for f in sent], ["abcd", "ef"])
+
+    def test_zero_interval_disables_coalescing(self):
+        async def scenario(send):
+            coalescer = FrameCoalescer(send, flush_interval=0)
+            await coalescer.start()
+            await coalescer.push(_stream("a"))
+            await coalescer.push(_stream("b"))
+            await coalescer.close()
+
+        sent = self.run_scenario(scenario)
+        self.assertEqual([f["text"] for f in sent], ["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import asyncio
+import unittest
+
+from app.services.hedging import StageLatencyTracker, hedged_stream, percentile
+
+
+def fake_stream(delays, cancelled, failing=()):
+    """Builds a stream function where each model waits ``delays[model]`` before its first token."""
+
+    async def stream(model, history, on_chunk):
+        try:
+            await asyncio.sleep(delays[model])
+            if model in failing:
+                raise RuntimeError(f"{model} is down")
+            for word in ["hello ", "world"]:
+                await on_chunk(word, model)
+            return "hello world", model
+        except asyncio.CancelledError:
+            cancelled.append(model)
+            raise
+
+    return stream
+
+
+class TestHedgedStream(unittest.TestCase):
+    """Test cases for hedged stage requests"""
+
+    def run_hedged(self, delays, failing=(), ttft_deadline=0.05):
+        received, cancelled, abandoned = [], [], []
+        tracker = StageLatencyTracker()
+
+        async def on_chunk(delta, sender):
+            received.append((sender, delta))
+
+        async def scenario():
+            return await hedged_stream(
+                fake_stream(delays, cancelled, failing), "primary", [], on_chunk, ttft_deadline,
+                pick_alternate=lambda: "alternate",
+                on_abandoned=lambda model, waited: abandoned.append(model),
+                tracker=tracker,
+            )
+
+        result = asyncio.run(scenario())
+        return result, received, cancelled, abandoned, tracker
+
+    def test_fast_primary_is_not_hedged(self):
+        result, received, cancelled, _, tracker = self.run_hedged({"primary": 0.0, "alternate": 0.0})
+        self.assertEqual(result, ("hello world", "primary"))
+        self.assertEqual(tracker.hedges_fired, 0)
+        self.assertEqual(cancelled, [])
+
+    def test_stalled_primary_loses_to_hedge_and_is_cancelled(self):
+        result, received, cancelled, abandoned, tracker = self.run_hedged({"primary": 1.0, "alternate": 0.0})
+        self.assertEqual(result, ("hello world", "alternate"))
+        self.assertEqual({sender for sender, _ in received}, {"alternate"})
+        self.assertEqual(cancelled, ["primary"])
+        self.assertEqual(abandoned, ["primary"])
+        self.assertEqual((tracker.hedges_fired, tracker.hedges_won), (1, 1))
+
+    def test_primary_failure_hedges_immediately(self):
+        result, _, _, _, tracker = self.run_hedged({"primary": 0.0, "alternate": 0.0}, failing={"primary"}, ttft_deadline=5)
+        self.assertEqual(result[1], "alternate")
+        self.assertEqual(tracker.hedges_fired, 1)
+
+    def test_all_attempts_failing_raises(self):
+        with self.assertRaises(RuntimeError):
+            self.run_hedged({"primary": 0.0, "alternate": 0.0}, failing={"primary", "alternate"})
+
+    def test_latency_percentiles_split_by_mode(self):
+        self.assertEqual(percentile([3, 1, 2, 4], 50), 2)
+        tracker = StageLatencyTracker()
+        for seconds in range(1, 101):
+            tracker.record("opener", float(seconds), hedging=True)
+        tracker.record("opener", 7.0, hedging=False)
+        stages = tracker.stats()["stages"]["opener"]
+        self.assertEqual((stages["hedging_on"]["p50"], stages["hedging_on"]["p99"]), (50.0, 99.0))
+        self.assertEqual(stages["hedging_off"]["count"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import asyncio
+import os
+import time
+import unittest
+
+from app.core.loop_monitor import LoopMonitor
+
+
+def blocking_handler():
+    time.sleep(0.2)
+
+
+class TestLoopMonitor(unittest.TestCase):
+    """Test cases for the event-loop lag monitor and blocking-call watchdog"""
+
+    def test_blocking_call_is_attributed_to_its_call_site(self):
+        monitor = LoopMonitor(interval=0.01, threshold=0.05, app_root=os.path.dirname(os.path.abspath(__file__)))
+
+        async def run():
+            await monitor.start()
+            await asyncio.sleep(0.05)
+            blocking_handler()
+            await asyncio.sleep(0.05)
+            await monitor.stop()
+
+        asyncio.run(run())
+        stats = monitor.stats()
+        self.assertEqual(stats["stalls"], 1)
+        self.assertGreaterEqual(stats["max_lag_ms"], 150)
+        offender = monitor.offenders()[0]
+        # Charged to the coroutine that made the blocking call, not to the sync helper
+        self.assertRegex(offender["location"], r"test_loop_monitor\.py:\d+ in run$")
+        self.assertIn("in blocking_handler", offender["blocking_call"])
+        self.assertEqual(offender["count"], 1)
+        self.assertTrue(any("time.sleep(0.2)" in line for line in offender["stack"]))
+
+    def test_short_delays_are_not_stalls(self):
+        monitor = LoopMonitor(interval=0.01, threshold=0.05)
+        for lag in (0.0, 0.002, 0.049, -0.001):
+            monitor.record(lag)
+        self.assertEqual(monitor.stats()["samples"], 4)
+        self.assertEqual(monitor.stats()["stalls"], 0)
+        self.assertEqual(monitor.offenders(), [])
+
+    def test_stall_without_a_captured_stack_is_unattributed(self):
+        monitor = LoopMonitor(interval=0.01, threshold=0.05)
+        monitor.record(0.3)
+        self.assertEqual(monitor.stats()["unattributed_stalls"], 1)
+        self.assertEqual(monitor.offenders(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
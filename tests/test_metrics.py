@@ -0,0 +1,54 @@
+import unittest
+from app.core.metrics import MetricsRegistry
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Test cases for the Prometheus text exposition registry"""
+
+    def test_counter_and_gauge_render(self):
+        registry = MetricsRegistry("test")
+        errors = registry.counter("errors_total", "Errors.", ("model", "status"))
+        sessions = registry.gauge("sessions", "Open sessions.")
+        errors.labels("m-1", 429).inc()
+        errors.labels("m-1", 429).inc(2)
+        sessions.inc()
+        text = registry.render()
+        self.assertIn("# TYPE test_errors_total counter", text)
+        self.assertIn('test_errors_total{model="m-1",status="429"} 3', text)
+        self.assertIn("test_sessions 1", text)
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry("test")
+        latency = registry.histogram("ttft_seconds", "TTFT.", ("role",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            latency.labels("opener").observe(value)
+        text = registry.render()
+        self.assertIn('test_ttft_seconds_bucket{role="opener",le="0.1"} 2', text)
+        self.assertIn('test_ttft_seconds_bucket{role="opener",le="1"} 3', text)
+        self.assertIn('test_ttft_seconds_bucket{role="opener",le="+Inf"} 4', text)
+        self.assertIn('test_ttft_seconds_count{role="opener"} 4', text)
+        self.assertIn('test_ttft_seconds_sum{role="opener"} 3.65', text)
+
+    def test_label_values_are_escaped(self):
+        registry = MetricsRegistry("test")
+        registry.counter("calls_total", "Calls.", ("model",)).labels('a"b\\c').inc()
+        self.assertIn('test_calls_total{model="a\\"b\\\\c"} 1', registry.render())
+
+    def test_component_stats_are_exported_as_gauges(self):
+        registry = MetricsRegistry("test")
+        registry.register_stats("router", lambda: {
+            "routed": 5,
+            "label": "ignored",
+            "models": {"m-1": {"requests": 2, "ttft_ewma": None}, "m-2": {"requests": 3, "ttft_ewma": 0.4}},
+        }, nested={"models": ("model",)})
+        text = registry.render()
+        self.assertIn("test_router_routed 5", text)
+        self.assertNotIn("label", text)
+        self.assertIn('test_router_requests{model="m-1"} 2', text)
+        self.assertIn('test_router_ttft_ewma{model="m-2"} 0.4', text)
+        self.assertNotIn('test_router_ttft_ewma{model="m-1"}', text)
+        self.assertEqual(text.count("# TYPE test_router_requests gauge"), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import asyncio
+import unittest
+
+from app.services.ai_service import AIService
+from app.services.critique_pipeline import argument_prefix
+from app.services.mock_llm import MockLLMClient, MockLLMError
+from app.services.model_router import ModelRouter
+
+
+class TestMockLLM(unittest.TestCase):
+    """Test cases for the offline mock LLM provider"""
+
+    def stream(self, client, prompt="Should I open a bakery?"):
+        service = AIService(client=client, router=ModelRouter(["mock-model"]))
+        deltas = []
+
+        async def on_chunk(delta, model):
+            deltas.append(delta)
+
+        text, _ = asyncio.run(service.stream_bot_response("mock-model", [{"role": "user", "content": prompt}], on_chunk))
+        return text, deltas
+
+    def test_streams_are_deterministic_and_well_formed(self):
+        first, deltas = self.stream(MockLLMClient(ttft=0, token_delay=0, tokens=40, seed=3))
+        second, _ = self.stream(MockLLMClient(ttft=0, token_delay=0, tokens=40, seed=3))
+        self.assertEqual(first, second)
+        self.assertEqual("".join(deltas), first)
+        self.assertIsNotNone(argument_prefix(first))
+
+    def test_synthesis_and_followup_formats(self):
+        verdict, _ = self.stream(MockLLMClient(ttft=0, token_delay=0), "You are the JUDGE providing the Golden Answer.")
+        self.assertIn("Consensus:", verdict)
+        followups, _ = self.stream(MockLLMClient(ttft=0, token_delay=0), "Generate exactly 3 SHORT follow-up questions")
+        self.assertEqual(len(followups.splitlines()), 3)
+
+    def test_error_injection_raises_with_status(self):
+        client = MockLLMClient(ttft=0, token_delay=0, error_rate=1.0)
+        statuses = set()
+        for _ in range(10):
+            with self.assertRaises(MockLLMError) as raised:
+                self.stream(client)
+            statuses.add(raised.exception.status_code)
+        self.assertTrue(statuses <= {429, 500})
+        self.assertEqual(client.errors, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
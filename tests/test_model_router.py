@@ -0,0 +1,48 @@
+import random
+import unittest
+
+from app.services.model_router import ModelRouter
+
+
+class TestModelRouter(unittest.TestCase):
+    """Test cases for latency- and error-aware model selection"""
+
+    def make_router(self, exploration=0.0):
+        return ModelRouter(["fast", "slow"], alpha=0.5, exploration=exploration, rng=random.Random(7))
+
+    def first_pick_counts(self, router, rounds=500):
+        counts = {"fast": 0, "slow": 0}
+        for _ in range(rounds):
+            counts[router.pick(1)[0]] += 1
+        return counts
+
+    def test_faster_model_is_preferred(self):
+        router = self.make_router()
+        router.record_success("fast", ttft=0.2, tokens=300, duration=1.0)
+        router.record_success("slow", ttft=2.0, tokens=300, duration=6.0)
+        counts = self.first_pick_counts(router)
+        self.assertGreater(counts["fast"], counts["slow"] * 3)
+
+    def test_rate_limited_model_is_deprioritised(self):
+        router = self.make_router()
+        router.record_success("fast", ttft=0.2, tokens=300, duration=1.0)
+        router.record_success("slow", ttft=0.2, tokens=300, duration=1.0)
+        router.record_error("fast", status_code=429)
+        counts = self.first_pick_counts(router)
+        self.assertGreater(counts["slow"], counts["fast"] * 10)
+        self.assertEqual(router.stats()["models"]["fast"]["recent_429s"], 1)
+
+    def test_unseen_models_get_tried(self):
+        router = self.make_router()
+        router.record_success("fast", ttft=0.2, tokens=300, duration=1.0)
+        self.assertAlmostEqual(router.weight("slow"), router.weight("fast"))
+
+    def test_pick_returns_distinct_models_then_cycles(self):
+        router = self.make_router(exploration=0.5)
+        self.assertEqual(sorted(router.pick(2)), ["fast", "slow"])
+        self.assertEqual(len(router.pick(3)), 3)
+        self.assertGreater(router.stats()["explored"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
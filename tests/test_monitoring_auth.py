@@ -0,0 +1,34 @@
+import unittest
+from unittest import mock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api.routers import metrics, monitoring
+
+OPEN_BEFORE = ("/monitoring/models", "/monitoring/stages", "/monitoring/cancellations", "/monitoring/admission", "/metrics")
+
+
+class TestMonitoringAuth(unittest.TestCase):
+    """Test cases for the admin guard on monitoring and metrics endpoints"""
+
+    def setUp(self):
+        app = FastAPI()
+        app.include_router(monitoring.router)
+        app.include_router(metrics.router)
+        self.client = TestClient(app)
+
+    def test_endpoints_are_disabled_without_an_admin_token(self):
+        with mock.patch("app.auth.ADMIN_TOKEN", None):
+            for path in OPEN_BEFORE:
+                self.assertEqual(self.client.get(path, headers={"X-Admin-Token": "guess"}).status_code, 404, path)
+
+    def test_endpoints_need_the_admin_token(self):
+        with mock.patch("app.auth.ADMIN_TOKEN", "s3cret"):
+            for path in OPEN_BEFORE:
+                self.assertEqual(self.client.get(path).status_code, 403, path)
+                self.assertEqual(self.client.get(path, headers={"X-Admin-Token": "wrong"}).status_code, 403, path)
+                self.assertEqual(self.client.get(path, headers={"X-Admin-Token": "s3cret"}).status_code, 200, path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import time
+import unittest
+from unittest import mock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.core.profiler import ProfileRequestMiddleware, ProfilerBusy, SamplingProfiler
+
+
+def burn(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(100))
+
+
+class TestSamplingProfiler(unittest.TestCase):
+    """Test cases for the on-demand sampling profiler"""
+
+    def test_collapsed_stacks_show_the_hot_function(self):
+        profiler = SamplingProfiler(interval=0.002)
+        session = profiler.begin("test")
+        burn(0.2)
+        profiler.end(session)
+        self.assertGreater(session.samples, 10)
+        collapsed = profiler.collapsed(session)
+        hot = [line for line in collapsed.splitlines() if "burn (test_profiler.py:" in line]
+        self.assertTrue(hot)
+        self.assertTrue(hot[0].startswith("MainThread;"))
+        self.assertEqual(profiler.stats()["active_sessions"], 0)
+
+    def test_speedscope_document_is_well_formed(self):
+        profiler = SamplingProfiler(interval=0.002)
+        session = profiler.begin("debate x")
+        burn(0.1)
+        profiler.end(session)
+        document = profiler.speedscope(session)
+        frame_count = len(document["shared"]["frames"])
+        main = next(profile for profile in document["profiles"] if profile["name"] == "MainThread")
+        self.assertEqual(main["type"], "sampled")
+        self.assertEqual(len(main["samples"]), len(main["weights"]))
+        self.assertTrue(all(0 <= index < frame_count for sample in main["samples"] for index in sample))
+        self.assertAlmostEqual(sum(main["weights"]), session.samples * profiler.interval, places=3)
+        self.assertIn("burn", {frame["name"] for frame in document["shared"]["frames"]})
+
+    def test_session_limit(self):
+        profiler = SamplingProfiler(max_sessions=1)
+        session = profiler.begin("first")
+        with self.assertRaises(ProfilerBusy):
+            profiler.begin("second")
+        profiler.end(session)
+        profiler.end(profiler.begin("third"))
+        self.assertEqual([summary["label"] for summary in profiler.recent()], ["third", "first"])
+
+    def test_request_header_needs_an_admin_token(self):
+        profiler = SamplingProfiler(interval=0.002)
+        app = FastAPI()
+        app.add_middleware(ProfileRequestMiddleware, profiler=profiler)
+
+        @app.get("/work")
+        def work():
+            burn(0.05)
+            return {"ok": True}
+
+        client = TestClient(app)
+        with mock.patch("app.auth.ADMIN_TOKEN", "s3cret"):
+            self.assertNotIn("x-profile-id", client.get("/work", headers={"X-Profile": "1"}).headers)
+            response = client.get("/work", headers={"X-Profile": "1", "X-Admin-Token": "s3cret"})
+        profile_id = response.headers["x-profile-id"]
+        session = profiler.get(profile_id)
+        self.assertEqual(session.label, "GET /work")
+        self.assertIn("burn (test_profiler.py:", profiler.collapsed(session))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+from app.services.prompt_builder import (
+    count_message_tokens,
+    count_tokens,
+    critique_messages,
+    max_output_tokens,
+    opener_messages,
+    quote_budget,
+    synthesis_messages,
+    trim_to_tokens,
+)
+
+
+class TestPromptBuilder(unittest.TestCase):
+    """Test cases for stage prompts and token budgets"""
+
+    def test_output_budgets_follow_schema_limits(self):
+        # ArgumentResponse allows 700 characters of text fields; SynthesisResponse more
+        self.assertGreater(max_output_tokens("opener"), 700 // 4)
+        self.assertLess(max_output_tokens("opener"), 400)
+        self.assertEqual(max_output_tokens("opener"), max_output_tokens("critiquer"))
+        self.assertGreater(max_output_tokens("synthesizer"), max_output_tokens("opener"))
+        self.assertLess(max_output_tokens("followups"), max_output_tokens("opener"))
+
+    def test_reasoning_models_get_extra_budget(self):
+        self.assertGreater(max_output_tokens("opener", "openai/gpt-oss-20b"), max_output_tokens("opener", "llama-3.3-70b-versatile"))
+
+    def test_trim_to_tokens(self):
+        text = "alpha beta gamma " * 200
+        trimmed = trim_to_tokens(text, 50)
+        self.assertLessEqual(count_tokens(trimmed), 50)
+        self.assertTrue(trimmed.endswith("…"))
+        self.assertEqual(trim_to_tokens("short text", 50), "short text")
+
+    def test_trim_to_tokens_without_spaces(self):
+        url = "https://example.com/" + "a1b2c3d4/" * 200
+        passage = "辩论需要证据和逻辑。" * 100
+        for text in (url, passage, "Source: " + url):
+            trimmed = trim_to_tokens(text, 50)
+            self.assertLessEqual(count_tokens(trimmed), 50)
+            self.assertTrue(trimmed.endswith("…"))
+            # Most of the budget is used rather than dropping the text
+            self.assertGreater(count_tokens(trimmed), 40)
+            self.assertTrue(text.startswith(trimmed[:-2]))
+
+    def test_quoted_arguments_are_trimmed(self):
+        rambling = "Claim: x\nExplanation: " + "more words here " * 500
+        critique = critique_messages("Should I?", [(rambling, "model-a")])
+        synthesis = synthesis_messages("Should I?", [(rambling, "model-a"), (rambling, "model-b")], (rambling, "model-c"))
+        base = count_message_tokens(critique_messages("Should I?", [("", "model-a")]))
+        self.assertLessEqual(count_message_tokens(critique), base + quote_budget() + 2)
+        self.assertIn("[O2] model-b", synthesis[0]["content"])
+        self.assertLess(count_message_tokens(synthesis), 4 * quote_budget())
+
+    def test_opener_messages_carry_context(self):
+        messages = opener_messages("Should I?", "\n\nPREVIOUS CONVERSATION CONTEXT:\n- Q: a → A: b", "\n\nREFERENCE NOTES")
+        self.assertEqual([message["role"] for message in messages], ["system", "user"])
+        self.assertTrue(messages[0]["content"].endswith("REFERENCE NOTES"))
+        self.assertIn("PREVIOUS CONVERSATION CONTEXT", messages[1]["content"])
+
+
+if __name__ == '__main__':
+    unittest.main()
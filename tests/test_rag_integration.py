@@ -1,6 +1,7 @@
 import unittest
 import asyncio
 import time
+
 from app.services.rag.knowledge_retrieval import KnowledgeRetrieval
 
 class TestRAGIntegration(unittest.TestCase):
@@ -0,0 +1,147 @@
+import os
+import unittest
+import asyncio
+import tempfile
+from datetime import datetime
+
+from app.services.debate_write_queue import DebateWriteQueue, debate_row
+from app.services.rating_coalescer import RatingCoalescer
+
+
+class FakeRatingWriter:
+    def __init__(self, failures=0, owned=None):
+        self.calls = []
+        self.failures = failures
+        self.owned = owned
+
+    async def __call__(self, updates):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("database unavailable")
+        self.calls.append({key: dict(ratings) for key, ratings in updates.items()})
+        return [key for key in updates if self.owned is not None and key not in self.owned]
+
+
+async def no_insert(rows):
+    pass
+
+
+class TestRatingCoalescer(unittest.TestCase):
+    """Test cases for the debate rating write coalescer"""
+
+    def test_a_burst_of_clicks_becomes_one_write_with_the_last_value(self):
+        writer = FakeRatingWriter()
+
+        async def scenario():
+            coalescer = RatingCoalescer(writer, window=0.05)
+            await coalescer.start()
+            for rating in (1, 2, 5, 3):
+                coalescer.submit("debate-1", "user-1", "opener", rating)
+            coalescer.submit("debate-1", "user-1", "final", 4)
+            coalescer.submit("debate-2", "user-1", "final", 2)
+            await asyncio.sleep(0.15)
+            await coalescer.stop()
+            return coalescer
+
+        coalescer = asyncio.run(scenario())
+        self.assertEqual(writer.calls, [{
+            ("debate-1", "user-1"): {"opener_rating": 3, "final_rating": 4},
+            ("debate-2", "user-1"): {"final_rating": 2},
+        }])
+        stats = coalescer.stats()
+        self.assertEqual((stats["submitted"], stats["coalesced"], stats["writes"]), (6, 4, 2))
+
+    def test_ratings_for_queued_debates_patch_the_pending_row(self):
+        writer = FakeRatingWriter()
+        queue = DebateWriteQueue(no_insert)
+        queue.enqueue({"debate_id": "debate-1", "user_id": "user-1", "timestamp": datetime(2026, 1, 1).isoformat()})
+
+        async def scenario():
+            coalescer = RatingCoalescer(writer, queue=queue)
+            coalescer.submit("debate-1", "user-1", "final", 5)
+            coalescer.submit("debate-1", "user-2", "final", 1)
+            await coalescer.flush()
+            return coalescer
+
+        coalescer = asyncio.run(scenario())
+        self.assertEqual(queue._pending[0]["final_rating"], 5)
+        # Another user's rating of the same debate is not applied to the row
+        self.assertEqual(writer.calls, [{("debate-1", "user-2"): {"final_rating": 1}}])
+        self.assertEqual(coalescer.stats()["applied_to_queue"], 1)
+
+    def test_unowned_debates_are_counted_not_retried(self):
+        writer = FakeRatingWriter(owned={("debate-1", "user-1")})
+
+        async def scenario():
+            coalescer = RatingCoalescer(writer)
+            coalescer.submit("debate-1", "user-1", "opener", 4)
+            coalescer.submit("debate-1", "user-2", "opener", 1)
+            await coalescer.flush()
+            return coalescer
+
+        stats = asyncio.run(scenario()).stats()
+        self.assertEqual((stats["writes"], stats["unmatched"], stats["pending"]), (1, 1, 0))
+
+    def test_ratings_for_journaled_debates_wait_for_the_replay(self):
+        owned = set()
+        writer = FakeRatingWriter(owned=owned)
+
+        async def insert(rows):
+            owned.update((row["debate_id"], row["user_id"]) for row in rows)
+
+        with tempfile.TemporaryDirectory() as directory:
+            queue = DebateWriteQueue(insert, journal_path=os.path.join(directory, "debates.jsonl"))
+
+            async def scenario():
+                # Spilled during an outage: neither queued nor in the database yet
+                await queue._journal([debate_row({"debate_id": "debate-1", "user_id": "user-1", "timestamp": datetime(2026, 1, 1).isoformat()})])
+                coalescer = RatingCoalescer(writer, queue=queue)
+                coalescer.submit("debate-1", "user-1", "opener", 4)
+                await coalescer.flush()
+                self.assertEqual(coalescer.stats()["waiting_for_replay"], 1)
+                coalescer.submit("debate-1", "user-1", "final", 5)
+                await coalescer.flush()
+                self.assertTrue(await queue._replay_journal())
+                await coalescer.flush()
+                return coalescer
+
+            coalescer = asyncio.run(scenario())
+        self.assertEqual(writer.calls, [
+            {("debate-1", "user-1"): {"opener_rating": 4}},
+            {("debate-1", "user-1"): {"opener_rating": 4, "final_rating": 5}},
+        ])
+        stats = coalescer.stats()
+        self.assertEqual((stats["writes"], stats["unmatched"], stats["waiting_for_replay"]), (1, 0, 0))
+
+    def test_failed_writes_are_retried_and_newer_ratings_win(self):
+        writer = FakeRatingWriter(failures=1)
+
+        async def scenario():
+            coalescer = RatingCoalescer(writer, max_attempts=3)
+            coalescer.submit("debate-1", "user-1", "opener", 2)
+            coalescer.submit("debate-1", "user-1", "final", 2)
+            self.assertFalse(await coalescer.flush())
+            coalescer.submit("debate-1", "user-1", "final", 5)
+            self.assertTrue(await coalescer.flush())
+            return coalescer
+
+        coalescer = asyncio.run(scenario())
+        self.assertEqual(writer.calls, [{("debate-1", "user-1"): {"opener_rating": 2, "final_rating": 5}}])
+        self.assertEqual(coalescer.stats()["failed_attempts"], 1)
+
+    def test_ratings_are_dropped_after_max_attempts(self):
+        writer = FakeRatingWriter(failures=5)
+
+        async def scenario():
+            coalescer = RatingCoalescer(writer, max_attempts=2)
+            coalescer.submit("debate-1", "user-1", "opener", 2)
+            await coalescer.flush()
+            await coalescer.flush()
+            return coalescer
+
+        stats = asyncio.run(scenario()).stats()
+        self.assertEqual((stats["pending"], stats["dropped"]), (0, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
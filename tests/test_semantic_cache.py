@@ -0,0 +1,81 @@
+import time
+import unittest
+
+from app.services.semantic_cache import SemanticAnswerCache
+
+STAGES = {
+    "opener": {"model": "m1", "text": "Claim: Yes"},
+    "critiquer": {"model": "m2", "text": "Claim: No"},
+    "synthesizer": {"model": "m3", "text": "Consensus: Maybe"},
+}
+
+
+class TestSemanticAnswerCache(unittest.TestCase):
+    """Test cases for the near-duplicate prompt answer cache"""
+
+    def test_near_duplicate_prompt_hits(self):
+        cache = SemanticAnswerCache(threshold=0.8)
+        cache.store("Should I quit my job to start a bakery?", STAGES, duration=12.0, tokens=300)
+        entry = cache.lookup("should i quit my job to start a bakery")
+        self.assertIsNotNone(entry)
+        self.assertEqual(entry.stages["synthesizer"]["text"], "Consensus: Maybe")
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["tokens_saved"], 300)
+        self.assertEqual(stats["latency_saved_seconds"], 12.0)
+
+    def test_unrelated_prompt_misses(self):
+        cache = SemanticAnswerCache(threshold=0.8)
+        cache.store("Should I quit my job to start a bakery?", STAGES)
+        self.assertIsNone(cache.lookup("Which programming language should I learn first?"))
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_entries_are_not_shared_between_users(self):
+        cache = SemanticAnswerCache(threshold=0.8)
+        cache.store("Should I quit my job to start a bakery?", STAGES, scope="user-1")
+        self.assertIsNone(cache.lookup("Should I quit my job to start a bakery?", scope="user-2"))
+        self.assertIsNotNone(cache.lookup("Should I quit my job to start a bakery?", scope="user-1"))
+
+    def test_default_threshold_separates_one_word_changes(self):
+        prompt = ("I am 34, married with two kids and a mortgage in Leeds, and I got a job offer in Berlin "
+                  "with a higher salary but longer hours. Should I take the offer?")
+        cache = SemanticAnswerCache()
+        cache.store(prompt, STAGES)
+        # Both score above 0.92 with the hashing embedder
+        self.assertIsNone(cache.lookup(prompt.replace("take", "decline")))
+        self.assertIsNone(cache.lookup(prompt.replace("34", "52").replace("two", "four")))
+
+    def test_expired_entries_are_ignored(self):
+        cache = SemanticAnswerCache(threshold=0.8, ttl_seconds=0.01)
+        cache.store("Is remote work better than office work?", STAGES)
+        time.sleep(0.02)
+        self.assertIsNone(cache.lookup("Is remote work better than office work?"))
+
+    def test_capacity_evicts_least_recently_used(self):
+        cache = SemanticAnswerCache(threshold=0.8, max_entries=2)
+        cache.store("first question about cats", STAGES)
+        cache.store("second question about dogs", STAGES)
+        cache.lookup("first question about cats")
+        cache.store("third question about birds", STAGES)
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertIsNotNone(cache.lookup("first question about cats"))
+        self.assertIsNone(cache.lookup("second question about dogs"))
+
+    def test_arabic_prompts_are_compared_by_their_words(self):
+        cache = SemanticAnswerCache()
+        cache.store("هل يجب أن أستقيل من وظيفتي في 2024؟", STAGES)
+        self.assertIsNone(cache.lookup("ما هي أفضل لغة برمجة أتعلمها في 2024؟"))
+        # Harakat do not change the words
+        self.assertIsNotNone(cache.lookup("هَلْ يَجِبُ أَنْ أَسْتَقِيلَ مِنْ وَظِيفَتِي فِي 2024؟"))
+
+    def test_short_prompts_bypass_the_cache(self):
+        cache = SemanticAnswerCache(threshold=0.8, min_words=3)
+        cache.store("2024?", STAGES)
+        cache.store("hello 2024", STAGES)
+        self.assertEqual(cache.stats()["entries"], 0)
+        self.assertIsNone(cache.lookup("hello 2024"))
+        self.assertEqual(cache.stats()["skipped_short_prompts"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
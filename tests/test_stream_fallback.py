@@ -0,0 +1,52 @@
+import unittest
+from unittest import mock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api import websocket
+from app.core.tracing import RingBufferExporter, Tracer
+from app.services.ai_service import AIService
+
+
+class StreamFailingAIService(AIService):
+    """Every stream fails before its first token; the non-streaming call succeeds."""
+
+    async def stream_bot_response(self, model, conversation_history, on_chunk, max_tokens=None):
+        raise RuntimeError("stream reset by upstream")
+
+    async def get_bot_response(self, model, conversation_history, max_tokens=None):
+        return f"Claim: fallback answer from {model}", model
+
+
+class TestStreamFallback(unittest.TestCase):
+    """Test cases for the non-streaming fallback of a debate stage"""
+
+    def test_failed_streams_fall_back_to_a_full_response(self):
+        app = FastAPI()
+        app.include_router(websocket.router)
+        app.dependency_overrides[websocket.get_ai_service] = lambda: StreamFailingAIService(client=object())
+        exporter = RingBufferExporter()
+
+        with mock.patch.object(websocket, "SEMANTIC_CACHE_ENABLED", False), \
+                mock.patch.object(websocket, "PIPELINED_CRITIQUE", False), \
+                mock.patch.object(websocket, "COUNCIL_OPENERS", 1), \
+                mock.patch.object(websocket, "tracer", Tracer(exporter)):
+            with TestClient(app).websocket_connect("/ws") as ws:
+                ws.send_json({"text": "Should I learn the oud?"})
+                finals = {}
+                while "synthesizer" not in finals:
+                    frame = ws.receive_json()
+                    self.assertFalse(frame.get("text", "").startswith("Error:"), frame)
+                    if "role" in frame and "type" not in frame:
+                        finals[frame["role"]] = frame
+
+        for role in ("opener", "critiquer"):
+            self.assertTrue(finals[role]["text"].startswith("Claim: fallback answer"), finals[role])
+        self.assertIn("Claim: fallback answer", finals["synthesizer"]["text"])
+        stages = [span for span in exporter.recent()[0]["spans"] if span["name"] == "stage" and "fallback" in span["attributes"]]
+        self.assertEqual(len(stages), 3)
+        self.assertIn("stream reset by upstream", stages[0]["attributes"]["stream_error"])
+
+
+if __name__ == '__main__':
+    unittest.main()
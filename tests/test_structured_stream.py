@@ -0,0 +1,80 @@
+import unittest
+import re
+from app.models import ArgumentResponse, SynthesisResponse
+from app.services.structured_stream import StructuredStreamParser
+
+
+ARGUMENT = """Here is my argument.
+**Claim:** Opening a bakery pays off long term
+**Explanation:** - Passion sustains the hard first years
+- Autonomy: full creative control
+Evidence: 68% of owners report higher satisfaction
+Counterargument: Financial risk is high early on
+Stance: Pro."""
+
+SYNTHESIS = """Summary:
+- Both paths have merit
+- Promotion is safer
+- Bakery is more fulfilling
+
+Consensus: Take the promotion and plan the bakery on the side
+
+Decision Breakdown: Savings from the promotion fund a tested launch.
+
+Citations:
+[O1]: "passion sustains"
+[C1]: "risk is high"
+"""
+
+
+def _feed(parser, text, pieces):
+    """Feeds ``text`` split at ``pieces`` boundaries and returns every closed field in order."""
+    closed = []
+    for piece in pieces(text):
+        closed.extend(parser.feed(piece))
+    remaining, model, error = parser.finish()
+    return closed + remaining, model, error
+
+
+class TestStructuredStreamParser(unittest.TestCase):
+    """Test cases for the incremental debate output parser"""
+
+    def test_argument_fields_close_in_order_whatever_the_chunking(self):
+        for pieces in (lambda t: [t], lambda t: list(t), lambda t: re.findall(r"\S+\s*", t)):
+            closed, model, error = _feed(StructuredStreamParser(ArgumentResponse), ARGUMENT, pieces)
+            self.assertIsNone(error)
+            self.assertEqual([field for field, _ in closed], ["claim", "explanation", "evidence", "counterargument", "stance"])
+            self.assertEqual(model.claim, "Opening a bakery pays off long term")
+            self.assertIn("Autonomy: full creative control", model.explanation)
+            self.assertEqual(model.stance.value, "Pro")
+
+    def test_field_closes_as_soon_as_next_label_starts(self):
+        parser = StructuredStreamParser(ArgumentResponse)
+        self.assertEqual(parser.feed("Claim: Stay put\nExpla"), [])
+        self.assertEqual(parser.feed("nation:"), [("claim", "Stay put")])
+
+    def test_fields_are_truncated_to_model_limits(self):
+        text = "Claim: " + "word " * 60 + "\nExplanation: short\nStance: Con"
+        parser = StructuredStreamParser(ArgumentResponse)
+        closed, model, error = _feed(parser, text, lambda t: list(t))
+        self.assertIsNone(error)
+        self.assertLessEqual(len(model.claim), 100)
+        self.assertEqual(parser.truncated, ["claim"])
+        self.assertEqual(model.stance.value, "Con")
+
+    def test_synthesis_lists_and_aliases(self):
+        closed, model, error = _feed(StructuredStreamParser(SynthesisResponse), SYNTHESIS, lambda t: re.findall(r"\S+\s*", t))
+        self.assertIsNone(error)
+        self.assertEqual(model.summary, ["Both paths have merit", "Promotion is safer", "Bakery is more fulfilling"])
+        self.assertTrue(model.breakdown.startswith("Savings"))
+        self.assertEqual(len(model.citations), 2)
+
+    def test_unstructured_text_reports_validation_error(self):
+        closed, model, error = _feed(StructuredStreamParser(ArgumentResponse), "I think you should do it.", lambda t: [t])
+        self.assertEqual(closed, [])
+        self.assertIsNone(model)
+        self.assertIn("claim", error)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from app.core.tracing import JsonlExporter, RingBufferExporter, Tracer, current_span
+
+
+class TestTracing(unittest.TestCase):
+    """Test cases for per-debate span tracing"""
+
+    def test_spans_in_child_tasks_join_the_debate_trace(self):
+        exporter = RingBufferExporter()
+        tracer = Tracer(exporter)
+
+        async def stage(name):
+            with tracer.span("stage", stage=name):
+                current_span().set(fallback="non_streaming")
+                await asyncio.sleep(0)
+
+        async def debate():
+            root = tracer.start_trace("debate", "debate-1", mode="guest")
+            await asyncio.gather(stage("opener:0"), stage("opener:1"))
+            root.end()
+
+        asyncio.run(debate())
+        trace = exporter.get("debate-1")
+        root = next(span for span in trace["spans"] if span["parent_id"] is None)
+        stages = [span for span in trace["spans"] if span["name"] == "stage"]
+        self.assertEqual(len(stages), 2)
+        self.assertTrue(all(span["parent_id"] == root["span_id"] for span in stages))
+        self.assertEqual(stages[0]["attributes"]["fallback"], "non_streaming")
+        self.assertEqual(trace["status"], "ok")
+
+    def test_cancelled_and_failed_spans_record_status(self):
+        exporter = RingBufferExporter()
+        tracer = Tracer(exporter)
+
+        async def debate():
+            root = tracer.start_trace("debate", "debate-2")
+            with self.assertRaises(asyncio.CancelledError):
+                with tracer.span("stage"):
+                    raise asyncio.CancelledError()
+            root.set(status="cancelled")
+            root.end()
+
+        asyncio.run(debate())
+        trace = exporter.get("debate-2")
+        self.assertEqual(trace["status"], "cancelled")
+        self.assertEqual([span["status"] for span in trace["spans"]], ["cancelled", "cancelled"])
+
+    def test_unsampled_traces_export_nothing(self):
+        exporter = RingBufferExporter()
+        tracer = Tracer(exporter, sample_rate=0.5, rng=lambda: 0.9)
+        root = tracer.start_trace("debate", "debate-3")
+        with tracer.span("stage") as span:
+            span.set(model="m-1")
+        root.end()
+        self.assertEqual(exporter.recent(), [])
+        self.assertEqual(tracer.stats()["traces_sampled"], 0)
+
+    def test_span_outside_a_trace_roots_its_own(self):
+        exporter = RingBufferExporter(max_traces=2)
+        tracer = Tracer(exporter)
+        for _ in range(3):
+            with tracer.span("auth.remote_lookup", outcome="ok"):
+                pass
+        traces = exporter.recent()
+        self.assertEqual(len(traces), 2)
+        self.assertEqual(traces[0]["name"], "auth.remote_lookup")
+
+    def test_jsonl_exporter_writes_one_trace_per_line(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "traces.jsonl")
+            tracer = Tracer(JsonlExporter(path, flush_interval=60))
+            for debate_id in ("a", "b"):
+                with tracer.start_trace("debate", debate_id):
+                    with tracer.span("db.create_debate"):
+                        pass
+            # Finishing a trace only queues it; the file is written by the writer thread
+            self.assertFalse(os.path.exists(path))
+            tracer.close()
+            with open(path) as handle:
+                lines = [json.loads(line) for line in handle]
+        self.assertEqual([trace["trace_id"] for trace in lines], ["a", "b"])
+        self.assertEqual([span["name"] for span in lines[0]["spans"]], ["debate", "db.create_debate"])
+
+    def test_jsonl_exporter_writes_in_the_background(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "traces.jsonl")
+            exporter = JsonlExporter(path, flush_interval=0.01)
+            with Tracer(exporter).start_trace("debate", "c"):
+                pass
+            deadline = time.monotonic() + 2
+            while not os.path.exists(path) and time.monotonic() < deadline:
+                time.sleep(0.01)
+            with open(path) as handle:
+                self.assertEqual(json.loads(handle.readline())["trace_id"], "c")
+            exporter.close()
+
+
+if __name__ == '__main__':
+    unittest.main()